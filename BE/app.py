@@ -1,14 +1,57 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
+from src.authentications.hash import password_hasher
+from src.database.connection import dispose_engines
+from src.database.execution import async_db_client
+from src.database.partitions import maintenance_loop
+from src.trips.adherence import adherence_loop
+from src.trips.compaction import compaction_loop
+from src.database.instrumentation import query_stats
 from src.utils.app_routers import setup_routers
+from src.utils.config import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines are created lazily by the first query; schema creation is
+    # `python -m src.database.bootstrap` (make bootstrap), not app startup.
+    tasks = []
+    if settings.tracking.PARTITION_CHECK_SECONDS > 0:
+        tasks.append(asyncio.create_task(maintenance_loop(async_db_client)))
+    if settings.tracking.ADHERENCE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(adherence_loop()))
+    if settings.tracking.COMPACTION_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(compaction_loop()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
+    await dispose_engines()
+
 
 app = FastAPI(
     title="Bus Tracking API",
     version="1.0.0",
     description="API for tracking buses in real-time.",
+    lifespan=lifespan,
 )
 setup_routers(app)
 
 
+@app.middleware("http")
+async def record_query_stats(request: Request, call_next):
+    # Group the statements each request runs under its route template
+    with query_stats.request_scope() as statements:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    query_stats.record_request(f"{request.method} {path}", statements)
+    return response
+
+
 @app.get("/")
 def root():
     return {"message": "Bus here"}
@@ -0,0 +1,63 @@
+"""
+Concurrent-request throughput: sync DBClient vs AsyncDBClient.
+
+Every simulated request runs as a coroutine on one event loop, the same way
+an `async def` route handler does, and issues a query that sleeps on the
+server for --delay seconds. With the sync client each query blocks the loop,
+so requests are served one at a time; with the async client they overlap up
+to the pool size.
+
+Usage (from BE/, against a running Postgres at DATABASE_URL):
+    python -m benchmarks.bench_async_client --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from src.database.execution import async_db_client, db_client
+
+
+async def run(handler, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with semaphore:
+            await handler()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    return time.perf_counter() - started
+
+
+async def main(args):
+    stmt = text("SELECT pg_sleep(:delay) AS slept").bindparams(delay=args.delay)
+
+    async def sync_handler():
+        db_client.execute_one(stmt)
+
+    async def async_handler():
+        await async_db_client.execute_one(stmt)
+
+    # warm both pools so connection setup is not part of the measurement
+    db_client.execute_one(text("SELECT 1"))
+    await async_db_client.execute_one(text("SELECT 1"))
+
+    for name, handler in (("sync DBClient", sync_handler), ("AsyncDBClient", async_handler)):
+        elapsed = await run(handler, args.requests, args.concurrency)
+        print(
+            f"{name:<14} {args.requests} requests in {elapsed:.2f}s "
+            f"-> {args.requests / elapsed:,.1f} req/s"
+        )
+
+    await async_db_client.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02)
+    asyncio.run(main(parser.parse_args()))
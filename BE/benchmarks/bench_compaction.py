@@ -0,0 +1,70 @@
+"""
+Trajectory compaction of finished trips: compression vs error.
+
+Simulates --trips trips of --minutes minutes at one fix per second (turns,
+dwells at stops, stop-and-go traffic and GPS noise), compacts each at several
+tolerances and reports points kept, compression ratio, the largest error the
+simplification introduced and compaction time per trip.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_compaction --trips 20 --minutes 90
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.helpers.geo import METERS_PER_DEGREE
+from src.trips.compaction import compact_positions
+
+
+def simulate_trip(minutes: int, noise_m: float) -> list[dict]:
+    count = minutes * 60
+    # traffic: speed drifts smoothly around 9 m/s
+    drift = np.convolve(np.random.normal(0, 3, count), np.ones(60) / 60, "same")
+    speed = np.clip(9 + drift * 8, 0, 16)
+    # dwell at a stop for ~30 s every ~3 minutes
+    speed[(np.arange(count) % 180) < 30] = 0.0
+    heading = np.cumsum(np.where(np.random.random(count) < 0.01, 1.2, 0.0))
+    x = np.cumsum(speed * np.sin(heading)) + np.random.normal(0, noise_m, count)
+    y = np.cumsum(speed * np.cos(heading)) + np.random.normal(0, noise_m, count)
+    started_at = datetime(2026, 1, 1, 7)
+    return [
+        {
+            "recorded_at": started_at + timedelta(seconds=i),
+            "latitude": 31.95 + y[i] / METERS_PER_DEGREE,
+            "longitude": 35.91 + x[i] / (METERS_PER_DEGREE * 0.848),
+        }
+        for i in range(count)
+    ]
+
+
+def main(args):
+    trips = [simulate_trip(args.minutes, args.noise) for _ in range(args.trips)]
+    raw = sum(len(rows) for rows in trips)
+    print(f"{args.trips} trips, {raw} fixes, {args.noise} m GPS noise")
+    for tolerance in args.tolerances:
+        started = time.perf_counter()
+        tracks = [compact_positions(uuid.uuid4(), rows, tolerance) for rows in trips]
+        per_trip_ms = (time.perf_counter() - started) / len(trips) * 1000
+        kept = sum(track["kept_points"] for track in tracks)
+        max_error = max(track["max_error_m"] for track in tracks)
+        print(
+            f"tolerance {tolerance:5.1f} m  kept {kept:7d}  "
+            f"ratio {raw / kept:6.1f}x  max error {max_error:5.2f} m  "
+            f"{per_trip_ms:6.1f} ms/trip"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, default=20)
+    parser.add_argument("--minutes", type=int, default=90)
+    parser.add_argument("--noise", type=float, default=2.0, help="meters")
+    parser.add_argument(
+        "--tolerances", type=float, nargs="+", default=[2.0, 5.0, 10.0, 20.0]
+    )
+    main(parser.parse_args())
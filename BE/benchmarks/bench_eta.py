@@ -0,0 +1,128 @@
+"""
+ETA estimates for a whole route at once vs bus-by-bus, stop-by-stop.
+
+Builds a route of --stops stops with learned segment speeds and --buses buses
+spread along it, then times the vectorized (buses x stops) estimate against
+the equivalent per-bus, per-stop Python loop, and the incremental cost of
+folding one new fix into a single trip.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_eta --stops 60 --buses 40
+"""
+
+import argparse
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.helpers.geo import METERS_PER_DEGREE
+from src.trips.eta import EtaEngine, RouteModel
+from src.utils.config import settings
+
+ORIGIN_LAT, ORIGIN_LNG = 31.95, 35.91
+
+
+def make_stops(count: int, spacing_m: float) -> list[dict]:
+    # a gently winding line of stops
+    stops, latitude, longitude, bearing = [], ORIGIN_LAT, ORIGIN_LNG, 0.0
+    for index in range(count):
+        stops.append(
+            {
+                "id": uuid.uuid4(),
+                "name": f"Stop {index}",
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+        )
+        bearing += random.uniform(-0.5, 0.5)
+        latitude += spacing_m * math.cos(bearing) / METERS_PER_DEGREE
+        longitude += (
+            spacing_m
+            * math.sin(bearing)
+            / (METERS_PER_DEGREE * math.cos(math.radians(latitude)))
+        )
+    return stops
+
+
+def loop_estimate(route: RouteModel, distances, ratios):
+    # what the vectorized estimate replaces: one stop of one bus at a time
+    decay = settings.tracking.ETA_RECENT_SPEED_DECAY_M
+    rows = []
+    for distance, ratio in zip(distances, ratios):
+        start = float(np.interp(distance, route.stop_distance, route.stop_time))
+        row = []
+        for stop_distance, stop_time in zip(route.stop_distance, route.stop_time):
+            ahead = stop_distance - distance
+            if ahead <= 0:
+                row.append(math.nan)
+                continue
+            fade = math.exp(-ahead / decay)
+            row.append((stop_time - start) * (fade / ratio + (1 - fade)))
+        rows.append(row)
+    return rows
+
+
+def per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(args):
+    stops = make_stops(args.stops, args.spacing)
+    route = RouteModel(uuid.uuid4(), stops)
+    route.segment_speed[:] = np.random.uniform(4, 12, len(route.segment_speed))
+    route._refresh_times()
+    length = float(route.stop_distance[-1])
+    distances = np.random.uniform(0, length, args.buses)
+    ratios = np.random.uniform(0.6, 1.4, args.buses)
+
+    vectorized = route.estimate(distances, ratios)
+    looped = np.array(loop_estimate(route, distances, ratios))
+    assert np.allclose(vectorized, looped, equal_nan=True)
+
+    vector_us = per_call_us(lambda: route.estimate(distances, ratios), 200)
+    loop_us = per_call_us(lambda: loop_estimate(route, distances, ratios), 10)
+
+    # one bus driving the route, reporting every 5 s
+    along = np.linspace(0, length, args.fixes)
+    stop_lats = [stop["latitude"] for stop in stops]
+    stop_lngs = [stop["longitude"] for stop in stops]
+    latitudes = np.interp(along, route.stop_distance, stop_lats)
+    longitudes = np.interp(along, route.stop_distance, stop_lngs)
+    started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    fixes = [
+        SimpleNamespace(
+            latitude=float(latitude),
+            longitude=float(longitude),
+            recorded_at=started_at + timedelta(seconds=5 * index),
+        )
+        for index, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+    ]
+    engine = EtaEngine()
+    trip_id = uuid.uuid4()
+    started = time.perf_counter()
+    for fix in fixes:
+        engine.observe(trip_id, route, [fix])
+    observe_us = (time.perf_counter() - started) / len(fixes) * 1e6
+
+    cells = args.buses * args.stops
+    print(f"{args.stops} stops ({length / 1000:.1f} km), {args.buses} buses")
+    print(f"vectorized estimate   {vector_us:10.1f} us ({cells} bus-stop pairs)")
+    print(f"python loop           {loop_us:10.1f} us ({loop_us / vector_us:.0f}x)")
+    print(f"incremental observe   {observe_us:10.1f} us/fix (one trip's row)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stops", type=int, default=60)
+    parser.add_argument("--buses", type=int, default=40)
+    parser.add_argument("--spacing", type=float, default=400.0, help="meters")
+    parser.add_argument("--fixes", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+"""
+Stop geofence checks through the per-route stop grid vs testing every stop.
+
+Builds a route of --stops stops --spacing meters apart and drives --buses
+buses along it in batches of --batch fixes, timing the grid-based geofence
+check (arrival/departure detection included) against measuring every stop
+of the route for every fix.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_geofence --stops 80 --buses 200
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.helpers.geo import METERS_PER_DEGREE, haversine_np
+from src.stops.geofence import GeofenceTracker, RouteStopGrid, TripFence
+
+
+def main(args):
+    stops = [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Stop {index}",
+            "latitude": 31.95 + index * args.spacing / METERS_PER_DEGREE,
+            "longitude": 35.91,
+        }
+        for index in range(args.stops)
+    ]
+    grid = RouteStopGrid(uuid.uuid4(), stops)
+    length = (args.stops - 1) * args.spacing
+    started_at = datetime(2026, 1, 1, 7)
+    trips = []
+    for _ in range(args.buses):
+        along = np.arange(0, length + 10, 10.0)
+        noise = np.random.normal(0, 4, (2, len(along))) / METERS_PER_DEGREE
+        fixes = [
+            {
+                "latitude": 31.95 + along[i] / METERS_PER_DEGREE + noise[0, i],
+                "longitude": 35.91 + noise[1, i],
+                "recorded_at": started_at + timedelta(seconds=i),
+            }
+            for i in range(len(along))
+        ]
+        trips.append((uuid.uuid4(), fixes))
+    total = sum(len(fixes) for _, fixes in trips)
+
+    tracker = GeofenceTracker()
+    events = completed = 0
+    candidates = 0
+    started = time.perf_counter()
+    for _, fixes in trips:
+        fence = TripFence()
+        for offset in range(0, len(fixes), args.batch):
+            batch = fixes[offset : offset + args.batch]
+            found, done = tracker.check(grid, fence, batch)
+            events += len(found)
+            if done:
+                # ingestion rejects fixes for arrived trips
+                completed += 1
+                break
+    grid_us = (time.perf_counter() - started) / total * 1e6
+    for _, fixes in trips[:10]:
+        candidates += sum(
+            len(nearby)
+            for nearby in grid.distances(
+                [fix["latitude"] for fix in fixes], [fix["longitude"] for fix in fixes]
+            )
+        )
+    sampled = sum(len(fixes) for _, fixes in trips[:10])
+
+    stop_lats = np.array([stop["latitude"] for stop in stops])
+    stop_lngs = np.array([stop["longitude"] for stop in stops])
+    started = time.perf_counter()
+    for _, fixes in trips[:10]:
+        for fix in fixes:
+            haversine_np(fix["latitude"], fix["longitude"], stop_lats, stop_lngs)
+    scan_us = (time.perf_counter() - started) / sampled * 1e6
+
+    print(
+        f"{args.stops} stops, {args.buses} buses, {total} fixes; "
+        f"{events} events, {completed} trips completed"
+    )
+    print(
+        f"stop grid         {grid_us:8.2f} us/fix "
+        f"({candidates / sampled:.2f} stops tested per fix)"
+    )
+    print(f"every stop        {scan_us:8.2f} us/fix ({args.stops} stops tested)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stops", type=int, default=80)
+    parser.add_argument("--spacing", type=float, default=400.0, help="meters")
+    parser.add_argument("--buses", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=10, help="fixes per request")
+    main(parser.parse_args())
@@ -0,0 +1,132 @@
+"""
+Fixes/second one worker sustains on the batched GPS ingestion path.
+
+  validate - GPSFixBatch.model_validate on JSON-shaped payloads (no database)
+  persist  - TripQueries.insert_positions: one multi-row INSERT per batch
+  total    - both, as the endpoint runs them, with --concurrency requests
+             in flight on the worker's event loop
+
+Rows go to a scratch `bench_trip_positions` table created with
+`LIKE trip_positions INCLUDING ALL` (run `make bootstrap` first), so no
+trips need to exist.
+
+Usage (from BE/, against a running Postgres at DATABASE_URL):
+    python -m benchmarks.bench_gps_ingestion --batches 200 --batch-size 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import MetaData, text
+
+from src.database.execution import async_db_client
+from src.database.schema import trip_positions
+from src.trips.models import GPSFixBatch
+from src.trips.query import TripQueries
+
+bench_trip_positions = trip_positions.to_metadata(
+    MetaData(), name="bench_trip_positions"
+)
+
+
+class BenchTripQueries(TripQueries):
+    async def insert_positions(self, rows: list[dict]):
+        return await self.db_client.insert_many(
+            bench_trip_positions,
+            rows,
+            on_conflict="do_nothing",
+            conflict_target=["trip_id", "recorded_at"],
+        )
+
+
+def make_payloads(batches: int, batch_size: int) -> list[dict]:
+    # one fix per second, ending now
+    started = datetime.now(timezone.utc) - timedelta(seconds=batches * batch_size)
+    payloads = []
+    for batch in range(batches):
+        payloads.append(
+            {
+                "fixes": [
+                    {
+                        "latitude": 31.95 + random.random() / 100,
+                        "longitude": 35.91 + random.random() / 100,
+                        "recorded_at": (
+                            started + timedelta(seconds=batch * batch_size + i)
+                        ).isoformat(),
+                        "speed": random.uniform(0, 20),
+                        "heading": random.uniform(0, 359),
+                        "accuracy": random.uniform(3, 15),
+                    }
+                    for i in range(batch_size)
+                ]
+            }
+        )
+    return payloads
+
+
+def to_rows(trip_id, bus_id, batch: GPSFixBatch) -> list[dict]:
+    return [
+        {"trip_id": trip_id, "bus_id": bus_id, **fix.model_dump()}
+        for fix in batch.fixes
+    ]
+
+
+async def reset_table():
+    async with async_db_client.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_trip_positions"))
+        await conn.execute(
+            text(
+                "CREATE TABLE bench_trip_positions "
+                "(LIKE trip_positions INCLUDING ALL)"
+            )
+        )
+
+
+def report(name: str, fixes: int, elapsed: float):
+    print(f"{name:<10} {fixes:>8} fixes {elapsed:8.3f}s {fixes / elapsed:>12,.0f} fixes/s")
+
+
+async def main(args):
+    payloads = make_payloads(args.batches, args.batch_size)
+    fixes = args.batches * args.batch_size
+    queries = BenchTripQueries()
+
+    started = time.perf_counter()
+    batches = [GPSFixBatch.model_validate(payload) for payload in payloads]
+    report("validate", fixes, time.perf_counter() - started)
+
+    await reset_table()
+    trip_id, bus_id = uuid.uuid4(), uuid.uuid4()
+    started = time.perf_counter()
+    for batch in batches:
+        await queries.insert_positions(to_rows(trip_id, bus_id, batch))
+    report("persist", fixes, time.perf_counter() - started)
+
+    await reset_table()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one_request(payload):
+        # each simulated driver reports for its own trip
+        async with semaphore:
+            batch = GPSFixBatch.model_validate(payload)
+            await queries.insert_positions(to_rows(uuid.uuid4(), bus_id, batch))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(payload) for payload in payloads))
+    report("total", fixes, time.perf_counter() - started)
+
+    async with async_db_client.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_trip_positions"))
+    await async_db_client.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
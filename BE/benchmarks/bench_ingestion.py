@@ -0,0 +1,97 @@
+"""
+Rows/s for loading position rows: single INSERT vs multi-row INSERT vs COPY.
+
+Rows are shaped like `trips` (UUIDs, double lat/lng, status enum, timestamps)
+and written to a scratch `bench_trips` table created with
+`LIKE trips INCLUDING DEFAULTS`, so foreign keys do not get in the way.
+
+Usage (from BE/, against a running Postgres at DATABASE_URL):
+    python -m benchmarks.bench_ingestion --rows 50000 --single-rows 2000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import MetaData, insert, text
+
+from src.database.execution import db_client
+from src.database.schema import trips
+
+bench_trips = trips.to_metadata(MetaData(), name="bench_trips")
+
+
+def make_rows(count: int) -> list[dict]:
+    route_id, driver_id, bus_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    started = datetime.now(timezone.utc)
+    statuses = ["in_progress", "delayed", "arrived"]
+    return [
+        {
+            "id": uuid.uuid4(),
+            "route_id": route_id,
+            "driver_id": driver_id,
+            "bus_id": bus_id,
+            "latitude": 31.95 + random.random() / 100,
+            "longitude": 35.91 + random.random() / 100,
+            "status": random.choice(statuses),
+            "current_time": started + timedelta(seconds=i),
+            "created_at": started,
+            "updated_at": started,
+        }
+        for i in range(count)
+    ]
+
+
+def reset_table():
+    with db_client.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_trips"))
+        conn.execute(text("CREATE TABLE bench_trips (LIKE trips INCLUDING DEFAULTS)"))
+
+
+def single_insert(rows):
+    for row in rows:
+        db_client.execute_one(insert(bench_trips).values(**row))
+
+
+def multi_row_insert(rows):
+    db_client.insert_many(bench_trips, rows)
+
+
+def copy_text(rows):
+    db_client.copy_rows(bench_trips, rows, format="text")
+
+
+def copy_binary(rows):
+    db_client.copy_rows(bench_trips, rows, format="binary")
+
+
+def measure(name: str, loader, rows: list[dict]):
+    reset_table()
+    started = time.perf_counter()
+    loader(rows)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<18} {len(rows):>8} rows {elapsed:8.3f}s {len(rows) / elapsed:>12,.0f} rows/s")
+
+
+def main(args):
+    rows = make_rows(args.rows)
+    measure("single INSERT", single_insert, rows[: args.single_rows])
+    measure("multi-row INSERT", multi_row_insert, rows)
+    measure("COPY text", copy_text, rows)
+    measure("COPY binary", copy_binary, rows)
+    with db_client.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_trips"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument(
+        "--single-rows",
+        type=int,
+        default=2000,
+        help="row-at-a-time inserts are slow; cap how many are measured",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+Map matching at fleet scale: segment-index snapping vs a full scan.
+
+Builds --routes route shapes of --points points and a fleet of --buses buses
+spread over them, each sending --batch noisy fixes per request. Times one
+round of requests (every bus once) snapped through each route's segment
+index, and the same round projected onto every segment of the route, then
+compares the sustained fixes/s with the fleet's rate of --rate fixes/s per
+bus.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_map_matching --buses 2000 --batch 5
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from src.bus_routes.geometry import RouteGeometry
+from src.helpers.geo import METERS_PER_DEGREE, project_onto_polyline, to_local_xy
+from src.utils.config import settings
+
+
+def make_shape(count: int, spacing_m: float) -> RouteGeometry:
+    latitude = 31.8 + random.random() * 0.3
+    longitude = 35.8 + random.random() * 0.3
+    latitudes, longitudes, bearing = [latitude], [longitude], random.random() * 6
+    for _ in range(count - 1):
+        bearing += random.uniform(-0.3, 0.3)
+        latitude += spacing_m * math.cos(bearing) / METERS_PER_DEGREE
+        longitude += (
+            spacing_m
+            * math.sin(bearing)
+            / (METERS_PER_DEGREE * math.cos(math.radians(latitude)))
+        )
+        latitudes.append(latitude)
+        longitudes.append(longitude)
+    return RouteGeometry(latitudes, longitudes)
+
+
+def make_batches(geometry: RouteGeometry, buses: int, size: int, noise_m: float):
+    # each bus reports `size` fixes ~10 m apart around its own position
+    batches = []
+    for _ in range(buses):
+        start = random.random() * max(geometry.length - 10 * size, 0.0)
+        latitudes, longitudes = geometry.point_at(start + 10 * np.arange(size))
+        noise = np.random.normal(0, noise_m, (2, size)) / METERS_PER_DEGREE
+        batches.append(
+            ((latitudes + noise[0]).tolist(), (longitudes + noise[1]).tolist())
+        )
+    return batches
+
+
+def scan_match(geometry: RouteGeometry, latitudes, longitudes):
+    # what the index avoids: every fix against every segment of the route
+    x, y = to_local_xy(latitudes, longitudes, *geometry.origin)
+    return project_onto_polyline(x, y, geometry.x, geometry.y, geometry.cumulative)
+
+
+def main(args):
+    shapes = [make_shape(args.points, args.spacing) for _ in range(args.routes)]
+    started = time.perf_counter()
+    for geometry in shapes:
+        geometry.segment_index
+    build_ms = (time.perf_counter() - started) * 1000
+    index_kib = sum(geometry.segment_index.nbytes for geometry in shapes) / 1024
+
+    per_route = max(1, args.buses // args.routes)
+    work = [
+        (geometry, batch)
+        for geometry in shapes
+        for batch in make_batches(geometry, per_route, args.batch, args.noise)
+    ]
+    fixes = len(work) * args.batch
+
+    started = time.perf_counter()
+    matched = 0
+    for geometry, (latitudes, longitudes) in work:
+        matched += int(geometry.match(latitudes, longitudes)[4].sum())
+    index_s = time.perf_counter() - started
+
+    sample = work[: max(1, len(work) // 10)]
+    started = time.perf_counter()
+    for geometry, (latitudes, longitudes) in sample:
+        scan_match(geometry, latitudes, longitudes)
+    scan_s = (time.perf_counter() - started) * len(work) / len(sample)
+
+    required = args.buses * args.rate
+    print(
+        f"{args.routes} routes x {args.points} points, segment indexes built in "
+        f"{build_ms:.0f}ms ({index_kib:.0f} KiB, "
+        f"{settings.tracking.MATCH_MAX_DISTANCE_M:.0f} m cells)"
+    )
+    print(
+        f"{len(work)} requests x {args.batch} fixes, "
+        f"{matched / fixes:.1%} matched within "
+        f"{settings.tracking.MATCH_MAX_DISTANCE_M:.0f} m"
+    )
+    for name, seconds in (("segment index", index_s), ("full scan", scan_s)):
+        capacity = fixes / seconds
+        print(
+            f"{name:<14} {seconds / len(work) * 1e6:8.1f} us/request  "
+            f"{capacity:10.0f} fixes/s  ({capacity / required:.1f}x the fleet's "
+            f"{required:.0f} fixes/s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--routes", type=int, default=50)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--spacing", type=float, default=20.0, help="meters")
+    parser.add_argument("--buses", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=5, help="fixes per request")
+    parser.add_argument("--rate", type=float, default=1.0, help="fixes/s per bus")
+    parser.add_argument("--noise", type=float, default=8.0, help="GPS noise (m)")
+    main(parser.parse_args())
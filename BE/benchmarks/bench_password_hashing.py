@@ -0,0 +1,73 @@
+"""
+Event loop stalls during a login burst: argon2 inline vs in the hashing pool.
+
+Fires --logins concurrent password verifications at once, as at a shift
+change, while a ticker task stands in for every other request by waking
+every --tick-ms. Reports how long the logins took and the worst delay the
+ticker saw, first verifying inline on the event loop (as before) and then
+through PasswordHasher's process pool.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_password_hashing --logins 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.authentications.hash import HashHelper, PasswordHasher
+
+
+async def ticker(tick_s: float, delays: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(tick_s)
+        delays.append(time.perf_counter() - started - tick_s)
+
+
+async def burst(args, verify) -> tuple[float, float]:
+    delays: list[float] = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(args.tick_ms / 1000, delays, stop))
+    await asyncio.sleep(args.tick_ms / 1000 * 3)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await task
+    assert all(results)
+    return elapsed * 1000, max(delays) * 1000
+
+
+async def main(args):
+    hashed = HashHelper.hash_password("correct horse battery staple")
+
+    async def inline():
+        return HashHelper.verify_password("correct horse battery staple", hashed)
+
+    hasher = PasswordHasher(concurrency=args.workers, max_queue=args.logins)
+
+    async def pooled():
+        return await hasher.verify_password("correct horse battery staple", hashed)
+
+    # start the workers outside the timed burst
+    await pooled()
+    print(f"{args.logins} concurrent logins, {args.workers} hashing workers")
+    total, stall = await burst(args, inline)
+    print(f"inline        burst {total:8.1f} ms  worst loop stall {stall:8.1f} ms")
+    total, stall = await burst(args, pooled)
+    print(f"process pool  burst {total:8.1f} ms  worst loop stall {stall:8.1f} ms")
+    stats = hasher.stats()
+    print(
+        f"pool: max queue depth {stats['max_waiting']}, "
+        f"avg wait {stats['wait']['avg_ms']} ms, avg run {stats['run']['avg_ms']} ms"
+    )
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--tick-ms", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+Load test for live position push: thousands of subscribers on one hub.
+
+Simulates --subscribers clients spread over --routes routes, each draining its
+subscription like the WebSocket endpoint does, while --buses buses per route
+report at --rate fixes/s each. A --slow-fraction of clients take --slow-ms
+per message, to show backpressure dropping their stale updates instead of
+queueing them.
+
+Reports publish cost (serialize once + fan-out), end-to-end delivery latency
+percentiles, and delivered/dropped counts for fast and slow clients.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_position_hub --subscribers 5000 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from src.bus_locations.hub import PositionHub
+
+
+async def subscriber(hub, route_id, slow_seconds, latencies, stop):
+    subscription = hub.subscribe(route_id)
+    try:
+        while not stop.is_set():
+            for message in await subscription.next_batch(timeout=0.5):
+                sent_at = json.loads(message)["position"]["sent_at"]
+                latencies.append(time.perf_counter() - sent_at)
+                if slow_seconds:
+                    await asyncio.sleep(slow_seconds)
+    finally:
+        hub.unsubscribe(subscription)
+    return subscription
+
+
+async def publisher(hub, routes, buses_per_route, rate, seconds, publish_times):
+    trips = {
+        route_id: [str(uuid.uuid4()) for _ in range(buses_per_route)]
+        for route_id in routes
+    }
+    interval = 1 / rate
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        tick = time.perf_counter()
+        for route_id, trip_ids in trips.items():
+            for trip_id in trip_ids:
+                position = {
+                    "trip_id": trip_id,
+                    "route_id": str(route_id),
+                    "latitude": 31.95 + random.random() / 100,
+                    "longitude": 35.91 + random.random() / 100,
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                    "sent_at": time.perf_counter(),
+                }
+                started = time.perf_counter()
+                hub.publish(route_id, position)
+                publish_times.append(time.perf_counter() - started)
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - tick)))
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def main(args):
+    hub = PositionHub(max_pending=args.buses)
+    routes = [uuid.uuid4() for _ in range(args.routes)]
+    stop = asyncio.Event()
+    fast_latencies, slow_latencies, publish_times = [], [], []
+
+    slow_count = int(args.subscribers * args.slow_fraction)
+    tasks = []
+    for index in range(args.subscribers):
+        slow = index < slow_count
+        tasks.append(
+            asyncio.create_task(
+                subscriber(
+                    hub,
+                    routes[index % len(routes)],
+                    args.slow_ms / 1000 if slow else 0.0,
+                    slow_latencies if slow else fast_latencies,
+                    stop,
+                )
+            )
+        )
+    await asyncio.sleep(0.1)
+
+    await publisher(hub, routes, args.buses, args.rate, args.seconds, publish_times)
+    stop.set()
+    subscriptions = await asyncio.gather(*tasks)
+
+    per_route = args.subscribers / args.routes
+    print(
+        f"{args.subscribers} subscribers, {args.routes} routes "
+        f"(~{per_route:.0f} each)"
+    )
+    print(
+        f"publish: {len(publish_times)} updates, "
+        f"median {statistics.median(publish_times) * 1e6:.1f}us, "
+        f"p99 {percentile(publish_times, 0.99) * 1e6:.1f}us"
+    )
+    for name, latencies, group in (
+        ("fast", fast_latencies, subscriptions[slow_count:]),
+        ("slow", slow_latencies, subscriptions[:slow_count]),
+    ):
+        if not group:
+            continue
+        delivered = sum(s.delivered for s in group)
+        dropped = sum(s.dropped for s in group)
+        p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+        print(
+            f"{name:<5} clients {len(group):>6}  delivered {delivered:>9}  "
+            f"dropped {dropped:>9}  latency p50 {p50 * 1000:7.2f}ms"
+            f"  p99 {p99 * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--buses", type=int, default=5, help="buses per route")
+    parser.add_argument("--rate", type=float, default=1.0, help="fixes/s per bus")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.1)
+    parser.add_argument("--slow-ms", type=float, default=500.0)
+    asyncio.run(main(parser.parse_args()))
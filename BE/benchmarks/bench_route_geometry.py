@@ -0,0 +1,87 @@
+"""
+Projecting positions onto a route shape: binary search vs full scan.
+
+Builds a winding route of --points shape points and drives a bus along it,
+projecting each fix either onto the whole shape or onto the segment at the
+bus's previous progress (binary search over the precomputed distances, then
+one segment projection). Also reports the memory held by the geometry arrays.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_route_geometry --points 5000 --fixes 2000
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from src.bus_routes.geometry import RouteGeometry
+from src.helpers.geo import METERS_PER_DEGREE
+
+
+def make_shape(count: int, spacing_m: float):
+    latitudes, longitudes = [31.95], [35.91]
+    bearing = 0.0
+    for _ in range(count - 1):
+        bearing += random.uniform(-0.3, 0.3)
+        latitudes.append(
+            latitudes[-1] + spacing_m * math.cos(bearing) / METERS_PER_DEGREE
+        )
+        longitudes.append(
+            longitudes[-1]
+            + spacing_m
+            * math.sin(bearing)
+            / (METERS_PER_DEGREE * math.cos(math.radians(latitudes[-1])))
+        )
+    return latitudes, longitudes
+
+
+def main(args):
+    latitudes, longitudes = make_shape(args.points, args.spacing)
+    started = time.perf_counter()
+    geometry = RouteGeometry(latitudes, longitudes)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # fixes along the route with ~10 m of GPS noise
+    along = np.linspace(0, geometry.length, args.fixes)
+    fix_lats, fix_lngs = geometry.point_at(along)
+    noise = 10 / METERS_PER_DEGREE
+    fix_lats = fix_lats + np.random.uniform(-noise, noise, args.fixes)
+    fix_lngs = fix_lngs + np.random.uniform(-noise, noise, args.fixes)
+    fixes = list(zip(fix_lats.tolist(), fix_lngs.tolist()))
+
+    started = time.perf_counter()
+    full = [geometry.progress(lat, lng)["travelled_m"] for lat, lng in fixes]
+    full_us = (time.perf_counter() - started) / args.fixes * 1e6
+
+    located, near = [], 0.0
+    started = time.perf_counter()
+    for lat, lng in fixes:
+        near = geometry.progress(lat, lng, near)["travelled_m"]
+        located.append(near)
+    located_us = (time.perf_counter() - started) / args.fixes * 1e6
+
+    error = np.abs(np.array(located) - along)
+    disagree = sum(abs(a - b) > 1.0 for a, b in zip(full, located))
+    python_bytes = args.points * (3 * 24 + 56 + 64)  # floats + tuple + list slot
+    print(
+        f"{args.points} points ({geometry.length / 1000:.1f} km), "
+        f"built in {build_ms:.1f}ms, arrays {geometry.nbytes / 1024:.0f} KiB "
+        f"(~{python_bytes / 1024:.0f} KiB as Python tuples)"
+    )
+    print(f"full scan             {full_us:10.1f} us/fix")
+    print(f"binary search         {located_us:10.1f} us/fix")
+    print(
+        f"binary search vs truth: max error {error.max():.1f} m; "
+        f"{disagree} fixes differ from the full scan by > 1 m"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--spacing", type=float, default=20.0, help="meters")
+    parser.add_argument("--fixes", type=int, default=2000)
+    main(parser.parse_args())
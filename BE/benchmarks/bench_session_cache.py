@@ -0,0 +1,126 @@
+"""
+Session verification latency per request, with and without the session cache.
+
+Each simulated request verifies its token's session the way
+AuthToken.verify_session does: a session lookup costing --db-ms (the
+database round trip), validation of the row into a model, and the expiry
+and active checks. Requests pick one of --sessions live sessions with a
+skew towards recently active ones, and --logout-every requests one
+session logs out (deleted and invalidated) and a new one logs in.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_session_cache --requests 20000 --db-ms 0.5
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.helpers.ttl_cache import TTLCache
+
+
+class Session(BaseModel):
+    # the columns verify_session reads from a sessions row
+    id: uuid.UUID
+    user_id: uuid.UUID
+    audience: str
+    is_active: bool
+    expires_at: datetime
+    last_seen_at: datetime
+    deleted_at: datetime | None = None
+
+
+def session_row(session_id) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": session_id,
+        "user_id": uuid.uuid4(),
+        "audience": "web",
+        "is_active": True,
+        "expires_at": now + timedelta(days=7),
+        "last_seen_at": now,
+        "deleted_at": None,
+    }
+
+
+def run(args, cache: TTLCache | None) -> tuple[np.ndarray, int]:
+    rng = random.Random(1)
+    store = {}
+    for _ in range(args.sessions):
+        session_id = str(uuid.uuid4())
+        store[session_id] = session_row(session_id)
+    live = list(store)
+    lookups = 0
+
+    def verify(session_id):
+        nonlocal lookups
+        session = cache.get(session_id) if cache is not None else None
+        if session is None:
+            lookups += 1
+            time.sleep(args.db_ms / 1000)
+            session = Session(**store[session_id])
+            if cache is not None and session.is_active and session.deleted_at is None:
+                cache.put(session_id, session)
+        if session.expires_at < datetime.now(timezone.utc):
+            raise RuntimeError("expired")
+        if not session.is_active or session.deleted_at is not None:
+            raise RuntimeError("inactive")
+        return session
+
+    latencies = np.empty(args.requests)
+    for request in range(args.requests):
+        if args.logout_every and request % args.logout_every == 0:
+            ended = live.pop(rng.randrange(len(live)))
+            del store[ended]
+            if cache is not None:
+                cache.invalidate(ended)
+            session_id = str(uuid.uuid4())
+            store[session_id] = session_row(session_id)
+            live.append(session_id)
+        # recently active sessions are the busiest
+        age = min(int(rng.expovariate(5 / len(live))), len(live) - 1)
+        started = time.perf_counter()
+        verify(live[-1 - age])
+        latencies[request] = time.perf_counter() - started
+    return latencies * 1000, lookups
+
+
+def report(label: str, latencies: np.ndarray, lookups: int):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(
+        f"{label:<14} avg {latencies.mean():7.3f} ms  p50 {p50:7.3f} ms  "
+        f"p99 {p99:7.3f} ms  {lookups} session queries"
+    )
+
+
+def main(args):
+    print(
+        f"{args.requests} requests over {args.sessions} sessions, "
+        f"{args.db_ms} ms per session query, ttl {args.ttl} s"
+    )
+    latencies, lookups = run(args, None)
+    report("no cache", latencies, lookups)
+    cache = TTLCache(args.ttl, args.size)
+    latencies, lookups = run(args, cache)
+    report("session cache", latencies, lookups)
+    stats = cache.stats()
+    print(
+        f"hit rate {stats['hit_rate']:.1%}, {stats['evictions']} evictions, "
+        f"{stats['expired']} expired, {stats['invalidations']} invalidations"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--db-ms", type=float, default=0.5)
+    parser.add_argument("--ttl", type=float, default=15.0, help="seconds")
+    parser.add_argument("--size", type=int, default=10000, help="cache entries")
+    parser.add_argument("--logout-every", type=int, default=100)
+    main(parser.parse_args())
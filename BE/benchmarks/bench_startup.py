@@ -0,0 +1,82 @@
+"""
+Worker startup cost: `import app` time and time to first request.
+
+  import      - `import app` in a fresh interpreter, repeated --runs times
+  first hit   - from launching uvicorn to the first 200 from GET /, which
+                includes the import, app startup and the first request
+
+Neither needs a database now that engines are built lazily; run it with the
+database stopped to confirm startup does not depend on it.
+
+Usage (from BE/):
+    python -m benchmarks.bench_startup --runs 5 --port 8765
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_request_seconds(port: int, timeout: float) -> float:
+    url = f"http://127.0.0.1:{port}/"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"no response from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(name: str, samples: list[float]):
+    ms = [sample * 1000 for sample in samples]
+    print(
+        f"{name:<14} median {statistics.median(ms):8.1f}ms"
+        f"   min {min(ms):8.1f}ms   max {max(ms):8.1f}ms"
+    )
+
+
+def main(args):
+    report("import app", [import_seconds() for _ in range(args.runs)])
+    report(
+        "first request",
+        [first_request_seconds(args.port, args.timeout) for _ in range(args.runs)],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    main(parser.parse_args())
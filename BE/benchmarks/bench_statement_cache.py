@@ -0,0 +1,110 @@
+"""
+Per-call statement overhead of the hot lookup queries, before and after
+moving them to prebuilt bindparam statements.
+
+For each query it measures, without touching the database:
+  rebuilt  - constructing the select() on every call plus the cache key
+             SQLAlchemy derives from it to look up the compiled SQL
+  prebuilt - the cache key lookup on the module-level statement (memoized)
+  compile  - a full compile, i.e. what a compiled-cache miss costs
+
+Usage (from BE/):
+    python -m benchmarks.bench_statement_cache --calls 20000
+"""
+
+import argparse
+import timeit
+import uuid
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects import postgresql
+
+from src.admins.query import get_user_by_email_stmt as admin_by_email_stmt
+from src.admins.schema import admin
+from src.drivers.query import get_user_by_id_stmt as driver_by_id_stmt
+from src.drivers.schema import driver
+
+try:
+    from src.authorizations.roles import (
+        admin_role_join_table,
+        admins,
+        get_admin_role_permissions_stmt,
+        permissions,
+        roles,
+    )
+except ImportError as e:
+    # the role and permission tables are not defined in every checkout
+    roles_unavailable = e
+else:
+    roles_unavailable = None
+
+
+def rebuilt_admin_by_email():
+    return select(admin).where(
+        and_(admin.c.email == "someone@example.com", admin.c.is_deleted.is_(False))
+    )
+
+
+def rebuilt_driver_by_id():
+    return select(driver).where(
+        and_(driver.c.id == uuid.uuid4(), driver.c.is_deleted.is_(False))
+    )
+
+
+def rebuilt_admin_role_permissions():
+    return (
+        select(
+            admins,
+            func.jsonb_agg(
+                func.jsonb_build_object(
+                    "id", roles.c.id, "name", roles.c.name, "alias", roles.c.alias
+                )
+            )
+            .op("->")(0)
+            .label("roles"),
+            func.array_agg(func.distinct(permissions.c.slug))
+            .filter(permissions.c.id.isnot(None))
+            .label("permissions"),
+        )
+        .select_from(admin_role_join_table)
+        .where(admins.c.id == uuid.uuid4())
+        .group_by(admins.c.id)
+    )
+
+
+HOT_QUERIES = [
+    ("AdminQueries.get_user_by_email", rebuilt_admin_by_email, admin_by_email_stmt),
+    ("DriverQueries.get_user_by_id", rebuilt_driver_by_id, driver_by_id_stmt),
+]
+if roles_unavailable is None:
+    HOT_QUERIES.append(
+        (
+            "RoleQueries.get_admin_role_permissions",
+            rebuilt_admin_role_permissions,
+            get_admin_role_permissions_stmt,
+        )
+    )
+
+
+def per_call_us(fn, calls: int) -> float:
+    return timeit.timeit(fn, number=calls) / calls * 1e6
+
+
+def main(args):
+    dialect = postgresql.dialect()
+    print(f"{'query':<42}{'rebuilt':>12}{'prebuilt':>12}{'compile':>12}  (us/call)")
+    for name, rebuild, prebuilt in HOT_QUERIES:
+        rebuilt_us = per_call_us(lambda: rebuild()._generate_cache_key(), args.calls)
+        prebuilt_us = per_call_us(lambda: prebuilt._generate_cache_key(), args.calls)
+        compile_us = per_call_us(
+            lambda: prebuilt.compile(dialect=dialect), max(args.calls // 10, 1)
+        )
+        print(f"{name:<42}{rebuilt_us:>12.2f}{prebuilt_us:>12.2f}{compile_us:>12.2f}")
+    if roles_unavailable is not None:
+        print(f"RoleQueries.get_admin_role_permissions skipped: {roles_unavailable}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,99 @@
+"""
+Nearest-stop lookups on the in-memory grid index vs a full scan.
+
+Builds --stops random stops over a ~50 km square and times k-nearest and
+radius queries from random points, plus the cost of an incremental update
+(one stop moved) against a rebuild of the whole index.
+
+Usage (from BE/, no database needed):
+    python -m benchmarks.bench_stop_index --stops 50000 --queries 2000
+"""
+
+import argparse
+import heapq
+import random
+import time
+import uuid
+
+from src.helpers.geo import haversine_m
+from src.stops.index import StopIndex
+
+SOUTH, WEST, SPAN = 31.75, 35.70, 0.45
+
+
+def random_point() -> tuple[float, float]:
+    return SOUTH + random.random() * SPAN, WEST + random.random() * SPAN
+
+
+def make_stops(count: int) -> list[dict]:
+    stops = []
+    for index in range(count):
+        latitude, longitude = random_point()
+        stops.append(
+            {
+                "id": uuid.uuid4(),
+                "route_id": None,
+                "name": f"Stop {index}",
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+        )
+    return stops
+
+
+def scan_nearest(stops, latitude, longitude, k):
+    return heapq.nsmallest(
+        k,
+        stops,
+        key=lambda stop: haversine_m(
+            latitude, longitude, stop["latitude"], stop["longitude"]
+        ),
+    )
+
+
+def per_query_us(fn, points) -> float:
+    started = time.perf_counter()
+    for latitude, longitude in points:
+        fn(latitude, longitude)
+    return (time.perf_counter() - started) / len(points) * 1e6
+
+
+def main(args):
+    stops = make_stops(args.stops)
+    started = time.perf_counter()
+    index = StopIndex()
+    for stop in stops:
+        index.upsert(stop)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    points = [random_point() for _ in range(args.queries)]
+    nearest_us = per_query_us(lambda la, lo: index.nearest(la, lo, args.k), points)
+    within_us = per_query_us(lambda la, lo: index.within(la, lo, args.radius), points)
+    scan_us = per_query_us(
+        lambda la, lo: scan_nearest(stops, la, lo, args.k), points[:20]
+    )
+
+    moved = dict(stops[0])
+    started = time.perf_counter()
+    for _ in range(1000):
+        moved["latitude"], moved["longitude"] = random_point()
+        index.upsert(moved)
+    update_us = (time.perf_counter() - started) / 1000 * 1e6
+
+    print(f"{args.stops} stops, index built in {build_ms:.0f}ms")
+    print(f"k-nearest (k={args.k})      {nearest_us:10.1f} us/query")
+    print(f"radius ({args.radius:.0f} m)         {within_us:10.1f} us/query")
+    print(f"full scan (k={args.k})      {scan_us:10.1f} us/query")
+    print(
+        f"incremental update       {update_us:10.1f} us/stop "
+        f"(rebuild {build_ms:.0f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stops", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=500.0)
+    main(parser.parse_args())
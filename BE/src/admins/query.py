@@ -1,58 +1,68 @@
-from sqlalchemy import select, insert, update, delete, and_
-from src.database.schema import admin
-from src.authentications.hash import HashHelper
-from src.database.execution import db_client
+from sqlalchemy import select, insert, update, delete, and_, bindparam
+from src.admins.schema import admin
+from src.authentications.hash import password_hasher
+from src.database.execution import AsyncDBClient, async_db_client
 from src.admins.model import AdminCreate
 from uuid import UUID
 from datetime import datetime
 
 
+# Hot lookups, prebuilt with bind parameters (see COMPILED_CACHE_SIZE)
+get_user_by_id_stmt = select(admin).where(
+    and_(admin.c.id == bindparam("user_id"), admin.c.is_deleted.is_(False))
+)
+get_user_by_email_stmt = select(admin).where(
+    and_(admin.c.email == bindparam("email"), admin.c.is_deleted.is_(False))
+)
+
+
 class AdminQueries:
-    def __init__(self):
-        self.db_client = db_client
-        self.hash_helper = HashHelper()
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        # pass the request's unit of work to share its connection/transaction
+        self.db_client = db_client or async_db_client
+        self.hash_helper = password_hasher
 
-    def create_user(self, user_data: AdminCreate):
+    async def create_user(self, user_data: AdminCreate):
         data = dict(user_data.model_dump(exclude_unset=True))
-        data["password"] = self.hash_helper.hash_password(data["password"])
+        data["password"] = await self.hash_helper.hash_password(data["password"])
 
         stmt = insert(admin).values(**data).returning(admin)
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def get_user_by_id(self, user_id: UUID):
-        stmt = select(admin).where(and_(admin.c.id == user_id, not admin.c.is_deleted))
-        result = self.db_client.execute_one(stmt)
+    async def get_user_by_id(self, user_id: UUID):
+        result = await self.db_client.execute_one(
+            get_user_by_id_stmt, {"user_id": user_id}
+        )
         return result
 
-    def get_user_by_email(self, email: str):
-        stmt = select(admin).where(
-            and_(admin.c.email == email, admin.c.is_deleted.is_(False))
+    async def get_user_by_email(self, email: str):
+        result = await self.db_client.execute_one(
+            get_user_by_email_stmt, {"email": email}
         )
-        result = self.db_client.execute_one(stmt)
         return result
 
-    def update_user(self, user_id: UUID, update_data: dict):
+    async def update_user(self, user_id: UUID, update_data: dict):
         stmt = (
             update(admin)
             .where(admin.c.id == user_id)
             .values(**update_data)
             .returning(admin)
         )
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def soft_delete(self, user_id: UUID):
+    async def soft_delete(self, user_id: UUID):
         stmt = (
             update(admin)
             .where(admin.c.id == user_id)
             .values(is_deleted=True, is_active=False, deleted_at=datetime.now())
             .returning(admin)
         )
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def hard_delete_user_by_id(self, user_id: UUID):
+    async def hard_delete_user_by_id(self, user_id: UUID):
         stmt = delete(admin).where(admin.c.id == user_id).returning(admin)
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
@@ -1,15 +1,25 @@
 from fastapi import APIRouter, Depends
 from src.admins.model import AdminCreate, AdminResponse
+from src.admins.query import AdminQueries
 from src.admins.service import AdminService
 from uuid import UUID
 from fastapi.responses import JSONResponse
+from src.database.execution import AsyncDBClient
+from src.database.unit_of_work import get_unit_of_work
 
 
 router = APIRouter(prefix="/admins", tags=["Admins"])
 
 
-def get_admin_service():
-    return AdminService()
+def get_admin_service(
+    uow: AsyncDBClient = Depends(get_unit_of_work, scope="function"),
+):
+    return AdminService(AdminQueries(uow))
+
+
+def get_admin_reader():
+    # read-only endpoints: no unit of work, so their reads may use a replica
+    return AdminService(AdminQueries())
 
 
 @router.post("/", response_model=AdminResponse)
@@ -24,7 +34,7 @@ async def register_admin(
 @router.get("/{admin_id}", response_model=AdminResponse)
 async def get_admin(
     admin_id: UUID,
-    service: AdminService = Depends(get_admin_service),
+    service: AdminService = Depends(get_admin_reader),
 ):
     status_code, admin_data = await service.get_admin_by_id(admin_id)
     return JSONResponse(content=admin_data, status_code=status_code)
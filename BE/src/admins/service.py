@@ -11,13 +11,13 @@ class AdminService:
 
     async def create_user(self, admin_data: AdminCreate):
         # check admin by email
-        existing_admin = self.queries.get_user_by_email(admin_data.email)
+        existing_admin = await self.queries.get_user_by_email(admin_data.email)
         if existing_admin:
             message = {"detail": "Admin already exists"}
             return status.HTTP_409_CONFLICT, jsonable_encoder(message)
         # new admin creation
         try:
-            admin = self.queries.create_user(admin_data)
+            admin = await self.queries.create_user(admin_data)
             if not admin:
                 message = {"detail": "Could not create admin"}
                 return status.HTTP_400_BAD_REQUEST, jsonable_encoder(message)
@@ -28,17 +28,18 @@ class AdminService:
             raise
         except Exception as e:
             print(f"Error creating admin: {e}")
+            await self.queries.db_client.rollback()
             return status.HTTP_500_INTERNAL_SERVER_ERROR, None
 
     async def get_admin_by_id(self, admin_id: UUID):
-        admin = self.queries.get_user_by_id(admin_id)
+        admin = await self.queries.get_user_by_id(admin_id)
         if not admin:
             return None
         return AdminResponse(**admin)
 
     async def update_admin(self, admin_id: UUID, update_data: dict):
         try:
-            admin = self.queries.update_user(admin_id, update_data)
+            admin = await self.queries.update_user(admin_id, update_data)
             if not admin:
                 return None
             return AdminResponse(**admin)
@@ -48,7 +49,7 @@ class AdminService:
 
     async def delete_admin(self, admin_id: UUID):
         try:
-            admin = self.queries.delete(admin_id)
+            admin = await self.queries.soft_delete(admin_id)
             if not admin:
                 return None
             return AdminResponse(**admin)
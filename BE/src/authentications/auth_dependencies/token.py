@@ -19,6 +19,7 @@ from src.authentications.model import (
     UserToken,
     UserTokenData,
 )
+from src.authentications.session_cache import session_cache
 from src.helpers.build_object import Helpers
 from src.sessions.models import SessionRequest, SessionResponse
 from src.sessions.queries import SessionQueries
@@ -572,17 +573,22 @@ class AuthToken:
         return tokens
 
     def verify_session(self, session_id: str) -> SessionResponse:
-        session = self.session_queries.get_session_by_id(UUID(session_id))
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Session not found or has been terminated. Please log in again.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        session_data = SessionResponse(**session)
+        # a verified session is served from the cache until its short TTL
+        session_data = session_cache.get(session_id)
+        if session_data is None:
+            session = self.session_queries.get_session_by_id(UUID(session_id))
+            if not session:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Session not found or has been terminated. Please log in again.",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            session_data = SessionResponse(**session)
+            if session_data.is_active and session_data.deleted_at is None:
+                session_cache.put(session_id, session_data)
         expires_at = session_data.expires_at.replace(tzinfo=timezone.utc)
         if expires_at < datetime.now(timezone.utc):
-            self.session_queries.delete_session_by_id(session_id)
+            self.revoke_session(session_id)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Session has expired. Please log in again.",
@@ -594,9 +600,16 @@ class AuthToken:
                 detail="Session is inactive. Please log in again.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        return session_data
 
-        session_response = SessionResponse(**session)
-        return session_response
+    def revoke_session(self, session_id: str):
+        """
+        End a session (logout, account or session deletion, expiry). Logout
+        and delete handlers must call this rather than the session queries
+        directly, so the session also leaves the verification cache.
+        """
+        self.session_queries.delete_session_by_id(session_id)
+        session_cache.invalidate(session_id)
 
     def get_jwt_payload(self, token, audience: str):
         try:
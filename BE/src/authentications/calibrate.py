@@ -0,0 +1,127 @@
+"""
+Calibration of the argon2id password hashing cost for this machine.
+
+Memory cost is chosen first, as the largest power of two up to --max-memory-mb
+that hashes within the latency budget at one pass. Passes (time cost) are
+then added while the median hash still fits. Hash time and the process's
+peak memory are measured for each candidate. Run it on the production host
+type and copy the printed AUTH_ARGON2_* values into the environment;
+existing hashes are upgraded on their owners' next login.
+
+Run once (from BE/):
+    python -m src.authentications.calibrate --budget-ms 250 --max-memory-mb 64
+"""
+
+import argparse
+import resource
+import statistics
+import time
+
+from passlib.hash import argon2
+
+from src.utils.config import settings
+
+# Below this argon2 gives too little resistance to GPU cracking to be worth it
+MIN_MEMORY_KIB = 8 * 1024
+SAMPLE_PASSWORD = "calibration password 0123456789"
+
+
+def peak_rss_kib() -> int:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> dict:
+    """Median hash time (ms) and peak memory growth (KiB) of one parameter set."""
+    hasher = argon2.using(
+        time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism
+    )
+    rss_before = peak_rss_kib()
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_kib,
+        "parallelism": parallelism,
+        "median_ms": round(statistics.median(timings), 1),
+        "peak_rss_growth_kib": peak_rss_kib() - rss_before,
+    }
+
+
+def calibrate(
+    budget_ms: float, max_memory_kib: int, parallelism: int, samples: int
+) -> tuple[dict | None, list[dict]]:
+    """The strongest parameters within budget_ms, and every measurement."""
+    trials = []
+    chosen = None
+    # increasing memory, so the peak RSS growth of each trial is its own
+    memory_kib = MIN_MEMORY_KIB
+    while memory_kib <= max_memory_kib:
+        trial = measure(1, memory_kib, parallelism, samples)
+        trials.append(trial)
+        if trial["median_ms"] > budget_ms:
+            break
+        chosen = trial
+        memory_kib *= 2
+    if chosen is None:
+        return None, trials
+    time_cost = 2
+    while True:
+        trial = measure(time_cost, chosen["memory_cost"], parallelism, samples)
+        trials.append(trial)
+        if trial["median_ms"] > budget_ms:
+            break
+        chosen = trial
+        time_cost += 1
+    return chosen, trials
+
+
+def main(args):
+    max_memory_kib = int(args.max_memory_mb * 1024)
+    chosen, trials = calibrate(
+        args.budget_ms, max_memory_kib, args.parallelism, args.samples
+    )
+    for trial in trials:
+        print(
+            f"t={trial['time_cost']} m={trial['memory_cost'] // 1024} MiB "
+            f"p={trial['parallelism']}: {trial['median_ms']} ms, "
+            f"peak memory +{trial['peak_rss_growth_kib'] // 1024} MiB"
+        )
+    current = measure(
+        settings.auth.ARGON2_TIME_COST,
+        settings.auth.ARGON2_MEMORY_COST,
+        settings.auth.ARGON2_PARALLELISM,
+        args.samples,
+    )
+    print(
+        f"current t={current['time_cost']} m={current['memory_cost'] // 1024} MiB "
+        f"p={current['parallelism']}: {current['median_ms']} ms"
+    )
+    if chosen is None:
+        print(
+            f"Even {MIN_MEMORY_KIB // 1024} MiB at one pass takes longer than "
+            f"{args.budget_ms} ms here; raise the budget or add CPU."
+        )
+        return
+    workers = settings.auth.HASH_CONCURRENCY
+    print(
+        f"\n{chosen['median_ms']} ms per hash; {workers} concurrent hashes need "
+        f"{workers * chosen['memory_cost'] // 1024} MiB\n"
+        f"AUTH_ARGON2_TIME_COST={chosen['time_cost']}\n"
+        f"AUTH_ARGON2_MEMORY_COST={chosen['memory_cost']}\n"
+        f"AUTH_ARGON2_PARALLELISM={chosen['parallelism']}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick argon2 parameters that meet a latency budget."
+    )
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--max-memory-mb", type=float, default=64.0)
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=5)
+    main(parser.parse_args())
@@ -1,9 +1,29 @@
+import asyncio
 import hashlib
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-# Configure password hashing context
-_pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+from src.database.instrumentation import LatencyHistogram
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# New hashes use argon2 with the calibrated parameters (see
+# src/authentications/calibrate.py); bcrypt hashes still verify, and are
+# replaced, like argon2 hashes with other parameters, on the next login.
+_pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.auth.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.auth.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.auth.ARGON2_PARALLELISM,
+)
 
 
 class HashHelper:
@@ -35,3 +55,128 @@ class HashHelper:
             if len(plain_password.encode("utf-8")) > 72:
                 plain_password = hashlib.sha256(plain_password.encode()).hexdigest()
         return _pwd_context.verify(plain_password, hashed_password)
+
+    @staticmethod
+    def verify_and_update(plain_password: str, hashed_password: str):
+        """
+        Verify a password and, when its hash is bcrypt or uses outdated
+        argon2 parameters, hash it again with the current ones.
+        Returns (valid, new hash or None).
+        """
+        if not HashHelper.verify_password(plain_password, hashed_password):
+            return False, None
+        # the new argon2 hash takes the raw password, never the bcrypt prehash
+        if _pwd_context.needs_update(hashed_password):
+            return True, HashHelper.hash_password(plain_password)
+        return True, None
+
+
+class PasswordHasher:
+    """
+    Async front for HashHelper: hashing and verification run in a process
+    pool, so a burst of logins costs CPU in the workers instead of blocking
+    the event loop.
+
+    At most `concurrency` jobs run at once and up to `max_queue` more wait
+    their turn; past that, requests are refused with 503 and Retry-After
+    rather than queueing without bound.
+    """
+
+    def __init__(self, concurrency: int | None = None, max_queue: int | None = None):
+        self.concurrency = concurrency or settings.auth.HASH_CONCURRENCY
+        self.max_queue = (
+            settings.auth.HASH_MAX_QUEUE if max_queue is None else max_queue
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self.waiting = 0
+        self.running = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_latency = LatencyHistogram()
+        self.run_latency = LatencyHistogram()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # workers start on first use, not at import; spawned rather than
+        # forked, so they don't inherit the server's threads and sockets
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _run(self, function, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in attempts right now. Please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.wait_latency.observe((started_at - queued_at) * 1000)
+        self.running += 1
+        pool = self.pool
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, function, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. out of memory): start a fresh pool next time.
+            # Jobs that shared the broken pool fail too; only the first one
+            # to get here shuts it down.
+            if self._pool is pool:
+                logger.warning("Password hashing worker died; restarting the pool")
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+            self.completed += 1
+            self.run_latency.observe((time.perf_counter() - started_at) * 1000)
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(HashHelper.hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            HashHelper.verify_password, plain_password, hashed_password
+        )
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        return await self._run(
+            HashHelper.verify_and_update, plain_password, hashed_password
+        )
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait": self.wait_latency.snapshot(),
+            "run": self.run_latency.snapshot(),
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
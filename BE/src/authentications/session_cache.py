@@ -0,0 +1,9 @@
+from src.helpers.ttl_cache import TTLCache
+from src.utils.config import settings
+
+# Verified sessions by session id. Only active sessions are stored, and
+# verify_session still checks expires_at on every hit; logout and deletion
+# invalidate through AuthToken.revoke_session.
+session_cache = TTLCache(
+    settings.auth.SESSION_CACHE_TTL_SECONDS, settings.auth.SESSION_CACHE_SIZE
+)
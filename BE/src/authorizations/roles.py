@@ -1,29 +1,60 @@
 from uuid import UUID
 
 
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, select
 
 
 from src.admins.schemas import admins
 from src.authorization.models import AdminRoleRequest, RolePermissionRequest
 from src.authorization.schemas import admin_role, permissions, role_permissions, roles
 from src.database.client import db_client
+from src.helpers.ttl_cache import TTLCache
+from src.utils.config import settings
+
+
+join_table = roles.outerjoin(
+    role_permissions, roles.c.id == role_permissions.c.role_id
+).outerjoin(permissions, role_permissions.c.permission_id == permissions.c.id)
+admin_role_join_table = (
+    admins.outerjoin(admin_role, admins.c.id == admin_role.c.admin_id)
+    .outerjoin(roles, admin_role.c.role_id == roles.c.id)
+    .outerjoin(role_permissions, roles.c.id == role_permissions.c.role_id)
+    .outerjoin(permissions, role_permissions.c.permission_id == permissions.c.id)
+)
+
+# Runs on every admin request through CheckPermission, so it is built once
+# with a bind parameter and its cache key / compiled SQL are reused.
+get_admin_role_permissions_stmt = (
+    select(
+        admins,
+        func.jsonb_agg(
+            func.jsonb_build_object(
+                "id", roles.c.id, "name", roles.c.name, "alias", roles.c.alias
+            )
+        )
+        .op("->")(0)
+        .label("roles"),
+        func.array_agg(func.distinct(permissions.c.slug))
+        .filter(permissions.c.id.isnot(None))
+        .label("permissions"),
+    )
+    .select_from(admin_role_join_table)
+    .where(admins.c.id == bindparam("admin_id"))
+    .group_by(admins.c.id)
+)
+
+# Permission slugs of each admin, by admin id. Written through the role
+# queries below, which invalidate what they change.
+admin_permissions = TTLCache(
+    settings.auth.PERMISSION_CACHE_TTL_SECONDS, settings.auth.PERMISSION_CACHE_SIZE
+)
 
 
 class RoleQueries:
     def __init__(self):
         self.db_client = db_client
-        self.join_table = roles.outerjoin(
-            role_permissions, roles.c.id == role_permissions.c.role_id
-        ).outerjoin(permissions, role_permissions.c.permission_id == permissions.c.id)
-        self.admin_role_join_table = (
-            admins.outerjoin(admin_role, admins.c.id == admin_role.c.admin_id)
-            .outerjoin(roles, admin_role.c.role_id == roles.c.id)
-            .outerjoin(role_permissions, roles.c.id == role_permissions.c.role_id)
-            .outerjoin(
-                permissions, role_permissions.c.permission_id == permissions.c.id
-            )
-        )
+        self.join_table = join_table
+        self.admin_role_join_table = admin_role_join_table
 
     def get_roles(self):
         query = roles.select()
@@ -31,30 +62,22 @@ class RoleQueries:
         return rows
 
     def get_admin_role_permissions(self, admin_id: UUID):
-        query = (
-            select(
-                admins,
-                func.jsonb_agg(
-                    func.jsonb_build_object(
-                        "id", roles.c.id, "name", roles.c.name, "alias", roles.c.alias
-                    )
-                )
-                .op("->")(0)
-                .label("roles"),
-                func.array_agg(func.distinct(permissions.c.slug))
-                .filter(permissions.c.id.isnot(None))
-                .label("permissions"),
-            )
-            .select_from(self.admin_role_join_table)
-            .where(admins.c.id == admin_id)
-            .group_by(admins.c.id)
+        row = self.db_client.execute_one(
+            get_admin_role_permissions_stmt, {"admin_id": admin_id}
         )
-
-        row = self.db_client.execute_one(query)
         if not row:
             return None
         return row
 
+    def get_admin_permission_set(self, admin_id: UUID) -> frozenset[str]:
+        """The admin's permission slugs; the role join runs on a cache miss."""
+        granted = admin_permissions.get(admin_id)
+        if granted is None:
+            row = self.get_admin_role_permissions(admin_id)
+            granted = frozenset(row["permissions"] or []) if row else frozenset()
+            admin_permissions.put(admin_id, granted)
+        return granted
+
     def get_role_by_id(self, role_id: UUID):
         # Build query to join roles with permissions through role_permissions
         query = (
@@ -114,14 +137,20 @@ class RoleQueries:
             .returning(role_permissions)
         )
         row = self.db_client.execute_one(query)
+        # any number of admins hold the role
+        admin_permissions.clear()
         return row
 
     def insert_admin_role(self, admin_role_data: AdminRoleRequest):
         query = admin_role.insert().values(dict(admin_role_data)).returning(admin_role)
         row = self.db_client.execute_one(query)
+        if row:
+            admin_permissions.invalidate(row["admin_id"])
         return row
 
     def delete_admin_role(self, id: UUID):
         query = admin_role.delete().where(admin_role.c.id == id).returning(admin_role)
         rows = self.db_client.execute_one(query)
+        if rows:
+            admin_permissions.invalidate(rows["admin_id"])
         return rows
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from uuid import UUID
+
+from src.utils.config import settings
+
+
+class Subscription:
+    """
+    One connected client. Pending updates are kept per trip, so a client that
+    falls behind only ever receives the newest position of each bus: an
+    update that is overwritten before it was sent is dropped, not queued.
+    """
+
+    def __init__(self, route_id: UUID, max_pending: int):
+        self.route_id = route_id
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.delivered = 0
+        self._pending: dict[str, str] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, trip_id: str, message: str):
+        if trip_id in self._pending:
+            self.dropped += 1
+        elif len(self._pending) >= self.max_pending:
+            # more buses than slots: evict the oldest pending update
+            del self._pending[next(iter(self._pending))]
+            self.dropped += 1
+        self._pending[trip_id] = message
+        self._ready.set()
+
+    async def next_batch(self, timeout: float | None = None) -> list[str]:
+        """Wait for updates and take all of them; [] if `timeout` passes."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        self.delivered += len(batch)
+        return batch
+
+
+class PositionHub:
+    """
+    Fans live positions out to the WebSocket/SSE subscribers of a route.
+    Each update is serialized once, whatever the number of subscribers;
+    fan-out is then one dict assignment per subscriber.
+
+    The hub is per process: run push endpoints on the workers that ingest,
+    or with a single worker.
+    """
+
+    def __init__(self, max_pending: int | None = None):
+        self.max_pending = max_pending or settings.tracking.PUSH_MAX_PENDING
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self.published = 0
+
+    def subscribe(self, route_id: UUID) -> Subscription:
+        subscription = Subscription(route_id, self.max_pending)
+        self._subscribers.setdefault(route_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.route_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.route_id]
+
+    def publish(self, route_id: UUID, position: dict) -> int:
+        """Queue `position` (JSON-ready) for every subscriber of the route."""
+        subscribers = self._subscribers.get(route_id)
+        if not subscribers:
+            return 0
+        message = encode_update(position)
+        trip_id = position["trip_id"]
+        for subscription in subscribers:
+            subscription.offer(trip_id, message)
+        self.published += 1
+        return len(subscribers)
+
+    def stats(self) -> dict:
+        subscriptions = [
+            subscription
+            for subscribers in self._subscribers.values()
+            for subscription in subscribers
+        ]
+        return {
+            "routes": len(self._subscribers),
+            "subscribers": len(subscriptions),
+            "published": self.published,
+            "delivered": sum(s.delivered for s in subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
+
+
+def encode_update(position: dict) -> str:
+    return json.dumps({"type": "position", "position": position})
+
+
+def encode_snapshot(route_id: UUID, positions: list[dict]) -> str:
+    return json.dumps(
+        {"type": "snapshot", "route_id": str(route_id), "positions": positions}
+    )
+
+
+position_hub = PositionHub()
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+
+from src.utils.config import settings
+
+
+class LivePositionStore:
+    """
+    Process-local latest position per trip, indexed by route and bus, so
+    "where is my bus" polls are answered without a query.
+
+    The ingestion path writes through on every batch. An entry expires once
+    its bus has not reported for `ttl` seconds. The first read after start-up
+    rehydrates the store from `trips` (latest lat/lng of running trips).
+
+    The store is per process and only sees the fixes its own worker ingests:
+    with several workers, a bus whose batches go to another worker keeps
+    the position loaded at rehydration until it expires. Serve live reads
+    from the workers that ingest, or run a single worker.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl or settings.tracking.LIVE_TTL_SECONDS
+        # trip_id -> (seen_at monotonic, recorded_at, bus_id, route_id,
+        # JSON-ready position)
+        self._by_trip: dict[UUID, tuple] = {}
+        self._by_route: dict[UUID, set[UUID]] = {}
+        self._by_bus: dict[UUID, UUID] = {}
+        self._last_sweep = time.monotonic()
+        self._hydrated = False
+        self._hydrate_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_trip)
+
+    def update(
+        self,
+        trip_id: UUID,
+        bus_id: UUID | None,
+        route_id: UUID | None,
+        latitude: float,
+        longitude: float,
+        recorded_at: datetime,
+        speed: float | None = None,
+        heading: float | None = None,
+        seen_at: float | None = None,
+    ) -> dict | None:
+        """Store a newer position; returns it, or None if it was stale."""
+        seen_at = seen_at or time.monotonic()
+        current = self._by_trip.get(trip_id)
+        if current is not None and current[1] >= recorded_at:
+            return None
+        position = jsonable_encoder(
+            {
+                "trip_id": trip_id,
+                "bus_id": bus_id,
+                "route_id": route_id,
+                "latitude": latitude,
+                "longitude": longitude,
+                "speed": speed,
+                "heading": heading,
+                "recorded_at": recorded_at,
+            }
+        )
+        self._by_trip[trip_id] = (seen_at, recorded_at, bus_id, route_id, position)
+        if route_id is not None:
+            self._by_route.setdefault(route_id, set()).add(trip_id)
+        if bus_id is not None:
+            self._by_bus[bus_id] = trip_id
+        if seen_at - self._last_sweep > self.ttl:
+            self.evict_expired(seen_at)
+        return position
+
+    def remove(self, trip_id: UUID):
+        entry = self._by_trip.pop(trip_id, None)
+        if entry is None:
+            return
+        _, _, bus_id, route_id, _ = entry
+        trips = self._by_route.get(route_id)
+        if trips is not None:
+            trips.discard(trip_id)
+            if not trips:
+                del self._by_route[route_id]
+        if bus_id is not None and self._by_bus.get(bus_id) == trip_id:
+            del self._by_bus[bus_id]
+
+    def evict_expired(self, current: float | None = None) -> int:
+        current = current or time.monotonic()
+        expired = [
+            trip_id
+            for trip_id, entry in self._by_trip.items()
+            if current - entry[0] > self.ttl
+        ]
+        for trip_id in expired:
+            self.remove(trip_id)
+        self._last_sweep = current
+        return len(expired)
+
+    def _live(self, trip_id: UUID, current: float) -> dict | None:
+        entry = self._by_trip.get(trip_id)
+        if entry is None:
+            return None
+        if current - entry[0] > self.ttl:
+            self.remove(trip_id)
+            return None
+        return entry[4]
+
+    def get_trip(self, trip_id: UUID) -> dict | None:
+        return self._live(trip_id, time.monotonic())
+
+    def get_bus(self, bus_id: UUID) -> dict | None:
+        trip_id = self._by_bus.get(bus_id)
+        return self._live(trip_id, time.monotonic()) if trip_id else None
+
+    def for_route(self, route_id: UUID) -> list[dict]:
+        current = time.monotonic()
+        positions = []
+        for trip_id in list(self._by_route.get(route_id, ())):
+            position = self._live(trip_id, current)
+            if position is not None:
+                positions.append(position)
+        return positions
+
+    async def ensure_hydrated(self, load):
+        """
+        Fill the store once from `load(since)`, an awaitable returning trip
+        rows (id, bus_id, route_id, latitude, longitude, current_time) with a
+        fix newer than `since`. Concurrent first readers share one load.
+        """
+        if self._hydrated:
+            return
+        async with self._hydrate_lock:
+            if self._hydrated:
+                return
+            utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = await load(utc_now - timedelta(seconds=self.ttl))
+            current = time.monotonic()
+            for row in rows:
+                # age the entry by how long ago its last fix was recorded
+                age = (utc_now - row["current_time"]).total_seconds()
+                self.update(
+                    row["id"],
+                    row["bus_id"],
+                    row["route_id"],
+                    row["latitude"],
+                    row["longitude"],
+                    row["current_time"],
+                    seen_at=current - max(age, 0.0),
+                )
+            self._hydrated = True
+
+
+live_positions = LivePositionStore()
@@ -0,0 +1,33 @@
+from sqlalchemy import select, and_, bindparam
+from src.database.schema import trips
+from src.database.execution import AsyncDBClient, async_db_client
+from datetime import datetime
+
+
+# Running trips with a recent fix, used to rehydrate the live position store
+get_live_trips_stmt = select(
+    trips.c.id,
+    trips.c.bus_id,
+    trips.c.route_id,
+    trips.c.latitude,
+    trips.c.longitude,
+    trips.c.current_time,
+).where(
+    and_(
+        trips.c.status.in_(["in_progress", "delayed"]),
+        trips.c.deleted_at.is_(None),
+        trips.c.latitude.isnot(None),
+        trips.c.current_time >= bindparam("since"),
+    )
+)
+
+
+class BusLocationQueries:
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        self.db_client = db_client or async_db_client
+
+    async def get_live_trips(self, since: datetime):
+        result = await self.db_client.execute_all(
+            get_live_trips_stmt, {"since": since}
+        )
+        return result or []
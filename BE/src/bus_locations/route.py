@@ -0,0 +1,83 @@
+import asyncio
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
+from src.bus_locations.hub import position_hub
+from src.bus_locations.live import live_positions
+from src.bus_locations.query import BusLocationQueries
+from src.bus_locations.service import BusLocationService
+from src.utils.config import settings
+from uuid import UUID
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+router = APIRouter(prefix="/bus-locations", tags=["Bus Locations"])
+
+
+def get_bus_location_service():
+    # no unit of work: live reads must not check out a connection
+    return BusLocationService(live_positions, BusLocationQueries(), position_hub)
+
+
+@router.get("/routes/{route_id}/live", response_model=dict)
+async def get_live_positions(
+    route_id: UUID,
+    service: BusLocationService = Depends(get_bus_location_service),
+):
+    status_code, result = await service.get_live_positions(route_id)
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.websocket("/routes/{route_id}/ws")
+async def push_live_positions(
+    websocket: WebSocket,
+    route_id: UUID,
+    service: BusLocationService = Depends(get_bus_location_service),
+):
+    # A snapshot of the route's buses, then one message per position update
+    await websocket.accept()
+    snapshot, subscription = await service.subscribe(route_id)
+
+    async def send_updates():
+        await websocket.send_text(snapshot)
+        while True:
+            for message in await subscription.next_batch():
+                await websocket.send_text(message)
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        # clients send nothing; reading only notices the disconnect
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        service.unsubscribe(subscription)
+
+
+@router.get("/routes/{route_id}/stream")
+async def stream_live_positions(
+    request: Request,
+    route_id: UUID,
+    service: BusLocationService = Depends(get_bus_location_service),
+):
+    # Server-sent events fallback for clients that cannot open a WebSocket
+    snapshot, subscription = await service.subscribe(route_id)
+    heartbeat = settings.tracking.PUSH_HEARTBEAT_SECONDS
+
+    async def events():
+        try:
+            yield f"data: {snapshot}\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(timeout=heartbeat)
+                if not batch:
+                    yield ": keep-alive\n\n"
+                for message in batch:
+                    yield f"data: {message}\n\n"
+        finally:
+            service.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,38 @@
+from src.bus_locations.hub import PositionHub, Subscription, encode_snapshot
+from src.bus_locations.live import LivePositionStore
+from src.bus_locations.query import BusLocationQueries
+from fastapi import status
+from uuid import UUID
+
+
+class BusLocationService:
+    def __init__(
+        self,
+        store: LivePositionStore,
+        queries: BusLocationQueries,
+        hub: PositionHub,
+    ):
+        self.store = store
+        self.queries = queries
+        self.hub = hub
+
+    async def get_live_positions(self, route_id: UUID):
+        # Served from memory; Postgres is only read once per process, to
+        # rehydrate the store after a cold start.
+        await self.store.ensure_hydrated(self.queries.get_live_trips)
+        positions = self.store.for_route(route_id)
+        return status.HTTP_200_OK, {"route_id": str(route_id), "buses": positions}
+
+    async def subscribe(self, route_id: UUID) -> tuple[str, Subscription]:
+        # Subscribe before taking the snapshot so no update falls in between
+        subscription = self.hub.subscribe(route_id)
+        try:
+            await self.store.ensure_hydrated(self.queries.get_live_trips)
+        except Exception:
+            self.hub.unsubscribe(subscription)
+            raise
+        snapshot = encode_snapshot(route_id, self.store.for_route(route_id))
+        return snapshot, subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.hub.unsubscribe(subscription)
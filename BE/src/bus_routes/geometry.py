@@ -0,0 +1,245 @@
+import asyncio
+import math
+import time
+from uuid import UUID
+
+from functools import cached_property
+
+import numpy as np
+
+from src.helpers.geo import (
+    METERS_PER_DEGREE,
+    cumulative_distances,
+    project_onto_polyline,
+    to_local_xy,
+)
+from src.bus_routes.matching import SegmentIndex
+from src.utils.config import settings
+
+
+class RouteGeometry:
+    """
+    The shape of a route as compact NumPy arrays: vertices in local meters
+    (float32) and the precomputed distance along the route of each vertex.
+
+    Distances map to segments by binary search over `cumulative`, so a
+    position whose rough progress is known is projected onto the segment
+    there (or its neighbours) instead of the whole shape.
+    """
+
+    def __init__(self, latitudes, longitudes, cumulative=None):
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        if len(latitudes) < 2 or len(latitudes) != len(longitudes):
+            raise ValueError("A route shape needs at least two points")
+        if cumulative is None:
+            cumulative = cumulative_distances(latitudes, longitudes)
+        self.cumulative = np.asarray(cumulative, dtype=float)
+        self.origin = (float(latitudes.mean()), float(longitudes.mean()))
+        x, y = to_local_xy(latitudes, longitudes, *self.origin)
+        self._scale_x = METERS_PER_DEGREE * math.cos(math.radians(self.origin[0]))
+        self.x = x.astype(np.float32)
+        self.y = y.astype(np.float32)
+        self.latitudes = latitudes.astype(np.float32)
+        self.longitudes = longitudes.astype(np.float32)
+
+    @classmethod
+    def from_stops(cls, stops: list[dict]) -> "RouteGeometry":
+        # fallback for routes without a shape: straight lines between stops
+        return cls(
+            [stop["latitude"] for stop in stops],
+            [stop["longitude"] for stop in stops],
+        )
+
+    @property
+    def length(self) -> float:
+        return float(self.cumulative[-1])
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.cumulative, self.x, self.y, self.latitudes, self.longitudes)
+        return sum(array.nbytes for array in arrays)
+
+    def segment_at(self, distance):
+        """Index of the segment holding each distance along the route."""
+        segment = np.searchsorted(self.cumulative, distance, side="right") - 1
+        return np.clip(segment, 0, len(self.cumulative) - 2)
+
+    def point_at(self, distance):
+        """(latitude, longitude) at each distance along the route."""
+        distance = np.clip(np.asarray(distance, dtype=float), 0.0, self.length)
+        segment = self.segment_at(distance)
+        start, end = self.cumulative[segment], self.cumulative[segment + 1]
+        t = (distance - start) / np.maximum(end - start, 1e-9)
+        latitude = self.latitudes[segment] + t * (
+            self.latitudes[segment + 1] - self.latitudes[segment]
+        )
+        longitude = self.longitudes[segment] + t * (
+            self.longitudes[segment + 1] - self.longitudes[segment]
+        )
+        return latitude, longitude
+
+    def project(self, latitudes, longitudes, start=None, end=None):
+        """
+        Project positions onto the route: (distance along, offset in meters)
+        for each. With `start`/`end` (meters along the route) only the
+        segments overlapping that stretch are considered.
+        """
+        first, last = 0, len(self.cumulative) - 1
+        if start is not None:
+            first = int(self.segment_at(start))
+        if end is not None:
+            last = int(self.segment_at(end)) + 1
+        x, y = to_local_xy(latitudes, longitudes, *self.origin)
+        along, offset, _ = project_onto_polyline(
+            x,
+            y,
+            self.x[first : last + 1],
+            self.y[first : last + 1],
+            self.cumulative[first : last + 1],
+        )
+        return along, offset
+
+    @cached_property
+    def segment_index(self) -> SegmentIndex:
+        # built on the first match, then kept with the geometry
+        return SegmentIndex(
+            self.x, self.y, self.cumulative, settings.tracking.MATCH_MAX_DISTANCE_M
+        )
+
+    def match(self, latitudes, longitudes):
+        """
+        Snap GPS fixes onto the route in one pass. Returns (latitude,
+        longitude, distance along, offset, matched) arrays; fixes further
+        than TRACKING_MATCH_MAX_DISTANCE_M from the route are not matched
+        and keep their raw coordinates.
+        """
+        x, y = to_local_xy(latitudes, longitudes, *self.origin)
+        snapped_x, snapped_y, along, offset, matched = self.segment_index.match(x, y)
+        origin_lat, origin_lng = self.origin
+        snapped_lat = np.where(
+            matched, origin_lat + snapped_y / METERS_PER_DEGREE, latitudes
+        )
+        snapped_lng = np.where(
+            matched, origin_lng + snapped_x / self._scale_x, longitudes
+        )
+        return snapped_lat, snapped_lng, along, offset, matched
+
+    def _project_on_segment(self, x: float, y: float, segment: int):
+        ax, ay = float(self.x[segment]), float(self.y[segment])
+        dx = float(self.x[segment + 1]) - ax
+        dy = float(self.y[segment + 1]) - ay
+        t = ((x - ax) * dx + (y - ay) * dy) / max(dx * dx + dy * dy, 1e-9)
+        t = min(max(t, 0.0), 1.0)
+        start, end = self.cumulative[segment], self.cumulative[segment + 1]
+        along = float(start + t * (end - start))
+        return along, math.hypot(ax + t * dx - x, ay + t * dy - y), t
+
+    def locate(self, latitude: float, longitude: float, near: float):
+        """
+        (distance along, offset) of one position given its rough progress
+        `near`: a binary search for the segment at `near`, one projection,
+        then a step to the neighbouring segment only while the position lies
+        past this one's end and the neighbour is closer.
+        """
+        origin_lat, origin_lng = self.origin
+        x = (longitude - origin_lng) * self._scale_x
+        y = (latitude - origin_lat) * METERS_PER_DEGREE
+        last = len(self.cumulative) - 2
+        segment = int(np.searchsorted(self.cumulative, near, side="right")) - 1
+        segment = min(max(segment, 0), last)
+        along, offset, t = self._project_on_segment(x, y, segment)
+        step = 1 if t >= 1.0 else -1 if t <= 0.0 else 0
+        while step and 0 <= segment + step <= last:
+            candidate = self._project_on_segment(x, y, segment + step)
+            if candidate[1] > offset:
+                break
+            segment += step
+            along, offset, t = candidate
+            if not (t >= 1.0 if step > 0 else t <= 0.0):
+                break
+        return along, offset
+
+    def progress(self, latitude: float, longitude: float, near=None) -> dict:
+        """
+        Distance travelled and remaining for one position. With `near`, the
+        last known distance along the route, this is a local search instead
+        of a scan of the whole shape.
+        """
+        if near is None:
+            along, offset = self.project(latitude, longitude)
+            along, offset = float(along[0]), float(offset[0])
+        else:
+            along, offset = self.locate(latitude, longitude, near)
+        return {
+            "travelled_m": round(along, 1),
+            "remaining_m": round(self.length - along, 1),
+            "offset_m": round(offset, 1),
+        }
+
+
+class RouteGeometryCache:
+    """
+    Per-process cache of route geometries. Writers invalidate what they
+    change once it is committed; a shape saved by another worker is seen
+    once the entry's `ttl` runs out. Routes without a shape are not cached.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        if ttl is None:
+            ttl = settings.tracking.ROUTE_GEOMETRY_TTL_SECONDS
+        self.ttl = ttl
+        # route_id -> (monotonic deadline, geometry)
+        self._geometries: dict[UUID, tuple[float, RouteGeometry]] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+        # bumped by invalidate, so a load that raced a change is not stored
+        self._versions: dict[UUID, int] = {}
+
+    def _cached(self, route_id: UUID) -> RouteGeometry | None:
+        entry = self._geometries.get(route_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._geometries.pop(route_id, None)
+            return None
+        return entry[1]
+
+    async def get(self, route_id: UUID, load) -> RouteGeometry | None:
+        """
+        The route's geometry, from `load(route_id)` on a miss: a route row
+        with shape_latitudes/shape_longitudes/shape_distances. None if the
+        route has no shape.
+        """
+        geometry = self._cached(route_id)
+        if geometry is not None:
+            return geometry
+        lock = self._locks.setdefault(route_id, asyncio.Lock())
+        async with lock:
+            geometry = self._cached(route_id)
+            if geometry is not None:
+                return geometry
+            version = self._versions.get(route_id, 0)
+            geometry = geometry_from_row(await load(route_id))
+            if (
+                geometry is not None
+                and self.ttl > 0
+                and self._versions.get(route_id, 0) == version
+            ):
+                deadline = time.monotonic() + self.ttl
+                self._geometries[route_id] = (deadline, geometry)
+            return geometry
+
+    def invalidate(self, route_id: UUID):
+        self._geometries.pop(route_id, None)
+        self._versions[route_id] = self._versions.get(route_id, 0) + 1
+
+
+def geometry_from_row(row: dict | None) -> RouteGeometry | None:
+    if not row or not row.get("shape_latitudes"):
+        return None
+    return RouteGeometry(
+        row["shape_latitudes"], row["shape_longitudes"], row["shape_distances"]
+    )
+
+
+route_geometries = RouteGeometryCache()
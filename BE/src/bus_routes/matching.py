@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class SegmentIndex:
+    """
+    Grid index over the segments of a route shape, for snapping GPS fixes.
+
+    Space (local meters) is cut into square cells of `max_distance_m`; every
+    segment is listed in each cell its bounding box, grown by that distance,
+    touches. Any segment within `max_distance_m` of a point is therefore
+    listed in the point's own cell, and only those candidates are tested.
+
+    Cells are stored as a sorted array of cell keys and a (cells, widest
+    cell) table of segment ids padded with -1, so a whole batch of fixes is
+    looked up and projected with array operations.
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        cumulative: np.ndarray,
+        max_distance_m: float,
+    ):
+        self.max_distance_m = max_distance_m
+        self.cell_m = max_distance_m
+        self.ax, self.ay = x[:-1].astype(float), y[:-1].astype(float)
+        self.dx, self.dy = np.diff(x).astype(float), np.diff(y).astype(float)
+        self.length_sq = np.maximum(self.dx**2 + self.dy**2, 1e-9)
+        self.start = cumulative[:-1]
+        self.span = np.diff(cumulative)
+
+        # cell ranges of each segment's grown bounding box
+        grow = max_distance_m
+        low_i = self._cells(np.minimum(x[:-1], x[1:]) - grow)
+        high_i = self._cells(np.maximum(x[:-1], x[1:]) + grow)
+        low_j = self._cells(np.minimum(y[:-1], y[1:]) - grow)
+        high_j = self._cells(np.maximum(y[:-1], y[1:]) + grow)
+        self.i0, self.j0 = int(low_i.min()), int(low_j.min())
+        self.columns = int(high_j.max()) - self.j0 + 1
+        self.rows = int(high_i.max()) - self.i0 + 1
+
+        cells: dict[int, list[int]] = {}
+        ranges = zip(low_i.tolist(), high_i.tolist(), low_j.tolist(), high_j.tolist())
+        for segment, (i1, i2, j1, j2) in enumerate(ranges):
+            for i in range(i1, i2 + 1):
+                for j in range(j1, j2 + 1):
+                    cells.setdefault(self._key(i, j), []).append(segment)
+        self.keys = np.array(sorted(cells), dtype=np.int64)
+        width = max(len(members) for members in cells.values())
+        # one extra all -1 row for points in empty cells
+        self.table = np.full((len(self.keys) + 1, width), -1, dtype=np.int32)
+        for row, key in enumerate(self.keys):
+            members = cells[int(key)]
+            self.table[row, : len(members)] = members
+
+    def _cells(self, values) -> np.ndarray:
+        return np.floor(np.asarray(values, dtype=float) / self.cell_m).astype(np.int64)
+
+    def _key(self, i, j):
+        return (i - self.i0) * self.columns + (j - self.j0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.table.nbytes
+
+    def match(self, x, y):
+        """
+        Snap points (local meters) to the nearest segment within
+        `max_distance_m`. Returns (snapped x, snapped y, distance along the
+        route, offset, matched) arrays; unmatched points keep their own
+        coordinates, with NaN distance and offset.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        # points off the grid land in an edge cell, whose segments are all
+        # further than max_distance_m away and fail the check below
+        i = np.clip(self._cells(x) - self.i0, 0, self.rows - 1)
+        j = np.clip(self._cells(y) - self.j0, 0, self.columns - 1)
+        keys = i * self.columns + j
+        rows = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        # cells without segments get the sentinel row of -1s
+        rows = np.where(self.keys[rows] == keys, rows, len(self.keys))
+
+        # (points, candidates) projections in one pass
+        candidates = self.table[rows]
+        segment = np.maximum(candidates, 0)
+        px, py = x[:, None], y[:, None]
+        ax, ay = self.ax[segment], self.ay[segment]
+        dx, dy = self.dx[segment], self.dy[segment]
+        t = ((px - ax) * dx + (py - ay) * dy) / self.length_sq[segment]
+        np.clip(t, 0.0, 1.0, out=t)
+        qx, qy = ax + t * dx, ay + t * dy
+        distance_sq = (qx - px) ** 2 + (qy - py) ** 2
+        distance_sq[candidates < 0] = np.inf
+        pick = np.arange(len(x)), np.argmin(distance_sq, axis=1)
+        offset = np.sqrt(distance_sq[pick])
+        matched = offset <= self.max_distance_m
+        chosen = segment[pick]
+        along = self.start[chosen] + t[pick] * self.span[chosen]
+        snapped_x = np.where(matched, qx[pick], x)
+        snapped_y = np.where(matched, qy[pick], y)
+        along[~matched] = np.nan
+        offset[~matched] = np.nan
+        return snapped_x, snapped_y, along, offset, matched
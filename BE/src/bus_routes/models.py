@@ -1,8 +1,9 @@
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
 from typing import Optional
+from src.utils.config import settings
 
 
 class StatusEnum(str, Enum):
@@ -19,7 +20,7 @@ class RouteCreate(BaseModel):
     name: str
     description: Optional[str] = None
     status: StatusEnum
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
 
 
 class RouteUpdate(BaseModel):
@@ -31,3 +32,15 @@ class RouteUpdate(BaseModel):
 
 class RouteDelete(BaseModel):
     deleted_at: Optional[datetime] = None
+
+
+class ShapePoint(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class RouteShapeUpdate(BaseModel):
+    # in driving order, from the first stop to the last
+    points: list[ShapePoint] = Field(
+        min_length=2, max_length=settings.tracking.MAX_SHAPE_POINTS
+    )
@@ -0,0 +1,43 @@
+from sqlalchemy import select, update, and_, bindparam
+from src.database.schema import routes
+from src.database.execution import AsyncDBClient, async_db_client
+from uuid import UUID
+
+
+get_route_shape_stmt = select(
+    routes.c.id,
+    routes.c.shape_latitudes,
+    routes.c.shape_longitudes,
+    routes.c.shape_distances,
+).where(and_(routes.c.id == bindparam("route_id"), routes.c.deleted_at.is_(None)))
+
+
+class RouteQueries:
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        self.db_client = db_client or async_db_client
+
+    async def get_route_shape(self, route_id: UUID):
+        result = await self.db_client.execute_one(
+            get_route_shape_stmt, {"route_id": route_id}
+        )
+        return result
+
+    async def update_route_shape(
+        self,
+        route_id: UUID,
+        latitudes: list[float],
+        longitudes: list[float],
+        distances: list[float],
+    ):
+        stmt = (
+            update(routes)
+            .where(and_(routes.c.id == route_id, routes.c.deleted_at.is_(None)))
+            .values(
+                shape_latitudes=latitudes,
+                shape_longitudes=longitudes,
+                shape_distances=distances,
+            )
+            .returning(routes.c.id)
+        )
+        result = await self.db_client.execute_one(stmt)
+        return result
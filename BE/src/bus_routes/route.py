@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Query
+from src.bus_routes.geometry import route_geometries
+from src.bus_routes.models import RouteShapeUpdate
+from src.bus_routes.query import RouteQueries
+from src.bus_routes.service import RouteService
+from typing import Optional
+from uuid import UUID
+from fastapi.responses import JSONResponse
+from src.database.execution import AsyncDBClient
+from src.database.unit_of_work import get_unit_of_work
+
+
+router = APIRouter(prefix="/routes", tags=["Routes"])
+
+
+def get_route_service(
+    uow: AsyncDBClient = Depends(get_unit_of_work, scope="function"),
+):
+    return RouteService(RouteQueries(uow), route_geometries)
+
+
+def get_route_reader():
+    # read-only endpoints: no unit of work, so their reads may use a replica
+    return RouteService(RouteQueries(), route_geometries)
+
+
+@router.put("/{route_id}/shape", response_model=dict)
+async def update_route_shape(
+    route_id: UUID,
+    payload: RouteShapeUpdate,
+    service: RouteService = Depends(get_route_service),
+):
+    status_code, result = await service.update_route_shape(route_id, payload)
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{route_id}/shape", response_model=dict)
+async def get_route_shape(
+    route_id: UUID,
+    service: RouteService = Depends(get_route_reader),
+):
+    status_code, result = await service.get_route_shape(route_id)
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{route_id}/progress", response_model=dict)
+async def get_progress(
+    route_id: UUID,
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    near: Optional[float] = Query(default=None, ge=0),
+    service: RouteService = Depends(get_route_reader),
+):
+    # distance travelled/remaining along the route; `near` (meters along the
+    # route, e.g. the previous answer) limits the search to that stretch
+    status_code, result = await service.get_progress(
+        route_id, latitude, longitude, near
+    )
+    return JSONResponse(content=result, status_code=status_code)
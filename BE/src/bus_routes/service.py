@@ -0,0 +1,81 @@
+from src.bus_routes.geometry import RouteGeometry, RouteGeometryCache
+from src.bus_routes.models import RouteShapeUpdate
+from src.bus_routes.query import RouteQueries
+from src.stops.geofence import geofences
+from src.trips.eta import eta_engine
+from fastapi.encoders import jsonable_encoder
+from fastapi import status, HTTPException
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RouteService:
+    def __init__(self, queries: RouteQueries, geometries: RouteGeometryCache):
+        self.queries = queries
+        self.geometries = geometries
+
+    async def update_route_shape(self, route_id: UUID, payload: RouteShapeUpdate):
+        latitudes = [point.latitude for point in payload.points]
+        longitudes = [point.longitude for point in payload.points]
+        # distances along the shape are computed once here, not per lookup
+        geometry = RouteGeometry(latitudes, longitudes)
+        try:
+            route = await self.queries.update_route_shape(
+                route_id, latitudes, longitudes, geometry.cumulative.tolist()
+            )
+            if not route:
+                message = {"detail": "Route not found"}
+                return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+            self.queries.db_client.after_commit(
+                lambda: self.invalidate_route(route_id)
+            )
+            result = {
+                "route_id": route_id,
+                "points": len(latitudes),
+                "length_m": round(geometry.length, 1),
+            }
+            return status.HTTP_200_OK, jsonable_encoder(result)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error updating shape of route %s", route_id)
+            await self.queries.db_client.rollback()
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+    def invalidate_route(self, route_id: UUID):
+        self.geometries.invalidate(route_id)
+        eta_engine.invalidate_route(route_id)
+        geofences.invalidate_route(route_id)
+
+    async def get_route_shape(self, route_id: UUID):
+        geometry = await self.geometries.get(route_id, self.queries.get_route_shape)
+        if geometry is None:
+            message = {"detail": "Route has no shape"}
+            return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+        result = {
+            "route_id": route_id,
+            "length_m": round(geometry.length, 1),
+            "points": [
+                {"latitude": float(lat), "longitude": float(lng), "distance_m": d}
+                for lat, lng, d in zip(
+                    geometry.latitudes, geometry.longitudes, geometry.cumulative
+                )
+            ],
+        }
+        return status.HTTP_200_OK, jsonable_encoder(result)
+
+    async def get_progress(
+        self,
+        route_id: UUID,
+        latitude: float,
+        longitude: float,
+        near: float | None = None,
+    ):
+        geometry = await self.geometries.get(route_id, self.queries.get_route_shape)
+        if geometry is None:
+            message = {"detail": "Route has no shape"}
+            return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+        result = {"route_id": route_id, **geometry.progress(latitude, longitude, near)}
+        return status.HTTP_200_OK, jsonable_encoder(result)
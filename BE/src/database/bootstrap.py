@@ -0,0 +1,84 @@
+"""
+Create the database schema. Run once per deploy, before starting workers:
+
+    python -m src.database.bootstrap
+
+Only missing tables (and enum types) are created. Existing tables are left
+as they are, except for the columns in ADDED_COLUMNS, which are added when
+missing. Partitioned tables also get their initial daily partitions.
+"""
+
+import argparse
+import importlib
+
+from sqlalchemy import text
+
+from src.database.connection import get_engine, metadata
+from src.database.partitions import maintain_partitions, partitioned_tables
+
+# Modules whose tables make up the schema. src.database.schema owns routes,
+# stops, buses and trips; the per-domain copies of those tables are not
+# listed, since they would register the same names twice.
+SCHEMA_MODULES = [
+    "src.database.schema",
+    "src.admins.schema",
+    "src.drivers.schema",
+    "src.students.schema",
+    "src.bus_locations.schema",
+]
+
+# Columns added to tables that existed before them, which create_all does not
+# alter: (table, column) in the loaded metadata. Nullable, so adding them is
+# a catalog-only change.
+ADDED_COLUMNS = [
+    ("routes", "shape_latitudes"),
+    ("routes", "shape_longitudes"),
+    ("routes", "shape_distances"),
+    ("stops", "sequence"),
+]
+
+
+def load_schema():
+    for module in SCHEMA_MODULES:
+        importlib.import_module(module)
+    return metadata
+
+
+def add_missing_columns(conn, schema):
+    for table_name, column_name in ADDED_COLUMNS:
+        column = schema.tables[table_name].c[column_name]
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(
+            text(
+                f'ALTER TABLE "{table_name}" '
+                f'ADD COLUMN IF NOT EXISTS "{column_name}" {column_type}'
+            )
+        )
+
+
+def create_schema(engine=None):
+    engine = engine or get_engine()
+    schema = load_schema()
+    schema.create_all(bind=engine)
+    with engine.begin() as conn:
+        add_missing_columns(conn, schema)
+        for table in partitioned_tables():
+            maintain_partitions(conn, table)
+
+
+def main(args):
+    schema = load_schema()
+    if args.dry_run:
+        for table in schema.sorted_tables:
+            print(table.name)
+        return
+    create_schema()
+    print(f"Schema ready: {len(schema.tables)} tables")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the database schema.")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="list the tables without connecting"
+    )
+    main(parser.parse_args())
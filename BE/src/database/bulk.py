@@ -0,0 +1,61 @@
+from itertools import islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+# Postgres caps a single statement at 32767 bind parameters.
+MAX_BIND_PARAMS = 32767
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def effective_chunk_size(chunk_size: int, column_count: int) -> int:
+    # Keep a multi-row VALUES statement under the bind parameter limit
+    return max(1, min(chunk_size, MAX_BIND_PARAMS // max(column_count, 1)))
+
+
+def build_insert(
+    table: Table,
+    rows: list[dict],
+    returning=None,
+    on_conflict: str | None = None,
+    conflict_target: list[str] | None = None,
+    update_columns: list[str] | None = None,
+):
+    """
+    Build one multi-row `INSERT ... VALUES (...), (...)` for `rows`.
+
+    on_conflict:
+        None         - plain insert, conflicts raise IntegrityError
+        "do_nothing" - skip conflicting rows (optionally on `conflict_target`)
+        "do_update"  - upsert on `conflict_target`, overwriting `update_columns`
+                       (default: every inserted column outside the target)
+    """
+    stmt = pg_insert(table).values(rows)
+
+    if on_conflict == "do_nothing":
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+    elif on_conflict == "do_update":
+        if not conflict_target:
+            raise ValueError("on_conflict='do_update' requires conflict_target")
+        columns = update_columns or [
+            key for key in rows[0] if key not in conflict_target
+        ]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_target,
+            set_={column: stmt.excluded[column] for column in columns},
+        )
+    elif on_conflict is not None:
+        raise ValueError(f"Unsupported on_conflict value: {on_conflict!r}")
+
+    if returning is not None:
+        if isinstance(returning, (list, tuple)):
+            stmt = stmt.returning(*returning)
+        else:
+            stmt = stmt.returning(returning)
+    return stmt
@@ -1,15 +1,109 @@
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.ext.asyncio import create_async_engine
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Any
-from src.utils.config import get_database_url
+from src.utils.config import (
+    get_database_url,
+    get_engine_options,
+    get_replica_urls,
+    settings,
+    to_async_url,
+)
 from sqlalchemy import func
+from src.database.instrumentation import instrument_engine
+
+
+statement_timeout = settings.database.STATEMENT_TIMEOUT_MS
+
+
+def build_engine(url: str):
+    return instrument_engine(
+        create_engine(
+            url,
+            connect_args={"options": f"-c statement_timeout={statement_timeout}"},
+            **get_engine_options(),
+        )
+    )
+
+
+def build_async_engine(url: str):
+    async_engine = create_async_engine(
+        to_async_url(url),
+        connect_args={"server_settings": {"statement_timeout": str(statement_timeout)}},
+        **get_engine_options(),
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# Engines are built on first use, not at import: importing the app (or
+# forking a worker) needs no database, and each worker builds its own pools.
+# Schema creation lives in `python -m src.database.bootstrap`.
+_engines: dict[str, Any] = {}
+_engines_lock = threading.Lock()
+
+
+def _get_or_build(name: str, build):
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = _engines[name] = build()
+    return engine
+
+
+def get_engine():
+    return _get_or_build("engine", lambda: build_engine(get_database_url()))
+
+
+def get_async_engine():
+    return _get_or_build(
+        "async_engine", lambda: build_async_engine(get_database_url())
+    )
+
+
+def get_replica_engines() -> list:
+    return _get_or_build(
+        "replica_engines",
+        lambda: [build_engine(url) for url in get_replica_urls()],
+    )
+
+
+def get_async_replica_engines() -> list:
+    return _get_or_build(
+        "async_replica_engines",
+        lambda: [build_async_engine(url) for url in get_replica_urls()],
+    )
+
+
+async def dispose_engines():
+    """Close every pool built so far (app shutdown)."""
+    with _engines_lock:
+        built = dict(_engines)
+        _engines.clear()
+    if "engine" in built:
+        built["engine"].dispose()
+    for replica in built.get("replica_engines", []):
+        replica.dispose()
+    if "async_engine" in built:
+        await built["async_engine"].dispose()
+    for replica in built.get("async_replica_engines", []):
+        await replica.dispose()
 
 
-engine = create_engine(get_database_url())
 metadata = MetaData()
-metadata.create_all(bind=engine)
 
 new_uuid = uuid.uuid4
-now = datetime.now(timezone.utc)
+
+
+def now() -> datetime:
+    # Called per row, so defaults and onupdate get the time of the write.
+    # Naive UTC, like every DateTime column (timestamp without time zone):
+    # asyncpg refuses aware values for those.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 default_now: dict[str, Any] = {"default": now, "server_default": func.now()}
@@ -1,55 +1,672 @@
-from src.database.connection import engine, metadata, new_uuid, now, default_now
+from src.database.connection import (
+    get_engine,
+    get_async_engine,
+    get_replica_engines,
+    get_async_replica_engines,
+    build_engine,
+    build_async_engine,
+    metadata,
+    new_uuid,
+    now,
+    default_now,
+)
+from src.database.bulk import build_insert, chunked, effective_chunk_size
+from src.database.ingestion import CopyRowEncoder, copy_columns
+from src.database.instrumentation import query_stats, set_query_origin
+from src.database.pool import PoolMonitor
+from src.database.replicas import (
+    ReplicaSet,
+    is_replica_safe,
+    is_unavailable,
+    pin_primary,
+    primary_pinned,
+)
+from src.utils.config import settings
+from contextlib import asynccontextmanager, contextmanager
+from copy import copy
+from functools import cached_property
+from sqlalchemy import Table
 from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from fastapi import HTTPException
 from flask import abort
+from itertools import chain
+from typing import AsyncIterator, Callable, Iterable, Iterator
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def db_error_response(e: Exception) -> tuple[int, str]:
+    if isinstance(e, IntegrityError):
+        return 409, f"Database integrity constraint violated: {str(e)}."
+    if isinstance(e, PoolTimeoutError):
+        return 503, f"Database connection pool exhausted: {str(e)}"
+    if isinstance(e, OperationalError):
+        return 500, f"Unexpected database error: {str(e)}"
+    return 500, f"Unexpected error: {str(e)}"
+
+
+def build_replica_set(engines: list) -> ReplicaSet:
+    return ReplicaSet(
+        engines,
+        strategy=settings.database.REPLICA_STRATEGY,
+        retry_after=settings.database.REPLICA_RETRY_SECONDS,
+    )
 
 
 class DBClient:
-    def __init__(self):
-        self.engine = engine
+    """
+    Runs statements against the primary engine, sending plain SELECTs to a
+    read replica when replicas are configured (DATABASE_REPLICA_URLS, or
+    `replica_urls`). Once a task has written, its reads stay on the primary;
+    pass `use_primary=True` (or wrap in `use_primary()`) to force it.
+    """
+
+    def __init__(
+        self, primary_url: str | None = None, replica_urls: list[str] | None = None
+    ):
+        # Engines are built on first use (see the properties below)
+        self.primary_url = primary_url
+        self.replica_urls = replica_urls
         self.metadata = metadata
         self.new_uuid = new_uuid
         self.now = now
         self.default_now = default_now
 
-    def execute_all(self, query):
+    @cached_property
+    def engine(self):
+        return build_engine(self.primary_url) if self.primary_url else get_engine()
+
+    @cached_property
+    def replicas(self) -> ReplicaSet:
+        if self.replica_urls is not None:
+            replicas = [build_engine(url) for url in self.replica_urls]
+        else:
+            replicas = [] if self.primary_url else get_replica_engines()
+        return build_replica_set(replicas)
+
+    @cached_property
+    def pool_monitors(self) -> dict[int, PoolMonitor]:
+        return {
+            id(target): PoolMonitor(target)
+            for target in [self.engine, *self.replicas.engines]
+        }
+
+    @property
+    def pool_monitor(self) -> PoolMonitor:
+        return self.pool_monitors[id(self.engine)]
+
+    def pool_stats(self) -> dict:
+        stats = self.pool_monitor.stats()
+        if self.replicas:
+            stats["replicas"] = [
+                {**info, **self.pool_monitors[id(replica)].stats()}
+                for replica, info in zip(self.replicas.engines, self.replicas.stats())
+            ]
+        return stats
+
+    def route(self, query, use_primary: bool = False):
+        if not is_replica_safe(query):
+            pin_primary()
+            return self.engine
+        if use_primary or primary_pinned.get() or not self.replicas:
+            return self.engine
+        return self.replicas.choose() or self.engine
+
+    def query_stats(self) -> dict:
+        return query_stats.snapshot()
+
+    @contextmanager
+    def begin(self, target=None):
+        # engine.begin(), with the pool checkout timed for pool_stats()
+        set_query_origin()
+        target = target or self.engine
+        monitor = self.pool_monitors[id(target)]
+        started = time.perf_counter()
+        try:
+            conn = target.connect()
+        except PoolTimeoutError:
+            monitor.record_timeout()
+            raise
+        monitor.record_wait(time.perf_counter() - started)
+        with conn:
+            with conn.begin():
+                yield conn
+
+    def _fetch_all(self, target, query, params):
+        with self.begin(target) as conn:
+            result = conn.execute(query, params)
+
+            rows = result.mappings().all()
+            query_stats.record_rows(len(rows))
+            if not rows:
+                return False
+            return [dict(row) for row in rows]
+
+    def _fetch_one(self, target, query, params):
+        with self.begin(target) as conn:
+            result = conn.execute(query, params)
+
+            row = result.mappings().first()
+            query_stats.record_rows(1 if row else 0)
+            if not row:
+                return None
+            return dict(row)
+
+    def _with_failover(self, fetch, query, params, use_primary):
+        target = self.route(query, use_primary)
+        if target is self.engine:
+            return fetch(target, query, params)
+        try:
+            return fetch(target, query, params)
+        except Exception as e:
+            if not is_unavailable(e):
+                raise
+            self.replicas.mark_down(target)
+            return fetch(self.engine, query, params)
+
+    def execute_all(self, query, params: dict | None = None, use_primary: bool = False):
+        try:
+            return self._with_failover(self._fetch_all, query, params, use_primary)
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
+
+    def execute_one(self, query, params: dict | None = None, use_primary: bool = False):
         try:
-            with self.engine.begin() as conn:
-                result = conn.execute(query)
+            return self._with_failover(self._fetch_one, query, params, use_primary)
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
+
+    def execute_stream(
+        self,
+        query,
+        params: dict | None = None,
+        chunk_size: int | None = None,
+        chunks: bool = False,
+        use_primary: bool = False,
+    ) -> Iterator[dict] | Iterator[list[dict]]:
+        """
+        Lazily yield result rows (or lists of rows when `chunks=True`) through
+        a server-side cursor, fetching `chunk_size` rows at a time, so memory
+        stays flat however large the result is.
 
-                rows = result.mappings().all()
-                if not rows:
-                    return False
-                return [dict(row) for row in rows]
+        The cursor and connection are released when the generator is
+        exhausted or closed; wrap it in `contextlib.closing` if the consumer
+        may stop early.
+        """
+        chunk_size = chunk_size or settings.database.STREAM_CHUNK_SIZE
+        try:
+            with self.begin(self.route(query, use_primary)) as conn:
+                result = conn.execution_options(yield_per=chunk_size).execute(
+                    query, params
+                )
+                try:
+                    for partition in result.mappings().partitions():
+                        if chunks:
+                            yield [dict(row) for row in partition]
+                        else:
+                            for row in partition:
+                                yield dict(row)
+                finally:
+                    result.close()
 
-        except IntegrityError as e:
-            detail = f"Database integrity constraint violated: {str(e)}."
-            abort(409, description=detail)
-        except OperationalError as e:
-            detail = f"Unexpected database error: {str(e)}"
-            abort(500, description=detail)
         except Exception as e:
-            detail = f"Unexpected error: {str(e)}"
-            abort(500, description=detail)
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
 
-    def execute_one(self, query):
+    def execute_many(self, query, params: list[dict], chunk_size: int | None = None):
+        """
+        Run `query` once per parameter set (executemany) inside a single
+        transaction, `chunk_size` parameter sets per round trip.
+        Returns the RETURNING rows if the statement has any, otherwise the
+        affected row count.
+        """
+        chunk_size = chunk_size or settings.database.BULK_CHUNK_SIZE
+        rows, rowcount, returns_rows = [], 0, False
+        pin_primary()
         try:
-            with self.engine.begin() as conn:
-                result = conn.execute(query)
+            with self.begin() as conn:
+                for chunk in chunked(params, chunk_size):
+                    result = conn.execute(query, chunk)
+                    if result.returns_rows:
+                        returns_rows = True
+                        rows.extend(dict(row) for row in result.mappings())
+                    else:
+                        rowcount += max(result.rowcount, 0)
+            # RETURNING that matched nothing is [], not a row count of 0
+            return rows if returns_rows else rowcount
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
 
-                row = result.mappings().first()
-                if not row:
-                    return None
-                return dict(row)
+    def insert_many(
+        self,
+        table: Table,
+        rows: list[dict],
+        chunk_size: int | None = None,
+        returning=None,
+        on_conflict: str | None = None,
+        conflict_target: list[str] | None = None,
+        update_columns: list[str] | None = None,
+    ):
+        """
+        Insert `rows` as multi-row `INSERT ... VALUES` statements in a single
+        transaction. See `build_insert` for the ON CONFLICT options.
+        Returns the RETURNING rows when `returning` is given, otherwise the
+        number of rows inserted.
+        """
+        if not rows:
+            return [] if returning is not None else 0
+        chunk_size = effective_chunk_size(
+            chunk_size or settings.database.BULK_CHUNK_SIZE, len(rows[0])
+        )
+        inserted, rowcount = [], 0
+        pin_primary()
+        try:
+            with self.begin() as conn:
+                for chunk in chunked(rows, chunk_size):
+                    stmt = build_insert(
+                        table,
+                        chunk,
+                        returning=returning,
+                        on_conflict=on_conflict,
+                        conflict_target=conflict_target,
+                        update_columns=update_columns,
+                    )
+                    result = conn.execute(stmt)
+                    if returning is not None:
+                        inserted.extend(dict(row) for row in result.mappings())
+                    else:
+                        rowcount += max(result.rowcount, 0)
+            return inserted if returning is not None else rowcount
 
-        except IntegrityError as e:
-            detail = f"Database integrity constraint violated: {str(e)}."
-            abort(409, description=detail)
-        except OperationalError as e:
-            detail = f"Unexpected database error: {str(e)}"
-            abort(500, description=detail)
         except Exception as e:
-            detail = f"Unexpected error: {str(e)}"
-            abort(500, description=detail)
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
+
+    def copy_rows(
+        self,
+        table: Table,
+        rows: Iterable[dict],
+        columns: list[str] | None = None,
+        format: str = "binary",
+    ) -> int:
+        """
+        Stream `rows` into `table` with `COPY ... FROM STDIN` (text or binary)
+        in a single transaction. Much faster than INSERT for high-volume
+        append-only data such as position history. Returns the row count.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        encoder = CopyRowEncoder(table, columns or copy_columns(table, first), format)
+        stream = encoder.stream(chain([first], rows))
+        pin_primary()
+        try:
+            with self.begin() as conn:
+                dbapi_conn = conn.connection.dbapi_connection
+                with dbapi_conn.cursor() as cursor:
+                    if hasattr(cursor, "copy_expert"):
+                        # psycopg2
+                        cursor.copy_expert(encoder.copy_sql(), stream)
+                    else:
+                        # psycopg 3
+                        with cursor.copy(encoder.copy_sql()) as copy:
+                            while data := stream.read(65536):
+                                copy.write(data)
+                    return cursor.rowcount
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            abort(status_code, description=detail)
 
 
 db_client = DBClient()
+
+
+class AsyncDBClient:
+    """
+    Awaitable counterpart of DBClient built on the async engine (asyncpg).
+    Use it from `async def` code paths so a slow query yields the event loop
+    instead of stalling every other request in the worker. Replica routing
+    works the same way as in DBClient.
+    """
+
+    def __init__(
+        self, primary_url: str | None = None, replica_urls: list[str] | None = None
+    ):
+        self.primary_url = primary_url
+        self.replica_urls = replica_urls
+        self.metadata = metadata
+        self.new_uuid = new_uuid
+        self.now = now
+        self.default_now = default_now
+        # set on the copy handed out by transaction(); the connection is
+        # checked out by the first statement run through it
+        self._in_transaction = False
+        self._connection = None
+        self._after_commit: list[Callable[[], None]] = []
+
+    @cached_property
+    def engine(self):
+        if self.primary_url:
+            return build_async_engine(self.primary_url)
+        return get_async_engine()
+
+    @cached_property
+    def replicas(self) -> ReplicaSet:
+        if self.replica_urls is not None:
+            replicas = [build_async_engine(url) for url in self.replica_urls]
+        else:
+            replicas = [] if self.primary_url else get_async_replica_engines()
+        return build_replica_set(replicas)
+
+    @cached_property
+    def pool_monitors(self) -> dict[int, PoolMonitor]:
+        return {
+            id(target): PoolMonitor(target)
+            for target in [self.engine, *self.replicas.engines]
+        }
+
+    @property
+    def pool_monitor(self) -> PoolMonitor:
+        return self.pool_monitors[id(self.engine)]
+
+    def pool_stats(self) -> dict:
+        stats = self.pool_monitor.stats()
+        if self.replicas:
+            stats["replicas"] = [
+                {**info, **self.pool_monitors[id(replica)].stats()}
+                for replica, info in zip(self.replicas.engines, self.replicas.stats())
+            ]
+        return stats
+
+    def route(self, query, use_primary: bool = False):
+        if self._in_transaction:
+            return self.engine
+        if not is_replica_safe(query):
+            pin_primary()
+            return self.engine
+        if use_primary or primary_pinned.get() or not self.replicas:
+            return self.engine
+        return self.replicas.choose() or self.engine
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Yield a client bound to one transaction on the primary: every
+        statement run through the bound client shares one connection and
+        transaction, which commits once when the block exits (or rolls back
+        on error). The connection is checked out by the first statement, so
+        a block that runs none costs nothing. Nested calls reuse the outer
+        transaction.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        bound = copy(self)
+        bound._in_transaction = True
+        bound._connection = None
+        bound._after_commit = []
+        try:
+            yield bound
+            if bound._connection is not None and bound._connection.in_transaction():
+                await bound._connection.commit()
+        except BaseException:
+            if bound._connection is not None and bound._connection.in_transaction():
+                await bound._connection.rollback()
+            raise
+        finally:
+            if bound._connection is not None:
+                await bound._connection.close()
+        for callback in bound._after_commit:
+            try:
+                callback()
+            except Exception as e:
+                # the data is stored; a failed side effect must not undo that
+                logger.warning("After-commit callback failed: %s", e)
+
+    def after_commit(self, callback: Callable[[], None]):
+        """
+        Run `callback()` once the bound transaction has committed, for side
+        effects outside the database (in-memory state, pushes) that must not
+        show data which may still roll back. Dropped on rollback; run at once
+        on an unbound client, whose statements have already committed.
+        """
+        if not self._in_transaction:
+            callback()
+        else:
+            self._after_commit.append(callback)
+
+    async def rollback(self):
+        """
+        Undo what the bound transaction has written so far, for error paths
+        that answer with an error response instead of raising. The unit of
+        work then has nothing left to commit. No-op on an unbound client,
+        whose statements commit one by one.
+        """
+        if self._connection is not None and self._connection.in_transaction():
+            await self._connection.rollback()
+        self._after_commit.clear()
+
+    def query_stats(self) -> dict:
+        return query_stats.snapshot()
+
+    async def _connect(self, target):
+        monitor = self.pool_monitors[id(target)]
+        started = time.perf_counter()
+        try:
+            conn = await target.connect().start()
+        except PoolTimeoutError:
+            monitor.record_timeout()
+            raise
+        monitor.record_wait(time.perf_counter() - started)
+        return conn
+
+    @asynccontextmanager
+    async def begin(self, target=None):
+        set_query_origin()
+        if self._in_transaction:
+            if self._connection is None:
+                pin_primary()
+                self._connection = await self._connect(self.engine)
+                await self._connection.begin()
+            yield self._connection
+            return
+        conn = await self._connect(target or self.engine)
+        try:
+            async with conn.begin():
+                yield conn
+        finally:
+            await conn.close()
+
+    async def _fetch_all(self, target, query, params):
+        async with self.begin(target) as conn:
+            result = await conn.execute(query, params)
+
+            rows = result.mappings().all()
+            query_stats.record_rows(len(rows))
+            if not rows:
+                return False
+            return [dict(row) for row in rows]
+
+    async def _fetch_one(self, target, query, params):
+        async with self.begin(target) as conn:
+            result = await conn.execute(query, params)
+
+            row = result.mappings().first()
+            query_stats.record_rows(1 if row else 0)
+            if not row:
+                return None
+            return dict(row)
+
+    async def _with_failover(self, fetch, query, params, use_primary):
+        target = self.route(query, use_primary)
+        if target is self.engine:
+            return await fetch(target, query, params)
+        try:
+            return await fetch(target, query, params)
+        except Exception as e:
+            if not is_unavailable(e):
+                raise
+            self.replicas.mark_down(target)
+            return await fetch(self.engine, query, params)
+
+    async def execute_all(
+        self, query, params: dict | None = None, use_primary: bool = False
+    ):
+        try:
+            return await self._with_failover(
+                self._fetch_all, query, params, use_primary
+            )
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+    async def execute_one(
+        self, query, params: dict | None = None, use_primary: bool = False
+    ):
+        try:
+            return await self._with_failover(
+                self._fetch_one, query, params, use_primary
+            )
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+    async def execute_stream(
+        self,
+        query,
+        params: dict | None = None,
+        chunk_size: int | None = None,
+        chunks: bool = False,
+        use_primary: bool = False,
+    ) -> AsyncIterator[dict] | AsyncIterator[list[dict]]:
+        """
+        Async version of DBClient.execute_stream. Use `contextlib.aclosing`
+        if the consumer may stop early, so the cursor is closed right away.
+        """
+        chunk_size = chunk_size or settings.database.STREAM_CHUNK_SIZE
+        try:
+            async with self.begin(self.route(query, use_primary)) as conn:
+                result = await conn.stream(
+                    query, params, execution_options={"yield_per": chunk_size}
+                )
+                try:
+                    async for partition in result.mappings().partitions():
+                        if chunks:
+                            yield [dict(row) for row in partition]
+                        else:
+                            for row in partition:
+                                yield dict(row)
+                finally:
+                    await result.close()
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+    async def execute_many(
+        self, query, params: list[dict], chunk_size: int | None = None
+    ):
+        chunk_size = chunk_size or settings.database.BULK_CHUNK_SIZE
+        rows, rowcount, returns_rows = [], 0, False
+        pin_primary()
+        try:
+            async with self.begin() as conn:
+                for chunk in chunked(params, chunk_size):
+                    result = await conn.execute(query, chunk)
+                    if result.returns_rows:
+                        returns_rows = True
+                        rows.extend(dict(row) for row in result.mappings())
+                    else:
+                        rowcount += max(result.rowcount, 0)
+            # RETURNING that matched nothing is [], not a row count of 0
+            return rows if returns_rows else rowcount
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+    async def insert_many(
+        self,
+        table: Table,
+        rows: list[dict],
+        chunk_size: int | None = None,
+        returning=None,
+        on_conflict: str | None = None,
+        conflict_target: list[str] | None = None,
+        update_columns: list[str] | None = None,
+    ):
+        if not rows:
+            return [] if returning is not None else 0
+        chunk_size = effective_chunk_size(
+            chunk_size or settings.database.BULK_CHUNK_SIZE, len(rows[0])
+        )
+        inserted, rowcount = [], 0
+        pin_primary()
+        try:
+            async with self.begin() as conn:
+                for chunk in chunked(rows, chunk_size):
+                    stmt = build_insert(
+                        table,
+                        chunk,
+                        returning=returning,
+                        on_conflict=on_conflict,
+                        conflict_target=conflict_target,
+                        update_columns=update_columns,
+                    )
+                    result = await conn.execute(stmt)
+                    if returning is not None:
+                        inserted.extend(dict(row) for row in result.mappings())
+                    else:
+                        rowcount += max(result.rowcount, 0)
+            return inserted if returning is not None else rowcount
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+    async def copy_rows(
+        self,
+        table: Table,
+        rows: Iterable[dict],
+        columns: list[str] | None = None,
+        format: str = "binary",
+    ) -> int:
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        encoder = CopyRowEncoder(table, columns or copy_columns(table, first), format)
+        stream = encoder.stream(chain([first], rows))
+        pin_primary()
+        try:
+            async with self.begin() as conn:
+                raw_conn = await conn.get_raw_connection()
+                status = await raw_conn.driver_connection.copy_to_table(
+                    table.name,
+                    source=stream,
+                    columns=[column.name for column in encoder.columns],
+                    schema_name=table.schema,
+                    format=format,
+                )
+                # asyncpg returns the command tag, e.g. "COPY 5000"
+                return int(status.split()[-1])
+
+        except Exception as e:
+            status_code, detail = db_error_response(e)
+            raise HTTPException(status_code=status_code, detail=detail)
+
+
+async_db_client = AsyncDBClient()
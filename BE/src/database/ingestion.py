@@ -0,0 +1,233 @@
+import io
+import struct
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator
+from uuid import UUID as PyUUID
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    SmallInteger,
+    Table,
+    Text,
+    String,
+    Uuid,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+COPY_FORMATS = ("text", "binary")
+
+# PGCOPY binary framing
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_BINARY_TRAILER = struct.pack("!h", -1)
+_NULL_FIELD = struct.pack("!i", -1)
+_PG_EPOCH = datetime(2000, 1, 1)
+
+_field_count = struct.Struct("!h")
+_float8 = struct.Struct("!id")
+_int2 = struct.Struct("!ih")
+_int4 = struct.Struct("!ii")
+_int8 = struct.Struct("!iq")
+_bool = struct.Struct("!i?")
+_length = struct.Struct("!i")
+
+_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# binary field encoders: value -> length-prefixed field bytes
+
+
+def _binary_uuid(value) -> bytes:
+    if not isinstance(value, PyUUID):
+        value = PyUUID(str(value))
+    return b"\x00\x00\x00\x10" + value.bytes
+
+
+def _binary_text(value) -> bytes:
+    data = str(value).encode("utf-8")
+    return _length.pack(len(data)) + data
+
+
+def _binary_enum(value) -> bytes:
+    # enum_recv takes the label as text; accept python Enum members too
+    return _binary_text(getattr(value, "value", value))
+
+
+def _binary_timestamp(value: datetime) -> bytes:
+    delta = _utc_naive(value) - _PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return _int8.pack(8, micros)
+
+
+# text field encoders: value -> escaped COPY text
+
+
+def _text_plain(value) -> str:
+    return str(value).translate(_TEXT_ESCAPES)
+
+
+def _text_enum(value) -> str:
+    return _text_plain(getattr(value, "value", value))
+
+
+def _text_timestamp(value: datetime) -> str:
+    return _utc_naive(value).isoformat()
+
+
+def _text_bool(value) -> str:
+    return "t" if value else "f"
+
+
+def _field_encoders(column) -> tuple[Callable, Callable]:
+    col_type = column.type
+    if isinstance(col_type, (UUID, Uuid)):
+        return _binary_uuid, str
+    if isinstance(col_type, Float):
+        return (lambda v: _float8.pack(8, float(v))), repr
+    if isinstance(col_type, Enum):
+        return _binary_enum, _text_enum
+    if isinstance(col_type, DateTime):
+        return _binary_timestamp, _text_timestamp
+    if isinstance(col_type, Boolean):
+        return (lambda v: _bool.pack(1, bool(v))), _text_bool
+    if isinstance(col_type, SmallInteger):
+        return (lambda v: _int2.pack(2, int(v))), str
+    if isinstance(col_type, BigInteger):
+        return (lambda v: _int8.pack(8, int(v))), str
+    if isinstance(col_type, Integer):
+        return (lambda v: _int4.pack(4, int(v))), str
+    if isinstance(col_type, (Text, String)):
+        return _binary_text, _text_plain
+    raise TypeError(
+        f"No COPY encoder for column {column.table.name}.{column.name} ({col_type!r})"
+    )
+
+
+def _python_default(column) -> Callable[[], Any] | None:
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return lambda: default.arg(None)
+    if default.is_scalar:
+        return lambda: default.arg
+    return None
+
+
+def copy_columns(table: Table, sample_row: dict) -> list[str]:
+    """
+    Columns to COPY: everything present in the row plus every column with a
+    Python-side default. Columns with only a server default are left out so
+    Postgres fills them in.
+    """
+    return [
+        column.name
+        for column in table.c
+        if column.name in sample_row or _python_default(column) is not None
+    ]
+
+
+class CopyRowEncoder:
+    """
+    Encodes dict rows for `COPY <table> (<columns>) FROM STDIN` in text or
+    binary format, with one typed encoder per column resolved up front.
+    Missing keys fall back to the column's Python default, else NULL.
+    """
+
+    def __init__(self, table: Table, columns: list[str], format: str = "binary"):
+        if format not in COPY_FORMATS:
+            raise ValueError(f"COPY format must be one of {COPY_FORMATS}")
+        self.table = table
+        self.format = format
+        self.columns = [table.c[name] for name in columns]
+        self._names = [column.name for column in self.columns]
+        self._defaults = [_python_default(column) for column in self.columns]
+        position = 0 if format == "binary" else 1
+        self._encoders = [_field_encoders(column)[position] for column in self.columns]
+        self._field_count = _field_count.pack(len(self.columns))
+
+    def copy_sql(self) -> str:
+        columns = ", ".join(f'"{name}"' for name in self._names)
+        return f'COPY "{self.table.name}" ({columns}) FROM STDIN WITH (FORMAT {self.format})'
+
+    def _values(self, row: dict) -> Iterator[Any]:
+        for name, default in zip(self._names, self._defaults):
+            value = row.get(name)
+            if value is None and default is not None and name not in row:
+                value = default()
+            yield value
+
+    def encode_row(self, row: dict) -> bytes:
+        if self.format == "binary":
+            parts = [self._field_count]
+            for value, encode in zip(self._values(row), self._encoders):
+                parts.append(_NULL_FIELD if value is None else encode(value))
+            return b"".join(parts)
+
+        fields = [
+            "\\N" if value is None else encode(value)
+            for value, encode in zip(self._values(row), self._encoders)
+        ]
+        return ("\t".join(fields) + "\n").encode("utf-8")
+
+    def iter_chunks(self, rows: Iterable[dict], rows_per_chunk: int = 1000):
+        if self.format == "binary":
+            yield _BINARY_HEADER
+        chunk = []
+        for row in rows:
+            chunk.append(self.encode_row(row))
+            if len(chunk) >= rows_per_chunk:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+        if self.format == "binary":
+            yield _BINARY_TRAILER
+
+    def stream(self, rows: Iterable[dict], rows_per_chunk: int = 1000) -> "CopyStream":
+        return CopyStream(self.iter_chunks(rows, rows_per_chunk))
+
+    def encode(self, rows: Iterable[dict]) -> io.BytesIO:
+        return io.BytesIO(b"".join(self.iter_chunks(rows)))
+
+
+class CopyStream(io.RawIOBase):
+    """
+    Read-only file object over encoded COPY chunks, so the driver pulls rows
+    as it sends them instead of the whole payload being built in memory.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data = self._pending + b"".join(self._chunks)
+            self._pending = b""
+            return data
+        while len(self._pending) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending += chunk
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
@@ -0,0 +1,261 @@
+import bisect
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from src.utils.config import settings
+
+logger = logging.getLogger("src.database.queries")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Query method that issued the statement, e.g. "RoleQueries.get_admin_role_permissions"
+current_query_origin: ContextVar[str | None] = ContextVar(
+    "current_query_origin", default=None
+)
+# Statements recorded during the current request: (origin, latency_ms, rows
+# returned, None until the client has fetched them)
+_request_statements: ContextVar[list | None] = ContextVar(
+    "request_statements", default=None
+)
+
+# Frames inside the DB layer are skipped when looking for the calling method
+_DB_LAYER_FILES = {
+    __file__.replace("instrumentation.py", "execution.py"),
+    __file__.replace("instrumentation.py", "unit_of_work.py"),
+    __file__,
+    sys.modules["contextlib"].__file__,
+}
+
+
+def set_query_origin():
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _DB_LAYER_FILES:
+        frame = frame.f_back
+    if frame is not None:
+        current_query_origin.set(frame.f_code.co_qualname)
+
+
+def parameter_shape(parameters):
+    """Types, not values, of the bound parameters - safe to log."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class RowCounts:
+    """Rows returned by the statements whose results were fetched."""
+
+    def __init__(self):
+        self.fetches = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, rows: int):
+        self.fetches += 1
+        self.total += rows
+        if rows > self.max:
+            self.max = rows
+
+    def snapshot(self) -> dict:
+        return {
+            "fetches": self.fetches,
+            "total": self.total,
+            "avg": round(self.total / self.fetches, 2) if self.fetches else 0.0,
+            "max": self.max,
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.rows = 0
+        self.max_rows = 0
+        self.latency = LatencyHistogram()
+        self.by_origin: dict[str, int] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": (
+                round(self.queries / self.requests, 2) if self.requests else 0.0
+            ),
+            "max_queries_per_request": self.max_queries,
+            "rows": self.rows,
+            "rows_per_request": (
+                round(self.rows / self.requests, 2) if self.requests else 0.0
+            ),
+            "max_rows_per_request": self.max_rows,
+            "latency": self.latency.snapshot(),
+            "by_origin": dict(self.by_origin),
+        }
+
+
+class QueryStats:
+    """
+    Per-statement latency and rows returned, aggregated per query method and
+    per endpoint. Statements run outside a request (background jobs) only
+    count per origin.
+
+    Latency comes from the engine hooks; rows returned are reported by the
+    DB client once it has fetched a result (`record_rows`), since drivers
+    such as asyncpg do not know a SELECT's row count at execute time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_origin: dict[str, LatencyHistogram] = {}
+        self.rows_by_origin: dict[str, RowCounts] = {}
+        self.by_endpoint: dict[str, EndpointStats] = {}
+
+    def record_statement(self, origin: str, latency_ms: float):
+        with self._lock:
+            histogram = self.by_origin.get(origin)
+            if histogram is None:
+                histogram = self.by_origin[origin] = LatencyHistogram()
+            histogram.observe(latency_ms)
+        statements = _request_statements.get()
+        if statements is not None:
+            statements.append((origin, latency_ms, None))
+
+    def record_rows(self, rows: int):
+        """Rows returned by the statement the current query method just ran."""
+        origin = current_query_origin.get() or "unknown"
+        with self._lock:
+            counts = self.rows_by_origin.get(origin)
+            if counts is None:
+                counts = self.rows_by_origin[origin] = RowCounts()
+            counts.observe(rows)
+        statements = _request_statements.get()
+        if statements and statements[-1][0] == origin and statements[-1][2] is None:
+            statements[-1] = (origin, statements[-1][1], rows)
+
+    @contextmanager
+    def request_scope(self):
+        statements: list = []
+        token = _request_statements.set(statements)
+        try:
+            yield statements
+        finally:
+            _request_statements.reset(token)
+
+    def record_request(self, endpoint: str, statements: list):
+        with self._lock:
+            stats = self.by_endpoint.get(endpoint)
+            if stats is None:
+                stats = self.by_endpoint[endpoint] = EndpointStats()
+            stats.requests += 1
+            stats.queries += len(statements)
+            stats.max_queries = max(stats.max_queries, len(statements))
+            rows = sum(row_count or 0 for _, _, row_count in statements)
+            stats.rows += rows
+            stats.max_rows = max(stats.max_rows, rows)
+            for origin, latency_ms, _ in statements:
+                stats.latency.observe(latency_ms)
+                stats.by_origin[origin] = stats.by_origin.get(origin, 0) + 1
+
+        if len(statements) > settings.database.QUERIES_PER_REQUEST_WARN:
+            origins = {}
+            for origin, _, _ in statements:
+                origins[origin] = origins.get(origin, 0) + 1
+            logger.warning(
+                "%s ran %d queries in one request (possible N+1): %s",
+                endpoint,
+                len(statements),
+                origins,
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "by_origin": {
+                    origin: {
+                        **histogram.snapshot(),
+                        "rows": self.rows_by_origin.get(origin, RowCounts()).snapshot(),
+                    }
+                    for origin, histogram in self.by_origin.items()
+                },
+                "by_endpoint": {
+                    endpoint: stats.snapshot()
+                    for endpoint, stats in self.by_endpoint.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self.by_origin.clear()
+            self.rows_by_origin.clear()
+            self.by_endpoint.clear()
+
+
+query_stats = QueryStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    latency_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+    # the DB-API rowcount, for the slow-query log; None when the driver does
+    # not know it yet (-1, e.g. SELECTs under asyncpg). Rows returned are
+    # recorded by the client once fetched.
+    rows = cursor.rowcount
+    if rows is None or rows < 0:
+        rows = None
+    origin = current_query_origin.get() or "unknown"
+    query_stats.record_statement(origin, latency_ms)
+
+    if latency_ms >= settings.database.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query %.1fms from %s (rows=%s, params=%s): %s",
+            latency_ms,
+            origin,
+            rows,
+            parameter_shape(parameters),
+            " ".join(statement.split()),
+        )
+
+
+def instrument_engine(engine):
+    """Attach the timing hooks to a sync Engine (or an AsyncEngine's sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
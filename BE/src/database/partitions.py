@@ -0,0 +1,227 @@
+"""
+Daily range partitions for append-only history tables (trip_positions).
+
+Each day lives in its own partition, `<table>_pYYYYMMDD`, covering
+[day, day + 1). The maintenance job keeps the next few days created ahead of
+time, and enforces retention by dropping whole partitions, which is instant
+and leaves no dead tuples, instead of running DELETEs. A DEFAULT partition
+catches fixes outside the prepared range (e.g. very late uploads) so an
+insert never fails for lack of a partition.
+
+Run once by hand, or let the app lifespan run it periodically:
+
+    python -m src.database.partitions
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Connection, Table, text
+
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Serializes maintenance across workers (pg_advisory_xact_lock key)
+MAINTENANCE_LOCK_ID = 7_342_001
+
+
+def partition_name(table: Table, day: date) -> str:
+    return f"{table.name}_p{day:%Y%m%d}"
+
+
+def default_partition_name(table: Table) -> str:
+    return f"{table.name}_default"
+
+
+def partition_day(table: Table, name: str) -> date | None:
+    prefix = f"{table.name}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix) :], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def list_partitions(conn: Connection, table: Table) -> list[str]:
+    result = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table.name},
+    )
+    return [row[0] for row in result]
+
+
+def create_partitions(
+    conn: Connection, table: Table, first_day: date, last_day: date
+) -> list[str]:
+    """Create the missing daily partitions for first_day..last_day."""
+    existing = set(list_partitions(conn, table))
+    created = []
+    if default_partition_name(table) not in existing:
+        conn.execute(
+            text(
+                f'CREATE TABLE "{default_partition_name(table)}" '
+                f'PARTITION OF "{table.name}" DEFAULT'
+            )
+        )
+        created.append(default_partition_name(table))
+    day = first_day
+    while day <= last_day:
+        name = partition_name(table, day)
+        if name not in existing:
+            create_partition(conn, table, day)
+            created.append(name)
+        day += timedelta(days=1)
+    return created
+
+
+def create_partition(conn: Connection, table: Table, day: date):
+    """
+    Create the partition of `day`. Postgres refuses to create a partition
+    while the DEFAULT partition holds rows of its range (fixes that arrived
+    while maintenance lapsed), so those rows are first moved into a new
+    table, which is then attached as the partition.
+    """
+    name = partition_name(table, day)
+    default = default_partition_name(table)
+    bounds = {"start": day, "end": day + timedelta(days=1)}
+    values = (
+        f"FOR VALUES FROM ('{day.isoformat()}') "
+        f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+    )
+    strays = conn.execute(
+        text(
+            f'SELECT EXISTS (SELECT 1 FROM "{default}" '
+            "WHERE recorded_at >= :start AND recorded_at < :end)"
+        ),
+        bounds,
+    ).scalar()
+    if not strays:
+        conn.execute(
+            text(f'CREATE TABLE "{name}" PARTITION OF "{table.name}" {values}')
+        )
+        return
+    conn.execute(
+        text(f'CREATE TABLE "{name}" (LIKE "{table.name}" INCLUDING DEFAULTS)')
+    )
+    moved = conn.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default}" '
+            "WHERE recorded_at >= :start AND recorded_at < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    ).rowcount
+    # attaching builds the partition's indexes and checks its rows
+    conn.execute(text(f'ALTER TABLE "{table.name}" ATTACH PARTITION "{name}" {values}'))
+    logger.warning(
+        "Moved %s rows from %s into the new partition %s", moved, default, name
+    )
+
+
+def drop_partitions_before(
+    conn: Connection, table: Table, cutoff: date
+) -> list[str]:
+    """Drop every daily partition that ends on or before `cutoff`."""
+    dropped = []
+    for name in sorted(list_partitions(conn, table)):
+        day = partition_day(table, name)
+        if day is None or day >= cutoff:
+            continue
+        conn.execute(text(f'ALTER TABLE "{table.name}" DETACH PARTITION "{name}"'))
+        conn.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    # the default partition only ever holds strays, so a DELETE is cheap there
+    if default_partition_name(table) in list_partitions(conn, table):
+        conn.execute(
+            text(
+                f'DELETE FROM "{default_partition_name(table)}" '
+                "WHERE recorded_at < :cutoff"
+            ),
+            {"cutoff": cutoff},
+        )
+    return dropped
+
+
+def maintain_partitions(
+    conn: Connection,
+    table: Table,
+    today: date | None = None,
+    days_ahead: int | None = None,
+    retention_days: int | None = None,
+) -> dict:
+    today = today or datetime.now(timezone.utc).date()
+    if days_ahead is None:
+        days_ahead = settings.tracking.PARTITION_DAYS_AHEAD
+    if retention_days is None:
+        retention_days = settings.tracking.RETENTION_DAYS
+    cutoff = today - timedelta(days=retention_days)
+
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+    )
+    last_day = today + timedelta(days=days_ahead)
+    created = create_partitions(conn, table, cutoff, last_day)
+    dropped = drop_partitions_before(conn, table, cutoff)
+    if created or dropped:
+        logger.info(
+            "%s partitions created=%s dropped=%s", table.name, created, dropped
+        )
+    return {"created": created, "dropped": dropped}
+
+
+def partitioned_tables() -> list[Table]:
+    from src.database.schema import trip_positions
+
+    return [trip_positions]
+
+
+async def run_maintenance(db_client) -> list[dict]:
+    results = []
+    async with db_client.begin() as conn:
+        for table in partitioned_tables():
+            results.append(await conn.run_sync(maintain_partitions, table))
+    return results
+
+
+async def maintenance_loop(db_client, interval: float | None = None):
+    """Background task: keep partitions ahead and retention enforced."""
+    interval = interval or settings.tracking.PARTITION_CHECK_SECONDS
+    while True:
+        try:
+            await run_maintenance(db_client)
+        except Exception as e:
+            logger.warning("Partition maintenance failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+def main(args):
+    from src.database.connection import get_engine
+
+    with get_engine().begin() as conn:
+        for table in partitioned_tables():
+            result = maintain_partitions(
+                conn,
+                table,
+                days_ahead=args.days_ahead,
+                retention_days=args.retention_days,
+            )
+            print(
+                f"{table.name}: created {result['created']}, "
+                f"dropped {result['dropped']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and retire daily partitions.")
+    parser.add_argument("--days-ahead", type=int, default=None)
+    parser.add_argument("--retention-days", type=int, default=None)
+    main(parser.parse_args())
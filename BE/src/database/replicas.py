@@ -0,0 +1,112 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+# Set once the current request/task has written through the primary, so its
+# later reads see those writes instead of a possibly lagging replica. A
+# request runs in its own context, so the pin ends with it; long-lived tasks
+# scope theirs with primary_scope().
+primary_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
+
+def pin_primary() -> Token:
+    """Keep the rest of this context on the primary; reset with the token."""
+    return primary_pinned.set(True)
+
+
+@contextmanager
+def primary_scope():
+    """Pins made inside this block (by writes) end with it."""
+    token = primary_pinned.set(primary_pinned.get())
+    try:
+        yield
+    finally:
+        primary_pinned.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send every statement in this block to the primary (read-your-writes)."""
+    token = primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        primary_pinned.reset(token)
+
+
+def is_replica_safe(query) -> bool:
+    # Only plain SELECTs may go to a replica; text() and SELECT ... FOR UPDATE
+    # stay on the primary.
+    return bool(getattr(query, "is_select", False)) and (
+        getattr(query, "_for_update_arg", None) is None
+    )
+
+
+def is_unavailable(e: Exception) -> bool:
+    # A dropped connection, or a failure before any statement ran (connect)
+    return isinstance(e, DBAPIError) and (
+        e.connection_invalidated or e.statement is None
+    )
+
+
+class ReplicaSet:
+    """
+    Picks a replica engine for each read, round-robin or by fewest checked
+    out connections. A replica that fails to connect is taken out of rotation
+    for `retry_after` seconds and then tried again.
+    """
+
+    def __init__(
+        self,
+        engines: list,
+        strategy: str = "round_robin",
+        retry_after: float = 30.0,
+    ):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"Replica strategy must be one of {REPLICA_STRATEGIES}")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._down_until = {id(engine): 0.0 for engine in self.engines}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def available(self) -> list:
+        current = time.monotonic()
+        return [
+            engine
+            for engine in self.engines
+            if self._down_until[id(engine)] <= current
+        ]
+
+    def choose(self):
+        candidates = self.available()
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda engine: engine.pool.checkedout())
+        return candidates[next(self._counter) % len(candidates)]
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + self.retry_after
+
+    def stats(self) -> list[dict]:
+        current = time.monotonic()
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "available": self._down_until[id(engine)] <= current,
+                "checked_out": engine.pool.checkedout(),
+            }
+            for engine in self.engines
+        ]
@@ -1,5 +1,15 @@
-from sqlalchemy import Table, Column, Text, Integer, DateTime, ForeignKey, Enum, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Table,
+    Column,
+    Text,
+    Integer,
+    DateTime,
+    ForeignKey,
+    Enum,
+    Float,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from src.database.execution import db_client
 # REMEMEBERRR handle sql injection
 
@@ -21,6 +31,11 @@ routes = Table(
     Column("name", Text),
     Column("description", Text),
     Column("status", status_enum),
+    # ordered polyline the buses drive, and the distance (m) from its first
+    # point to each point, computed when the shape is saved
+    Column("shape_latitudes", ARRAY(Float)),
+    Column("shape_longitudes", ARRAY(Float)),
+    Column("shape_distances", ARRAY(Float)),
     Column("created_at", DateTime, nullable=False, **db_client.default_now),
     Column(
         "updated_at",
@@ -38,6 +53,8 @@ stops = Table(
     Column("id", UUID(as_uuid=True), primary_key=True, default=db_client.new_uuid),
     Column("route_id", UUID(as_uuid=True), ForeignKey("routes.id")),
     Column("name", Text),
+    # position of the stop along its route, 1 = first stop
+    Column("sequence", Integer),
     Column("latitude", Float),
     Column("longitude", Float),
     Column("status", status_enum),
@@ -92,3 +109,64 @@ trips = Table(
     ),
     Column("deleted_at", DateTime, nullable=True),
 )
+
+# Position history: one row per GPS fix, range-partitioned by day on
+# recorded_at (see src/database/partitions.py for partition creation and
+# retention). (trip_id, recorded_at) is the natural key, so a batch re-sent
+# after a timeout is ingested idempotently; it includes the partition key, as
+# Postgres requires.
+trip_positions = Table(
+    "trip_positions",
+    db_client.metadata,
+    Column("trip_id", UUID(as_uuid=True), ForeignKey("trips.id"), primary_key=True),
+    Column("recorded_at", DateTime, primary_key=True),
+    Column("bus_id", UUID(as_uuid=True), ForeignKey("buses.id")),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("speed", Float),
+    Column("heading", Float),
+    Column("accuracy", Float),
+    # the fix snapped onto the route shape (map matching); NULL when the
+    # route has no shape or the fix was too far from it
+    Column("snapped_latitude", Float),
+    Column("snapped_longitude", Float),
+    Column("route_distance", Float),
+    Column("snap_offset", Float),
+    Column("created_at", DateTime, nullable=False, **db_client.default_now),
+    postgresql_partition_by="RANGE (recorded_at)",
+)
+
+# Arrivals at and departures from stops, detected from the trip's fixes by
+# the stop geofences (src/stops/geofence.py). One event of each kind per trip
+# and stop, so re-detection after a retry or restart is a no-op.
+stop_event_enum = Enum("arrival", "departure", name="stop_event")
+
+stop_events = Table(
+    "stop_events",
+    db_client.metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, default=db_client.new_uuid),
+    Column("trip_id", UUID(as_uuid=True), ForeignKey("trips.id"), nullable=False),
+    Column("stop_id", UUID(as_uuid=True), ForeignKey("stops.id"), nullable=False),
+    Column("bus_id", UUID(as_uuid=True), ForeignKey("buses.id")),
+    Column("event", stop_event_enum, nullable=False),
+    Column("recorded_at", DateTime, nullable=False),
+    Column("created_at", DateTime, nullable=False, **db_client.default_now),
+    UniqueConstraint("trip_id", "stop_id", "event"),
+)
+
+# Simplified track of a finished trip (see src/trips/compaction.py), kept
+# after its trip_positions partitions are dropped. Parallel arrays, one entry
+# per kept point.
+trip_tracks = Table(
+    "trip_tracks",
+    db_client.metadata,
+    Column("trip_id", UUID(as_uuid=True), ForeignKey("trips.id"), primary_key=True),
+    Column("recorded_at", ARRAY(DateTime), nullable=False),
+    Column("latitudes", ARRAY(Float), nullable=False),
+    Column("longitudes", ARRAY(Float), nullable=False),
+    Column("tolerance_m", Float, nullable=False),
+    Column("raw_points", Integer, nullable=False),
+    Column("kept_points", Integer, nullable=False),
+    Column("max_error_m", Float, nullable=False),
+    Column("created_at", DateTime, nullable=False, **db_client.default_now),
+)
@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+
+from src.database.execution import AsyncDBClient, async_db_client
+
+
+async def get_unit_of_work() -> AsyncIterator[AsyncDBClient]:
+    """
+    FastAPI dependency for a request-scoped unit of work.
+
+    Yields an AsyncDBClient bound to a single transaction on the primary.
+    FastAPI caches the dependency per request, so every query class built
+    from it shares that transaction; it commits once the endpoint returns
+    and rolls back if it raises. The connection is only checked out by the
+    first statement. Read-only endpoints should not depend on it at all, so
+    their reads can go to a replica.
+
+    Depend on it with `scope="function"`, so the commit runs before the
+    response is sent and a failed commit is reported to the client instead
+    of a success.
+    """
+    async with async_db_client.transaction() as uow:
+        yield uow
@@ -1,60 +1,68 @@
-from sqlalchemy import select, insert, update, delete, and_
-from src.database.schema import driver
-from src.authentications.hash import HashHelper
-from src.database.execution import db_client
+from sqlalchemy import select, insert, update, delete, and_, bindparam
+from src.drivers.schema import driver
+from src.authentications.hash import password_hasher
+from src.database.execution import AsyncDBClient, async_db_client
 from src.drivers.model import DriverCreate
 from uuid import UUID
 from datetime import datetime
 
 
+# Hot lookups, prebuilt with bind parameters (see COMPILED_CACHE_SIZE)
+get_user_by_id_stmt = select(driver).where(
+    and_(driver.c.id == bindparam("user_id"), driver.c.is_deleted.is_(False))
+)
+get_user_by_email_stmt = select(driver).where(
+    and_(driver.c.email == bindparam("email"), driver.c.is_deleted.is_(False))
+)
+
+
 class DriverQueries:
-    def __init__(self):
-        self.db_client = db_client
-        self.hash_helper = HashHelper()
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        # pass the request's unit of work to share its connection/transaction
+        self.db_client = db_client or async_db_client
+        self.hash_helper = password_hasher
 
-    def create_user(self, user_data: DriverCreate):
+    async def create_user(self, user_data: DriverCreate):
         data = dict(user_data.model_dump(exclude_unset=True))
-        data["password"] = self.hash_helper.hash_password(data["password"])
+        data["password"] = await self.hash_helper.hash_password(data["password"])
 
         stmt = insert(driver).values(**data).returning(driver)
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def get_user_by_id(self, user_id: UUID):
-        stmt = select(driver).where(
-            and_(driver.c.id == user_id, not driver.c.is_deleted)
+    async def get_user_by_id(self, user_id: UUID):
+        result = await self.db_client.execute_one(
+            get_user_by_id_stmt, {"user_id": user_id}
         )
-        result = self.db_client.execute_one(stmt)
         return result
 
-    def get_user_by_email(self, email: str):
-        stmt = select(driver).where(
-            and_(driver.c.email == email, driver.c.is_deleted.is_(False))
+    async def get_user_by_email(self, email: str):
+        result = await self.db_client.execute_one(
+            get_user_by_email_stmt, {"email": email}
         )
-        result = self.db_client.execute_one(stmt)
         return result
 
-    def update_user(self, user_id: UUID, update_data: dict):
+    async def update_user(self, user_id: UUID, update_data: dict):
         stmt = (
             update(driver)
             .where(driver.c.id == user_id)
             .values(**update_data)
             .returning(driver)
         )
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def soft_delete(self, user_id: UUID):
+    async def soft_delete(self, user_id: UUID):
         stmt = (
             update(driver)
             .where(driver.c.id == user_id)
             .values(is_deleted=True, is_active=False, deleted_at=datetime.now())
             .returning(driver)
         )
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
 
-    def hard_delete_user_by_id(self, user_id: UUID):
+    async def hard_delete_user_by_id(self, user_id: UUID):
         stmt = delete(driver).where(driver.c.id == user_id).returning(driver)
-        result = self.db_client.execute_one(stmt)
+        result = await self.db_client.execute_one(stmt)
         return result
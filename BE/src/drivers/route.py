@@ -4,12 +4,21 @@ from src.drivers.model import DriverCreate
 from src.drivers.service import DriverService
 from uuid import UUID
 from fastapi.responses import JSONResponse
+from src.database.execution import AsyncDBClient
+from src.database.unit_of_work import get_unit_of_work
 
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
 
-def get_driver_service():
+def get_driver_service(
+    uow: AsyncDBClient = Depends(get_unit_of_work, scope="function"),
+):
+    return DriverService(DriverQueries(uow))
+
+
+def get_driver_reader():
+    # read-only endpoints: no unit of work, so their reads may use a replica
     return DriverService(DriverQueries())
 
 
@@ -25,7 +34,7 @@ async def register_driver(
 @router.get("/{driver_id}", response_model=dict)
 async def get_driver(
     driver_id: UUID,
-    service: DriverService = Depends(get_driver_service),
+    service: DriverService = Depends(get_driver_reader),
 ):
     driver = await service.get_driver_by_id(driver_id)
     if not driver:
@@ -13,15 +13,16 @@ class CheckPermission:
         self.roles_queries = RoleQueries()
 
     def check_admin_access(self, admin_id: UUID, function_perme: List[str]):
-        admin_role_permissions = self.roles_queries.get_admin_role_permissions(admin_id)
-        if not admin_role_permissions:
+        # cached set of slugs: one hash lookup per required permission
+        admin_permissions = self.roles_queries.get_admin_permission_set(admin_id)
+        if not admin_permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. You don't have any permission to make this request.",
             )
 
         for perm in function_perme:
-            if perm in admin_role_permissions["permissions"]:
+            if perm in admin_permissions:
                 return True
         else:
             raise HTTPException(
@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two lat/lng points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_np(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine; arguments broadcast like NumPy arrays."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def cumulative_distances(latitudes, longitudes) -> np.ndarray:
+    """Distance in meters from the first point to each point of a line."""
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    steps = haversine_np(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def to_local_xy(latitudes, longitudes, origin_lat: float, origin_lng: float):
+    """
+    Equirectangular projection to meters around an origin: (x east, y north).
+    Accurate to well under a meter over a city-sized area, and cheap enough to
+    project whole fleets at once.
+    """
+    scale_x = METERS_PER_DEGREE * math.cos(math.radians(origin_lat))
+    x = (np.asarray(longitudes, dtype=float) - origin_lng) * scale_x
+    y = (np.asarray(latitudes, dtype=float) - origin_lat) * METERS_PER_DEGREE
+    return x, y
+
+
+def project_onto_polyline(
+    x, y, vertex_x: np.ndarray, vertex_y: np.ndarray, cumulative: np.ndarray
+):
+    """
+    Project points onto a polyline (all in local meters), vectorized over
+    points and segments. Returns (distance along the line, offset from it,
+    segment index) for each point.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))[:, None]
+    y = np.atleast_1d(np.asarray(y, dtype=float))[:, None]
+    ax, ay = vertex_x[:-1], vertex_y[:-1]
+    dx, dy = np.diff(vertex_x), np.diff(vertex_y)
+    length_sq = np.maximum(dx * dx + dy * dy, 1e-9)
+    t = np.clip(((x - ax) * dx + (y - ay) * dy) / length_sq, 0.0, 1.0)
+    offset_sq = (ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2
+    segment = np.argmin(offset_sq, axis=1)
+    rows = np.arange(len(segment))
+    along = cumulative[segment] + t[rows, segment] * np.sqrt(length_sq[segment])
+    return along, np.sqrt(offset_sq[rows, segment]), segment
+
+
+def simplify_track(x, y, seconds, tolerance_m: float):
+    """
+    Douglas-Peucker simplification of a timed track (local meters), using
+    the synchronized Euclidean distance: a dropped point is compared with
+    where the kept track puts the vehicle at that point's time, so dwells
+    and speed changes survive as well as turns. Returns (mask of kept points,
+    largest error of a dropped point in meters).
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    seconds = np.asarray(seconds, dtype=float)
+    keep = np.zeros(len(x), dtype=bool)
+    if len(x) <= 2:
+        keep[:] = True
+        return keep, 0.0
+    keep[0] = keep[-1] = True
+    max_error = 0.0
+    ranges = [(0, len(x) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        if last - first < 2:
+            continue
+        inner = slice(first + 1, last)
+        span = seconds[last] - seconds[first]
+        ratio = (seconds[inner] - seconds[first]) / span if span > 0 else 0.5
+        expected_x = x[first] + ratio * (x[last] - x[first])
+        expected_y = y[first] + ratio * (y[last] - y[first])
+        errors = np.hypot(x[inner] - expected_x, y[inner] - expected_y)
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance_m:
+            split = first + 1 + worst
+            keep[split] = True
+            ranges.append((first, split))
+            ranges.append((split, last))
+        else:
+            max_error = max(max_error, float(errors[worst]))
+    return keep, max_error
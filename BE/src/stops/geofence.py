@@ -0,0 +1,210 @@
+import asyncio
+import math
+import time
+from uuid import UUID
+
+import numpy as np
+
+from src.helpers.geo import to_local_xy
+from src.utils.config import settings
+
+
+class RouteStopGrid:
+    """
+    Precomputed grid of one route's stops for geofence checks.
+
+    Cells are TRACKING_GEOFENCE_EXIT_RADIUS_M wide and every stop is listed
+    in each cell its exit circle touches, so a fix only measures the few
+    stops of its own cell instead of every stop of the route.
+    """
+
+    def __init__(self, route_id: UUID, stops: list[dict]):
+        self.route_id = route_id
+        self.stop_ids = [stop["id"] for stop in stops]
+        self.stop_names = [stop.get("name") for stop in stops]
+        self.enter_radius = settings.tracking.GEOFENCE_RADIUS_M
+        self.exit_radius = max(
+            settings.tracking.GEOFENCE_EXIT_RADIUS_M, self.enter_radius
+        )
+        latitudes = np.array([stop["latitude"] for stop in stops], dtype=float)
+        longitudes = np.array([stop["longitude"] for stop in stops], dtype=float)
+        self.origin = (float(latitudes.mean()), float(longitudes.mean()))
+        self.x, self.y = to_local_xy(latitudes, longitudes, *self.origin)
+        # a route ending where it starts needs a visit elsewhere before the
+        # final stop can complete the trip
+        self.loop = (
+            math.hypot(self.x[-1] - self.x[0], self.y[-1] - self.y[0])
+            < 2 * self.exit_radius
+        )
+
+        self.points = list(zip(self.x.tolist(), self.y.tolist()))
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for index, (x, y) in enumerate(self.points):
+            for i in self._cell_range(x):
+                for j in self._cell_range(y):
+                    self.cells.setdefault((i, j), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.stop_ids)
+
+    def _cell_range(self, value: float) -> range:
+        # cells overlapped by [value - exit radius, value + exit radius]
+        cell = math.floor(value / self.exit_radius)
+        return range(cell - 1, cell + 2)
+
+    def distances(self, latitudes, longitudes) -> list[dict[int, float]]:
+        """For each fix, {stop index: meters} of the stops in its cell."""
+        x, y = to_local_xy(latitudes, longitudes, *self.origin)
+        cell = self.exit_radius
+        result = []
+        for fix_x, fix_y in zip(x.tolist(), y.tolist()):
+            members = self.cells.get(
+                (math.floor(fix_x / cell), math.floor(fix_y / cell)), ()
+            )
+            result.append(
+                {
+                    index: math.hypot(
+                        self.points[index][0] - fix_x, self.points[index][1] - fix_y
+                    )
+                    for index in members
+                }
+            )
+        return result
+
+
+class TripFence:
+    """Geofence state of one trip: the stop it is at, and stops visited."""
+
+    def __init__(self):
+        self.inside: int | None = None
+        self.visited: set[int] = set()
+
+    @classmethod
+    def from_events(cls, grid: RouteStopGrid, events: list[dict]) -> "TripFence":
+        """
+        Rebuild the state from the trip's stored stop events, in recorded_at
+        order: every stop arrived at is visited, and the bus is still inside
+        the last one if it has not departed from it.
+        """
+        fence = cls()
+        indexes = {}
+        for index, stop_id in enumerate(grid.stop_ids):
+            indexes.setdefault(stop_id, index)
+        for event in events:
+            index = indexes.get(event["stop_id"])
+            if index is None:
+                continue
+            if event["event"] == "arrival":
+                fence.visited.add(index)
+                fence.inside = index
+            elif fence.inside == index:
+                fence.inside = None
+        return fence
+
+
+class GeofenceTracker:
+    """
+    Turns a trip's fixes into stop arrival and departure events. A bus
+    arrives when it comes within TRACKING_GEOFENCE_RADIUS_M of a stop and
+    departs once it is further than TRACKING_GEOFENCE_EXIT_RADIUS_M, so GPS
+    jitter at the fence edge does not produce repeated events.
+
+    A trip's fence state is rebuilt from its stored stop events for every
+    batch (`TripFence.from_events`), so it survives restarts and does not
+    depend on which worker receives the batch. Only the route grids are
+    cached here: rebuilt after TRACKING_STOP_INDEX_REFRESH_SECONDS, like the
+    stop index, and invalidated after a route change commits.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        if ttl is None:
+            ttl = settings.tracking.STOP_INDEX_REFRESH_SECONDS
+        self.ttl = ttl
+        # route_id -> (monotonic deadline, grid); routes without placed stops
+        # are not cached
+        self.grids: dict[UUID, tuple[float, RouteStopGrid]] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+
+    def _cached(self, route_id: UUID) -> RouteStopGrid | None:
+        entry = self.grids.get(route_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self.grids.pop(route_id, None)
+            return None
+        return entry[1]
+
+    async def grid(self, route_id: UUID, load_stops) -> RouteStopGrid | None:
+        """The route's stop grid, built from `load_stops(route_id)`."""
+        grid = self._cached(route_id)
+        if grid is not None:
+            return grid
+        lock = self._locks.setdefault(route_id, asyncio.Lock())
+        async with lock:
+            grid = self._cached(route_id)
+            if grid is not None:
+                return grid
+            stops = [
+                stop
+                for stop in await load_stops(route_id)
+                if stop["latitude"] is not None and stop["longitude"] is not None
+            ]
+            if not stops:
+                return None
+            grid = RouteStopGrid(route_id, stops)
+            if self.ttl > 0:
+                self.grids[route_id] = (time.monotonic() + self.ttl, grid)
+            return grid
+
+    def invalidate_route(self, route_id: UUID):
+        self.grids.pop(route_id, None)
+
+    def check(self, grid: RouteStopGrid, fence: TripFence, fixes: list[dict]):
+        """
+        Feed time-ordered fixes (latitude, longitude, recorded_at) through
+        the trip's `fence`, which is updated in place. Returns (events,
+        completed): the arrival/departure events, and whether the trip
+        arrived at its final stop.
+        """
+        events, completed = [], False
+        candidates = grid.distances(
+            [fix["latitude"] for fix in fixes], [fix["longitude"] for fix in fixes]
+        )
+        final = len(grid) - 1
+        for fix, nearby in zip(fixes, candidates):
+            if fence.inside is not None:
+                if nearby.get(fence.inside, math.inf) <= grid.exit_radius:
+                    continue
+                events.append(stop_event(grid, fence.inside, "departure", fix))
+                fence.inside = None
+            inside = {
+                index: distance
+                for index, distance in nearby.items()
+                if distance <= grid.enter_radius
+            }
+            if not inside:
+                continue
+            index = min(inside, key=inside.get)
+            toured = bool(fence.visited - {0, final})
+            if grid.loop and final in inside and toured:
+                # back where a loop route started: this is the final stop
+                index = final
+            fence.inside = index
+            events.append(stop_event(grid, index, "arrival", fix))
+            if index == final and (toured or not grid.loop):
+                completed = True
+                break
+            fence.visited.add(index)
+        return events, completed
+
+
+def stop_event(grid: RouteStopGrid, index: int, event: str, fix: dict) -> dict:
+    return {
+        "stop_id": grid.stop_ids[index],
+        "stop_name": grid.stop_names[index],
+        "event": event,
+        "recorded_at": fix["recorded_at"],
+    }
+
+
+geofences = GeofenceTracker()
@@ -0,0 +1,231 @@
+import asyncio
+import heapq
+import math
+import time
+from datetime import datetime
+from uuid import UUID
+
+from src.helpers.geo import METERS_PER_DEGREE, haversine_m
+from src.utils.config import settings
+
+
+class StopIndex:
+    """
+    In-memory grid index over `stops` for nearest-stop and radius queries.
+
+    Stops are bucketed into square lat/lng cells of `cell_degrees`. A query
+    only measures (haversine) the stops in the cells around the point,
+    widening ring by ring until no unvisited cell can hold a closer stop.
+
+    The index is kept current incrementally: `sync` loads only the stops
+    whose updated_at moved past the last one seen and upserts or removes
+    them, so a change costs one cell update, not a rebuild.
+    """
+
+    def __init__(self, cell_degrees: float | None = None):
+        self.cell_degrees = (
+            cell_degrees or settings.tracking.STOP_INDEX_CELL_DEGREES
+        )
+        # stop_id -> (latitude, longitude, cell, JSON-ready stop)
+        self._stops: dict[UUID, tuple[float, float, tuple[int, int], dict]] = {}
+        self._cells: dict[tuple[int, int], dict[UUID, tuple[float, float]]] = {}
+        # (min i, min j, max i, max j) of the occupied cells; None when stale
+        self._bounds: tuple[int, int, int, int] | None = None
+        self._watermark: datetime | None = None
+        self._synced_at: float | None = None
+        self._sync_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._stops)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor(longitude / self.cell_degrees),
+        )
+
+    def upsert(self, stop: dict):
+        """Index a stop row; deleted or unplaced stops are removed instead."""
+        if (
+            stop.get("deleted_at") is not None
+            or stop.get("latitude") is None
+            or stop.get("longitude") is None
+        ):
+            self.remove(stop["id"])
+            return
+        latitude, longitude = stop["latitude"], stop["longitude"]
+        cell = self._cell(latitude, longitude)
+        current = self._stops.get(stop["id"])
+        if current is not None and current[2] != cell:
+            self.remove(stop["id"])
+        route_id = stop.get("route_id")
+        payload = {
+            "id": str(stop["id"]),
+            "route_id": str(route_id) if route_id is not None else None,
+            "name": stop.get("name"),
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+        self._stops[stop["id"]] = (latitude, longitude, cell, payload)
+        self._cells.setdefault(cell, {})[stop["id"]] = (latitude, longitude)
+        if self._bounds is not None:
+            i0, j0, i1, j1 = self._bounds
+            i, j = cell
+            self._bounds = (min(i0, i), min(j0, j), max(i1, i), max(j1, j))
+
+    def remove(self, stop_id: UUID):
+        current = self._stops.pop(stop_id, None)
+        if current is None:
+            return
+        members = self._cells.get(current[2])
+        if members is not None:
+            members.pop(stop_id, None)
+            if not members:
+                del self._cells[current[2]]
+        self._bounds = None
+
+    def _grid_bounds(self) -> tuple[int, int, int, int]:
+        if self._bounds is None:
+            rows = [i for i, _ in self._cells]
+            columns = [j for _, j in self._cells]
+            self._bounds = (min(rows), min(columns), max(rows), max(columns))
+        return self._bounds
+
+    def _ring(self, center: tuple[int, int], radius: int, bounds):
+        """Cells of the ring `radius` around `center` inside the grid bounds."""
+        ci, cj = center
+        i0, j0, i1, j1 = bounds
+        if radius == 0:
+            yield center
+            return
+        first_j, last_j = max(cj - radius, j0), min(cj + radius, j1)
+        for i in (ci - radius, ci + radius):
+            if i0 <= i <= i1:
+                for j in range(first_j, last_j + 1):
+                    yield (i, j)
+        first_i, last_i = max(ci - radius + 1, i0), min(ci + radius - 1, i1)
+        for j in (cj - radius, cj + radius):
+            if j0 <= j <= j1:
+                for i in range(first_i, last_i + 1):
+                    yield (i, j)
+
+    def _cell_width_m(self, latitude: float) -> float:
+        # the narrower (east-west) side of a cell at this latitude
+        return self.cell_degrees * METERS_PER_DEGREE * max(
+            math.cos(math.radians(latitude)), 0.01
+        )
+
+    def _result(self, distance: float, stop_id: UUID) -> dict:
+        return {**self._stops[stop_id][3], "distance_m": round(distance, 1)}
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 10,
+        max_distance_m: float | None = None,
+    ) -> list[dict]:
+        """The `k` closest stops, nearest first, optionally within a radius."""
+        if not self._stops or k <= 0:
+            return []
+        center = self._cell(latitude, longitude)
+        cell_width = self._cell_width_m(latitude)
+        bounds = self._grid_bounds()
+        ci, cj = center
+        i0, j0, i1, j1 = bounds
+        # rings before `radius` lie wholly outside the grid, and the grid is
+        # covered once the rings reach its far corner
+        radius = max(i0 - ci, ci - i1, j0 - cj, cj - j1, 0)
+        last_ring = max(ci - i0, i1 - ci, cj - j0, j1 - cj)
+        max_rings = min(self._max_rings(latitude, max_distance_m), last_ring)
+        best: list[tuple[float, UUID]] = []  # max-heap of (-distance, stop_id)
+        visited = 0
+        while radius <= max_rings:
+            for cell in self._ring(center, radius, bounds):
+                members = self._cells.get(cell)
+                if not members:
+                    continue
+                visited += len(members)
+                for stop_id, (stop_lat, stop_lng) in members.items():
+                    distance = haversine_m(latitude, longitude, stop_lat, stop_lng)
+                    if max_distance_m is not None and distance > max_distance_m:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, stop_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, stop_id))
+            # every stop beyond ring `radius` is at least this far away
+            if len(best) == k and -best[0][0] <= radius * cell_width:
+                break
+            if visited == len(self._stops):
+                break
+            radius += 1
+        return [
+            self._result(-distance, stop_id)
+            for distance, stop_id in sorted(best, reverse=True)
+        ]
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Every stop within `radius_m`, nearest first (at most `limit`)."""
+        if not self._stops:
+            return []
+        # only the cells overlapping the circle's bounding box
+        d_lat = radius_m / METERS_PER_DEGREE
+        d_lng = radius_m / (
+            METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+        )
+        south, west = self._cell(latitude - d_lat, longitude - d_lng)
+        north, east = self._cell(latitude + d_lat, longitude + d_lng)
+        i0, j0, i1, j1 = self._grid_bounds()
+        south, west = max(south, i0), max(west, j0)
+        north, east = min(north, i1), min(east, j1)
+        found = []
+        for i in range(south, north + 1):
+            for j in range(west, east + 1):
+                members = self._cells.get((i, j))
+                if not members:
+                    continue
+                for stop_id, (stop_lat, stop_lng) in members.items():
+                    distance = haversine_m(latitude, longitude, stop_lat, stop_lng)
+                    if distance <= radius_m:
+                        found.append((distance, stop_id))
+        found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [self._result(distance, stop_id) for distance, stop_id in found]
+
+    def _max_rings(self, latitude: float, distance_m: float | None) -> float:
+        if distance_m is None:
+            # unbounded: capped by the grid bounds in `nearest`
+            return math.inf
+        return math.ceil(distance_m / self._cell_width_m(latitude)) + 1
+
+    async def sync(self, load) -> int:
+        """
+        Apply the stops changed since the last sync. `load(since)` returns
+        stop rows with updated_at >= since (every stop when since is None),
+        including soft-deleted ones so they can be dropped.
+        """
+        async with self._sync_lock:
+            rows = await load(self._watermark)
+            for row in rows:
+                self.upsert(row)
+                if self._watermark is None or row["updated_at"] > self._watermark:
+                    self._watermark = row["updated_at"]
+            self._synced_at = time.monotonic()
+            return len(rows)
+
+    async def ensure_fresh(self, load, max_age: float | None = None):
+        if max_age is None:
+            max_age = settings.tracking.STOP_INDEX_REFRESH_SECONDS
+        if self._synced_at is None or time.monotonic() - self._synced_at > max_age:
+            await self.sync(load)
+
+
+stop_index = StopIndex()
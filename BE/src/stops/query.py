@@ -0,0 +1,58 @@
+from sqlalchemy import select, and_, bindparam
+from src.database.schema import stops
+from src.database.execution import AsyncDBClient, async_db_client
+from datetime import datetime
+from uuid import UUID
+
+
+index_columns = [
+    stops.c.id,
+    stops.c.route_id,
+    stops.c.name,
+    stops.c.latitude,
+    stops.c.longitude,
+    stops.c.updated_at,
+    stops.c.deleted_at,
+]
+get_all_stops_stmt = select(*index_columns).where(stops.c.deleted_at.is_(None))
+# soft-deleted stops are included so the index can drop them
+get_changed_stops_stmt = select(*index_columns).where(
+    stops.c.updated_at >= bindparam("since")
+)
+# A route's stops in travel order
+get_route_stops_stmt = (
+    select(stops)
+    .where(
+        and_(stops.c.route_id == bindparam("route_id"), stops.c.deleted_at.is_(None))
+    )
+    .order_by(stops.c.sequence, stops.c.created_at)
+)
+get_stop_by_id_stmt = select(stops).where(
+    and_(stops.c.id == bindparam("stop_id"), stops.c.deleted_at.is_(None))
+)
+
+
+class StopQueries:
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        self.db_client = db_client or async_db_client
+
+    async def get_changed_stops(self, since: datetime | None):
+        if since is None:
+            result = await self.db_client.execute_all(get_all_stops_stmt)
+        else:
+            result = await self.db_client.execute_all(
+                get_changed_stops_stmt, {"since": since}
+            )
+        return result or []
+
+    async def get_route_stops(self, route_id: UUID):
+        result = await self.db_client.execute_all(
+            get_route_stops_stmt, {"route_id": route_id}
+        )
+        return result or []
+
+    async def get_stop_by_id(self, stop_id: UUID):
+        result = await self.db_client.execute_one(
+            get_stop_by_id_stmt, {"stop_id": stop_id}
+        )
+        return result
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from src.stops.index import stop_index
+from src.stops.query import StopQueries
+from src.stops.service import StopService
+from typing import Optional
+from uuid import UUID
+from fastapi.responses import JSONResponse
+
+
+router = APIRouter(prefix="/stops", tags=["Stops"])
+
+
+def get_stop_service():
+    return StopService(stop_index, StopQueries())
+
+
+@router.get("/nearby", response_model=dict)
+async def get_nearby_stops(
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    k: int = Query(default=10, ge=1, le=100),
+    radius: Optional[float] = Query(default=None, gt=0, le=50_000),
+    service: StopService = Depends(get_stop_service),
+):
+    # k nearest stops, or (with radius, in meters) the nearest k within it
+    status_code, result = await service.get_nearby_stops(
+        latitude, longitude, k, radius
+    )
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{stop_id}/eta", response_model=dict)
+async def get_stop_eta(
+    stop_id: UUID,
+    service: StopService = Depends(get_stop_service),
+):
+    # upcoming arrivals of the route's in-progress trips, soonest first
+    status_code, result = await service.get_stop_eta(stop_id)
+    return JSONResponse(content=result, status_code=status_code)
@@ -0,0 +1,61 @@
+from src.bus_locations.live import live_positions
+from src.bus_locations.query import BusLocationQueries
+from src.bus_routes.query import RouteQueries
+from src.stops.index import StopIndex
+from src.stops.query import StopQueries
+from src.trips.eta import eta_engine
+from src.trips.models import GPSFix, to_naive_utc
+from src.trips.query import TripQueries
+from fastapi.encoders import jsonable_encoder
+from fastapi import status
+from typing import Optional
+from uuid import UUID
+
+
+class StopService:
+    def __init__(self, index: StopIndex, queries: StopQueries):
+        self.index = index
+        self.queries = queries
+
+    async def get_nearby_stops(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius_m: Optional[float] = None,
+    ):
+        # Pulls only stops changed since the last sync, at most every
+        # TRACKING_STOP_INDEX_REFRESH_SECONDS; the lookup itself is in memory
+        await self.index.ensure_fresh(self.queries.get_changed_stops)
+        if radius_m is None:
+            nearby = self.index.nearest(latitude, longitude, k)
+        else:
+            nearby = self.index.within(latitude, longitude, radius_m, limit=k)
+        return status.HTTP_200_OK, {"stops": nearby}
+
+    async def get_stop_eta(self, stop_id: UUID):
+        stop = await self.queries.get_stop_by_id(stop_id)
+        if not stop:
+            message = {"detail": "Stop not found"}
+            return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+        route_id = stop["route_id"]
+        route = await eta_engine.route_model(
+            route_id,
+            self.queries.get_route_stops,
+            TripQueries().get_route_history,
+            RouteQueries().get_route_shape,
+        )
+        if route is None or stop_id not in route.stop_index:
+            result = {"stop_id": stop_id, "arrivals": []}
+            return status.HTTP_200_OK, jsonable_encoder(result)
+        # buses this process has not estimated yet start from their live fix
+        await live_positions.ensure_hydrated(BusLocationQueries().get_live_trips)
+        for position in live_positions.for_route(route_id):
+            trip_id = UUID(position["trip_id"])
+            if trip_id not in eta_engine.trips:
+                fix = GPSFix.model_validate(position)
+                fix.recorded_at = to_naive_utc(fix.recorded_at)
+                eta_engine.observe(trip_id, route, [fix])
+        arrivals = eta_engine.stop_etas(route, stop_id)
+        result = {"stop_id": stop_id, "arrivals": arrivals}
+        return status.HTTP_200_OK, jsonable_encoder(result)
@@ -3,13 +3,22 @@ from src.students.model import StudentBase
 from src.students.service import StudentService
 from uuid import UUID
 from fastapi.responses import JSONResponse
+from src.database.execution import AsyncDBClient
+from src.database.unit_of_work import get_unit_of_work
 from students.query import StudentQueries
 
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
-def get_student_service():
+def get_student_service(
+    uow: AsyncDBClient = Depends(get_unit_of_work, scope="function"),
+):
+    return StudentService(StudentQueries(uow))
+
+
+def get_student_reader():
+    # read-only endpoints: no unit of work, so their reads may use a replica
     return StudentService(StudentQueries())
 
 
@@ -25,7 +34,7 @@ async def register_student(
 @router.get("/{student_id}", response_model=dict)
 async def get_student(
     student_id: UUID,
-    service: StudentService = Depends(get_student_service),
+    service: StudentService = Depends(get_student_reader),
 ):
     student = await service.get_student_by_id(student_id)
     if not student:
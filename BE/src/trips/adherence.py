@@ -0,0 +1,139 @@
+"""
+Schedule adherence: how late each in-progress trip runs against its bus's
+planned start_time/end_time, and the delayed <-> in_progress transitions.
+
+A trip's progress is the share of the route's learned travel time (see
+src/trips/eta.py) already covered at its current position, so a bus that
+is slow on a stretch that is always slow is not flagged. The schedule expects
+that share of the planned duration to have elapsed; lateness is how far
+"now" is past that moment. Lateness and the new statuses are computed for
+the whole active fleet with array operations, and all changes are written
+with one statement per cycle.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.bus_routes.query import RouteQueries
+from src.database.replicas import primary_scope
+from src.stops.query import StopQueries
+from src.trips.eta import eta_engine, to_seconds
+from src.trips.query import TripQueries
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["in_progress", "delayed"]
+
+
+def lateness_seconds(now, start, end, progress) -> np.ndarray:
+    """Seconds behind schedule (negative when early), per trip."""
+    return now - (start + np.clip(progress, 0.0, 1.0) * (end - start))
+
+
+def next_delayed(lateness: np.ndarray, delayed: np.ndarray) -> np.ndarray:
+    # hysteresis: late trips turn delayed, and only recover well under it
+    late = np.where(
+        delayed,
+        lateness >= settings.tracking.DELAY_CLEAR_SECONDS,
+        lateness > settings.tracking.DELAY_THRESHOLD_SECONDS,
+    )
+    # unknown lateness (NaN) keeps the trip's current status
+    return np.where(np.isnan(lateness), delayed, late)
+
+
+async def trip_progress(trips: list[dict], queries: TripQueries) -> np.ndarray:
+    """
+    Share of the route's travel time each trip has covered (0..1); NaN when
+    it is unknown, for routes without a usable model.
+    """
+    progress = np.full(len(trips), np.nan)
+    by_route: dict = {}
+    for index, trip in enumerate(trips):
+        by_route.setdefault(trip["route_id"], []).append(index)
+    for route_id, indexes in by_route.items():
+        route = await eta_engine.route_model(
+            route_id,
+            StopQueries(queries.db_client).get_route_stops,
+            queries.get_route_history,
+            RouteQueries(queries.db_client).get_route_shape,
+        )
+        if route is None or route.stop_time[-1] <= 0:
+            continue
+        distance = np.zeros(len(indexes))
+        unseen = []
+        for slot, index in enumerate(indexes):
+            tracked = eta_engine.trips.get(trips[index]["id"])
+            if tracked is not None:
+                distance[slot] = tracked.distance
+            elif trips[index]["latitude"] is not None:
+                unseen.append(slot)
+        if unseen:
+            # trips this process has not ingested: their last stored position
+            along, _ = route.project(
+                [trips[indexes[slot]]["latitude"] for slot in unseen],
+                [trips[indexes[slot]]["longitude"] for slot in unseen],
+            )
+            distance[unseen] = along
+        progress[indexes] = route.time_at(distance) / route.stop_time[-1]
+    return progress
+
+
+async def evaluate_adherence(queries: TripQueries | None = None) -> dict:
+    """One cycle: compute lateness for the fleet, write any status flips."""
+    queries = queries or TripQueries()
+    trips = await queries.get_active_schedules(ACTIVE_STATUSES)
+    if not trips:
+        return {"trips": 0, "delayed": 0, "changed": 0}
+    progress = await trip_progress(trips, queries)
+    now = to_seconds([datetime.now(timezone.utc).replace(tzinfo=None)])[0]
+    lateness = lateness_seconds(
+        now,
+        to_seconds([trip["start_time"] for trip in trips]),
+        to_seconds([trip["end_time"] for trip in trips]),
+        progress,
+    )
+    delayed = np.array([trip["status"] == "delayed" for trip in trips])
+    delayed_now = next_delayed(lateness, delayed)
+    changes = [
+        {
+            "trip_id": trips[index]["id"],
+            "bus_id": trips[index]["bus_id"],
+            "status": "delayed" if delayed_now[index] else "in_progress",
+        }
+        for index in np.flatnonzero(delayed_now != delayed)
+    ]
+    updated = await queries.apply_status_changes(changes, ACTIVE_STATUSES)
+    return {
+        "trips": len(trips),
+        "delayed": int(delayed_now.sum()),
+        "changed": len(updated),
+        "max_lateness_s": (
+            round(float(np.nanmax(lateness)), 1)
+            if not np.isnan(lateness).all()
+            else None
+        ),
+    }
+
+
+async def adherence_loop(interval: float | None = None):
+    """Background task: re-evaluate schedule adherence periodically."""
+    interval = interval or settings.tracking.ADHERENCE_INTERVAL_SECONDS
+    while True:
+        try:
+            # each run reads from the replicas again after its writes
+            with primary_scope():
+                result = await evaluate_adherence()
+            if result["changed"]:
+                logger.info(
+                    "Schedule adherence: %d trips, %d delayed, %d changed",
+                    result["trips"],
+                    result["delayed"],
+                    result["changed"],
+                )
+        except Exception as e:
+            logger.warning("Schedule adherence check failed: %s", e)
+        await asyncio.sleep(interval)
@@ -0,0 +1,152 @@
+"""
+Compaction of finished trips' position history.
+
+A finished trip's fixes (snapped where map matching placed them) are
+simplified with time-aware Douglas-Peucker to within
+TRACKING_COMPACTION_TOLERANCE_M and stored as one trip_tracks row. History
+queries read that track by default; the full-resolution fixes stay readable
+until their daily trip_positions partition is dropped by retention.
+
+Run once (from BE/):
+    python -m src.trips.compaction --limit 100 --tolerance 10
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import timedelta
+
+import numpy as np
+
+from src.database.replicas import primary_scope
+from src.helpers.geo import simplify_track, to_local_xy
+from src.trips.eta import to_seconds
+from src.trips.query import TripQueries
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Trips whose history is complete
+FINISHED_STATUSES = ["arrived"]
+# Fixes can be stamped slightly outside the trip row's own timestamps
+WINDOW_SLACK = timedelta(hours=1)
+
+
+def compact_positions(trip_id, rows: list[dict], tolerance_m: float) -> dict:
+    """The trip_tracks row for a trip's time-ordered fixes."""
+    if not rows:
+        # recorded so the trip is not picked up again
+        return {
+            "trip_id": trip_id,
+            "recorded_at": [],
+            "latitudes": [],
+            "longitudes": [],
+            "tolerance_m": tolerance_m,
+            "raw_points": 0,
+            "kept_points": 0,
+            "max_error_m": 0.0,
+        }
+    # the map-matched point where there is one, as shown on the live map
+    prefix = [
+        "snapped_" if row.get("snapped_latitude") is not None else "" for row in rows
+    ]
+    latitudes = np.array([row[p + "latitude"] for row, p in zip(rows, prefix)])
+    longitudes = np.array([row[p + "longitude"] for row, p in zip(rows, prefix)])
+    recorded_at = [row["recorded_at"] for row in rows]
+    x, y = to_local_xy(latitudes, longitudes, latitudes.mean(), longitudes.mean())
+    keep, max_error = simplify_track(x, y, to_seconds(recorded_at), tolerance_m)
+    kept = np.flatnonzero(keep)
+    return {
+        "trip_id": trip_id,
+        "recorded_at": [recorded_at[i] for i in kept],
+        "latitudes": latitudes[kept].tolist(),
+        "longitudes": longitudes[kept].tolist(),
+        "tolerance_m": tolerance_m,
+        "raw_points": len(rows),
+        "kept_points": len(kept),
+        "max_error_m": round(max_error, 2),
+    }
+
+
+def track_stats(track: dict) -> dict:
+    kept = track["kept_points"]
+    return {
+        "trip_id": str(track["trip_id"]),
+        "raw_points": track["raw_points"],
+        "kept_points": kept,
+        "compression_ratio": round(track["raw_points"] / kept, 1) if kept else None,
+        "max_error_m": track["max_error_m"],
+    }
+
+
+def summarize(results: list[dict]) -> str:
+    raw = sum(result["raw_points"] for result in results)
+    kept = sum(result["kept_points"] for result in results)
+    ratio = f"{raw / kept:.1f}x" if kept else "-"
+    max_error = max(result["max_error_m"] for result in results)
+    return (
+        f"{len(results)} trips: {raw} -> {kept} points ({ratio}), "
+        f"max error {max_error} m"
+    )
+
+
+async def run_compaction(
+    queries: TripQueries | None = None,
+    tolerance_m: float | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Compact up to `limit` finished trips; returns each trip's stats."""
+    queries = queries or TripQueries()
+    tolerance_m = tolerance_m or settings.tracking.COMPACTION_TOLERANCE_M
+    limit = limit or settings.tracking.COMPACTION_BATCH_TRIPS
+    results = []
+    for trip in await queries.get_trips_to_compact(FINISHED_STATUSES, limit):
+        # the trip's own timestamps bound the scan to its partitions
+        start = trip["created_at"] - WINDOW_SLACK
+        end = (trip["current_time"] or trip["created_at"]) + WINDOW_SLACK
+        rows = await queries.get_positions(trip["id"], start, end)
+        track = compact_positions(trip["id"], rows, tolerance_m)
+        await queries.insert_track(track)
+        results.append(track_stats(track))
+    return results
+
+
+async def compaction_loop(interval: float | None = None):
+    """Background task: compact trips as they finish."""
+    interval = interval or settings.tracking.COMPACTION_INTERVAL_SECONDS
+    while True:
+        try:
+            # each run reads from the replicas again after its writes
+            with primary_scope():
+                results = await run_compaction()
+            if results:
+                logger.info("Compacted %s", summarize(results))
+        except Exception as e:
+            logger.warning("Trip compaction failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+async def main(args):
+    from src.database.connection import dispose_engines
+
+    try:
+        results = await run_compaction(tolerance_m=args.tolerance, limit=args.limit)
+    finally:
+        await dispose_engines()
+    for result in results:
+        print(
+            f"{result['trip_id']}: {result['raw_points']} -> "
+            f"{result['kept_points']} points ({result['compression_ratio']}x), "
+            f"max error {result['max_error_m']} m"
+        )
+    if results:
+        print(summarize(results))
+    else:
+        print("No finished trips to compact")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact finished trips' history.")
+    parser.add_argument("--tolerance", type=float, default=None, help="meters")
+    parser.add_argument("--limit", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
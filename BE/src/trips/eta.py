@@ -0,0 +1,327 @@
+"""
+Arrival-time estimates for the remaining stops of in-progress trips.
+
+Each route is modelled as its ordered stops placed along the route's shape:
+the along-route distance of every stop and, per segment between consecutive
+stops, a learned travel speed. Speeds start from the route's recent history
+in trip_positions and are nudged by every new fix (exponential smoothing), so
+the model keeps up with the day's traffic.
+
+A trip's ETAs are the historical travel time from the bus's position to each
+stop, scaled by how fast this bus has actually been moving, with that
+correction fading out for stops further ahead. Estimates for many buses and
+stops are one NumPy expression; a new fix only recomputes its own trip.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import numpy as np
+
+from src.bus_routes.geometry import RouteGeometry, route_geometries
+from src.utils.config import settings
+
+# Fix pairs further apart than this say little about segment speed
+MAX_SAMPLE_GAP_SECONDS = 300
+MAX_PLAUSIBLE_SPEED_MPS = 40
+# Floor for learned segment speeds, so a long dwell cannot stall the model
+MIN_SEGMENT_SPEED_MPS = 1.0
+# Correction bounds: this bus vs the learned speed for the same stretch
+MIN_SPEED_RATIO, MAX_SPEED_RATIO = 0.3, 2.5
+
+
+def to_seconds(values) -> np.ndarray:
+    # naive-UTC datetimes -> float epoch seconds
+    return np.array(values, dtype="datetime64[us]").astype(np.int64) / 1e6
+
+
+class RouteModel:
+    """Ordered stops of one route along its shape, with learned segment speeds."""
+
+    def __init__(
+        self, route_id: UUID, stops: list[dict], geometry: RouteGeometry | None = None
+    ):
+        self.route_id = route_id
+        self.stop_ids = [stop["id"] for stop in stops]
+        self.stop_names = [stop.get("name") for stop in stops]
+        self.stop_index = {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+        # without a stored shape, buses are assumed to drive stop to stop
+        self.geometry = geometry or RouteGeometry.from_stops(stops)
+        along, _ = self.geometry.project(
+            [stop["latitude"] for stop in stops],
+            [stop["longitude"] for stop in stops],
+        )
+        # along-route distance of each stop; stops are in travel order
+        self.stop_distance = np.maximum.accumulate(along)
+        self.segment_length = np.diff(self.stop_distance)
+        self.segment_speed = np.full(
+            len(self.segment_length), settings.tracking.ETA_DEFAULT_SPEED_MPS
+        )
+        self._refresh_times()
+
+    def _refresh_times(self):
+        # learned travel time from the first stop to each stop
+        self.stop_time = np.concatenate(
+            ([0.0], np.cumsum(self.segment_length / self.segment_speed))
+        )
+
+    def project(self, latitudes, longitudes, start=None, end=None):
+        """
+        (along-route distance, index of the stop-to-stop segment) of each
+        position, searching only between `start` and `end` when given.
+        """
+        along, _ = self.geometry.project(latitudes, longitudes, start, end)
+        segment = np.searchsorted(self.stop_distance, along, side="right") - 1
+        return along, np.clip(segment, 0, len(self.segment_length) - 1)
+
+    def time_at(self, distance):
+        return np.interp(distance, self.stop_distance, self.stop_time)
+
+    def learn(self, segments: np.ndarray, speeds: np.ndarray, weight: float):
+        """Blend observed speeds into the segments they were measured on."""
+        if not len(segments):
+            return
+        count = len(self.segment_speed)
+        totals = np.bincount(segments, weights=speeds, minlength=count)
+        samples = np.bincount(segments, minlength=count)
+        seen = samples > 0
+        observed = totals[seen] / samples[seen]
+        self.segment_speed[seen] += weight * (observed - self.segment_speed[seen])
+        np.maximum(self.segment_speed, MIN_SEGMENT_SPEED_MPS, out=self.segment_speed)
+        self._refresh_times()
+
+    def learn_history(self, rows: list[dict]):
+        """
+        Seed segment speeds from past fixes (trip_id, recorded_at, latitude,
+        longitude), ordered by trip then time.
+        """
+        if len(rows) < 2:
+            return
+        trips = np.array([hash(row["trip_id"]) for row in rows])
+        seconds = to_seconds([row["recorded_at"] for row in rows])
+        along, segment = self.project(
+            [row["latitude"] for row in rows], [row["longitude"] for row in rows]
+        )
+        segments, speeds = sample_speeds(trips, seconds, along, segment)
+        # history replaces the default outright
+        self.learn(segments, speeds, weight=1.0)
+
+    def estimate(self, distance: np.ndarray, speed_ratio: np.ndarray) -> np.ndarray:
+        """
+        Seconds from each bus (along-route `distance`, shape (buses,)) to
+        every stop, shape (buses, stops); NaN for stops already passed.
+        """
+        distance = np.asarray(distance, dtype=float)[:, None]
+        speed_ratio = np.asarray(speed_ratio, dtype=float)[:, None]
+        ahead = self.stop_distance[None, :] - distance
+        base = self.stop_time[None, :] - self.time_at(distance)
+        decay = settings.tracking.ETA_RECENT_SPEED_DECAY_M
+        fade = np.exp(-np.maximum(ahead, 0.0) / decay)
+        seconds = base * (fade / speed_ratio + (1.0 - fade))
+        return np.where(ahead > 0.0, seconds, np.nan)
+
+
+def sample_speeds(trips, seconds, along, segment):
+    """Speeds between consecutive fixes of the same trip, per segment."""
+    same_trip = trips[1:] == trips[:-1]
+    elapsed = np.diff(seconds)
+    moved = np.diff(along)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speeds = moved / elapsed
+    valid = (
+        same_trip
+        & (elapsed > 0)
+        & (elapsed <= MAX_SAMPLE_GAP_SECONDS)
+        & (moved >= 0)
+        & (speeds <= MAX_PLAUSIBLE_SPEED_MPS)
+    )
+    return segment[1:][valid], speeds[valid]
+
+
+class TripEta:
+    """Cached state and estimates of one trip."""
+
+    def __init__(self, trip_id: UUID, route: RouteModel):
+        self.trip_id = trip_id
+        self.route = route
+        self.distance = 0.0
+        self.recorded_at: datetime | None = None
+        self.speed_ratio = 1.0
+        self.seconds = np.full(len(route.stop_ids), np.nan)
+        self.seen_at = time.monotonic()
+
+
+class EtaEngine:
+    def __init__(self, route_ttl: float | None = None):
+        if route_ttl is None:
+            route_ttl = settings.tracking.ETA_ROUTE_TTL_SECONDS
+        self.route_ttl = route_ttl
+        # route_id -> (monotonic deadline, model); routes with fewer than two
+        # placed stops are not cached
+        self.routes: dict[UUID, tuple[float, RouteModel]] = {}
+        self.trips: dict[UUID, TripEta] = {}
+        self._route_locks: dict[UUID, asyncio.Lock] = {}
+
+    def _cached_route(self, route_id: UUID) -> RouteModel | None:
+        entry = self.routes.get(route_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self.routes.pop(route_id, None)
+            return None
+        return entry[1]
+
+    async def route_model(
+        self, route_id: UUID, load_stops, load_history, load_shape=None
+    ) -> RouteModel | None:
+        """
+        The cached model of a route, built from `load_stops(route_id)`
+        (ordered stops), `load_history(route_id, since)` (past fixes) and,
+        when given, `load_shape(route_id)` (the route's geometry row), and
+        rebuilt once TRACKING_ETA_ROUTE_TTL_SECONDS have passed. None if the
+        route has fewer than two placed stops.
+        """
+        model = self._cached_route(route_id)
+        if model is not None:
+            return model
+        lock = self._route_locks.setdefault(route_id, asyncio.Lock())
+        async with lock:
+            model = self._cached_route(route_id)
+            if model is not None:
+                return model
+            stops = [
+                stop
+                for stop in await load_stops(route_id)
+                if stop["latitude"] is not None and stop["longitude"] is not None
+            ]
+            if len(stops) < 2:
+                return None
+            geometry = None
+            if load_shape is not None:
+                geometry = await route_geometries.get(route_id, load_shape)
+            model = RouteModel(route_id, stops, geometry)
+            since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+                days=settings.tracking.ETA_HISTORY_DAYS
+            )
+            model.learn_history(await load_history(route_id, since))
+            if self.route_ttl > 0:
+                deadline = time.monotonic() + self.route_ttl
+                self.routes[route_id] = (deadline, model)
+            return model
+
+    def invalidate_route(self, route_id: UUID):
+        self.routes.pop(route_id, None)
+        for trip_id, trip in list(self.trips.items()):
+            if trip.route.route_id == route_id:
+                del self.trips[trip_id]
+
+    def observe(self, trip_id: UUID, route: RouteModel, fixes: list) -> TripEta:
+        """
+        Fold a time-ordered batch of fixes (latitude, longitude, recorded_at)
+        into the trip: progress, speed correction, segment speeds, then the
+        trip's row of estimates.
+        """
+        trip = self.trips.get(trip_id)
+        if trip is None or trip.route is not route:
+            trip = self.trips[trip_id] = TripEta(trip_id, route)
+        if trip.recorded_at is not None:
+            fixes = [fix for fix in fixes if fix.recorded_at > trip.recorded_at]
+        if not fixes:
+            return trip
+
+        start = end = None
+        if trip.recorded_at is not None:
+            # only the stretch this bus can have covered since its last fix
+            window = settings.tracking.SHAPE_SEARCH_WINDOW_M
+            elapsed = (fixes[-1].recorded_at - trip.recorded_at).total_seconds()
+            start = trip.distance - window
+            end = trip.distance + window + elapsed * MAX_PLAUSIBLE_SPEED_MPS
+        along, segment = route.project(
+            [fix.latitude for fix in fixes],
+            [fix.longitude for fix in fixes],
+            start,
+            end,
+        )
+        seconds = to_seconds([fix.recorded_at for fix in fixes])
+        if trip.recorded_at is not None:
+            # continue from the last known progress; GPS jitter may not
+            # move a bus backwards
+            along = np.maximum.accumulate(np.concatenate(([trip.distance], along)))
+            seconds = np.concatenate((to_seconds([trip.recorded_at]), seconds))
+            segment = np.concatenate(([segment[0]], segment))
+        else:
+            along = np.maximum.accumulate(along)
+
+        segments, speeds = sample_speeds(
+            np.zeros(len(along)), seconds, along, segment
+        )
+        if len(speeds):
+            # this bus against what the route has learned for the same stretch
+            learned = route.segment_speed[segments]
+            ratio = float(np.mean(speeds) / np.mean(learned))
+            trip.speed_ratio = min(max(ratio, MIN_SPEED_RATIO), MAX_SPEED_RATIO)
+            route.learn(segments, speeds, settings.tracking.ETA_SPEED_SMOOTHING)
+
+        trip.distance = float(along[-1])
+        trip.recorded_at = fixes[-1].recorded_at
+        trip.seen_at = time.monotonic()
+        trip.seconds = route.estimate([trip.distance], [trip.speed_ratio])[0]
+        return trip
+
+    def remove(self, trip_id: UUID):
+        self.trips.pop(trip_id, None)
+
+    def expire(self, ttl: float | None = None):
+        # trips whose bus stopped reporting, like the live position store
+        ttl = ttl or settings.tracking.LIVE_TTL_SECONDS
+        current = time.monotonic()
+        for trip_id, trip in list(self.trips.items()):
+            if current - trip.seen_at > ttl:
+                del self.trips[trip_id]
+
+    def trip_etas(self, trip_id: UUID) -> list[dict] | None:
+        trip = self.trips.get(trip_id)
+        if trip is None:
+            return None
+        return [
+            arrival(trip, i, seconds)
+            for i, seconds in enumerate(trip.seconds)
+            if not np.isnan(seconds)
+        ]
+
+    def stop_etas(self, route: RouteModel, stop_id: UUID) -> list[dict]:
+        """Upcoming arrivals at one stop, for every tracked trip on its route."""
+        self.expire()
+        trips = [trip for trip in self.trips.values() if trip.route is route]
+        if not trips or stop_id not in route.stop_index:
+            return []
+        column = route.stop_index[stop_id]
+        # one vectorized estimate for all of the route's buses
+        seconds = route.estimate(
+            [trip.distance for trip in trips], [trip.speed_ratio for trip in trips]
+        )[:, column]
+        arrivals = [
+            arrival(trip, column, trip_seconds)
+            for trip, trip_seconds in zip(trips, seconds)
+            if not np.isnan(trip_seconds)
+        ]
+        return sorted(arrivals, key=lambda item: item["arrival_at"])
+
+
+def arrival(trip: TripEta, index: int, seconds: float) -> dict:
+    route = trip.route
+    arrival_at = trip.recorded_at + timedelta(seconds=float(seconds))
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return {
+        "trip_id": str(trip.trip_id),
+        "stop_id": str(route.stop_ids[index]),
+        "stop_name": route.stop_names[index],
+        "remaining_m": round(float(route.stop_distance[index] - trip.distance), 1),
+        "arrival_at": arrival_at.isoformat(),
+        "eta_seconds": max(0, round((arrival_at - utc_now).total_seconds())),
+    }
+
+
+eta_engine = EtaEngine()
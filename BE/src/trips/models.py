@@ -1,8 +1,9 @@
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from src.utils.config import settings
 
 
 class StatusEnum(str, Enum):
@@ -22,8 +23,8 @@ class TripCreate(BaseModel):
     latitude: float
     longitude: float
     status: StatusEnum
-    current_time: datetime = datetime.now()
-    created_at: datetime = datetime.now()
+    current_time: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now)
 
 
 class TripUpdate(BaseModel):
@@ -36,3 +37,47 @@ class TripUpdate(BaseModel):
 
 class TripDelete(BaseModel):
     deleted_at: Optional[datetime] = None
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    # timestamp columns are naive UTC; naive input is taken to be UTC already
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class GPSFix(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    recorded_at: datetime
+    speed: Optional[float] = Field(default=None, ge=0)  # m/s
+    heading: Optional[float] = Field(default=None, ge=0, lt=360)  # degrees
+    accuracy: Optional[float] = Field(default=None, ge=0)  # meters
+
+
+class GPSFixBatch(BaseModel):
+    fixes: list[GPSFix] = Field(
+        min_length=1, max_length=settings.tracking.MAX_FIXES_PER_BATCH
+    )
+
+    @model_validator(mode="after")
+    def normalize_fixes(self):
+        # Field checks above report every bad fix at once (422); this pass
+        # stores times as naive UTC, rejects future fixes, and orders the
+        # batch by time, dropping repeated timestamps.
+        latest_allowed = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+            seconds=settings.tracking.MAX_CLOCK_SKEW_SECONDS
+        )
+        for fix in self.fixes:
+            fix.recorded_at = to_naive_utc(fix.recorded_at)
+            if fix.recorded_at > latest_allowed:
+                raise ValueError(f"Fix recorded in the future: {fix.recorded_at}")
+
+        # usually already in order, which makes the sort linear
+        self.fixes.sort(key=lambda fix: fix.recorded_at)
+        unique = [self.fixes[0]]
+        for fix in self.fixes[1:]:
+            if fix.recorded_at != unique[-1].recorded_at:
+                unique.append(fix)
+        self.fixes = unique
+        return self
@@ -0,0 +1,248 @@
+from sqlalchemy import select, update, values, column, cast, and_, or_, bindparam
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from src.database.schema import (
+    buses,
+    trips,
+    trip_positions,
+    trip_tracks,
+    stop_events,
+    status_enum,
+)
+from src.database.bulk import chunked, effective_chunk_size
+from src.database.execution import AsyncDBClient, async_db_client
+from src.trips.models import GPSFix
+from uuid import UUID
+from datetime import datetime
+
+
+get_trip_by_id_stmt = select(trips).where(
+    and_(trips.c.id == bindparam("trip_id"), trips.c.deleted_at.is_(None))
+)
+# The recorded_at bounds let Postgres prune trip_positions to the daily
+# partitions the window overlaps (at plan time, or at executor startup for a
+# generic prepared plan).
+get_positions_stmt = (
+    select(trip_positions)
+    .where(
+        and_(
+            trip_positions.c.trip_id == bindparam("trip_id"),
+            trip_positions.c.recorded_at >= bindparam("start"),
+            trip_positions.c.recorded_at < bindparam("end"),
+        )
+    )
+    .order_by(trip_positions.c.recorded_at)
+)
+# Past fixes of a route's trips, for learning segment speeds (ETA)
+get_route_history_stmt = (
+    select(
+        trip_positions.c.trip_id,
+        trip_positions.c.recorded_at,
+        trip_positions.c.latitude,
+        trip_positions.c.longitude,
+    )
+    .join(trips, trips.c.id == trip_positions.c.trip_id)
+    .where(
+        and_(
+            trips.c.route_id == bindparam("route_id"),
+            trip_positions.c.recorded_at >= bindparam("since"),
+        )
+    )
+    .order_by(trip_positions.c.trip_id, trip_positions.c.recorded_at)
+    .limit(bindparam("limit"))
+)
+ROUTE_HISTORY_LIMIT = 200_000
+# Finished trips whose history has not been compacted yet, oldest first
+get_trips_to_compact_stmt = (
+    select(trips.c.id, trips.c.created_at, trips.c.current_time)
+    .outerjoin(trip_tracks, trip_tracks.c.trip_id == trips.c.id)
+    .where(
+        and_(
+            trips.c.status.in_(bindparam("statuses", expanding=True)),
+            trips.c.deleted_at.is_(None),
+            trip_tracks.c.trip_id.is_(None),
+        )
+    )
+    .order_by(trips.c.current_time)
+    .limit(bindparam("limit"))
+)
+# In-progress trips with their bus's planned schedule
+get_active_schedules_stmt = (
+    select(
+        trips.c.id,
+        trips.c.route_id,
+        trips.c.bus_id,
+        trips.c.status,
+        trips.c.latitude,
+        trips.c.longitude,
+        buses.c.start_time,
+        buses.c.end_time,
+    )
+    .join(buses, buses.c.id == trips.c.bus_id)
+    .where(
+        and_(
+            trips.c.status.in_(bindparam("statuses", expanding=True)),
+            trips.c.deleted_at.is_(None),
+            buses.c.start_time.is_not(None),
+            buses.c.end_time.is_not(None),
+        )
+    )
+)
+get_stop_events_stmt = (
+    select(stop_events)
+    .where(stop_events.c.trip_id == bindparam("trip_id"))
+    .order_by(stop_events.c.recorded_at)
+)
+get_track_stmt = select(trip_tracks).where(
+    trip_tracks.c.trip_id == bindparam("trip_id")
+)
+
+
+def status_changes_stmt(changes: list[dict], from_statuses: list[str], updated_at):
+    rows = values(
+        column("trip_id", PG_UUID(as_uuid=True)),
+        column("bus_id", PG_UUID(as_uuid=True)),
+        column("status", String),
+        name="changes",
+    ).data([(c["trip_id"], c["bus_id"], c["status"]) for c in changes])
+    updated_trips = (
+        update(trips)
+        .where(and_(trips.c.id == rows.c.trip_id, trips.c.status.in_(from_statuses)))
+        .values(status=cast(rows.c.status, status_enum), updated_at=updated_at)
+        .returning(trips.c.id, trips.c.bus_id, trips.c.status)
+        .cte("updated_trips")
+    )
+    # the buses of the trips that actually changed take the same status
+    return (
+        update(buses)
+        .where(buses.c.id == updated_trips.c.bus_id)
+        .values(status=updated_trips.c.status, updated_at=updated_at)
+        .returning(updated_trips.c.id, updated_trips.c.status)
+    )
+
+
+class TripQueries:
+    def __init__(self, db_client: AsyncDBClient | None = None):
+        # pass the request's unit of work to share its connection/transaction
+        self.db_client = db_client or async_db_client
+
+    async def get_trip_by_id(self, trip_id: UUID):
+        result = await self.db_client.execute_one(
+            get_trip_by_id_stmt, {"trip_id": trip_id}
+        )
+        return result
+
+    async def insert_positions(self, rows: list[dict]):
+        # one multi-row INSERT per batch; fixes already stored are skipped
+        result = await self.db_client.insert_many(
+            trip_positions,
+            rows,
+            on_conflict="do_nothing",
+            conflict_target=["trip_id", "recorded_at"],
+        )
+        return result
+
+    async def get_positions(self, trip_id: UUID, start: datetime, end: datetime):
+        result = await self.db_client.execute_all(
+            get_positions_stmt, {"trip_id": trip_id, "start": start, "end": end}
+        )
+        return result or []
+
+    async def get_route_history(self, route_id: UUID, since: datetime):
+        result = await self.db_client.execute_all(
+            get_route_history_stmt,
+            {"route_id": route_id, "since": since, "limit": ROUTE_HISTORY_LIMIT},
+        )
+        return result or []
+
+    async def get_trips_to_compact(self, statuses: list[str], limit: int):
+        result = await self.db_client.execute_all(
+            get_trips_to_compact_stmt, {"statuses": statuses, "limit": limit}
+        )
+        return result or []
+
+    async def get_track(self, trip_id: UUID):
+        result = await self.db_client.execute_one(get_track_stmt, {"trip_id": trip_id})
+        return result
+
+    async def insert_track(self, track: dict):
+        # a concurrent run that compacted the same trip first wins
+        result = await self.db_client.insert_many(
+            trip_tracks, [track], on_conflict="do_nothing", conflict_target=["trip_id"]
+        )
+        return result
+
+    async def insert_stop_events(self, rows: list[dict]):
+        result = await self.db_client.insert_many(
+            stop_events,
+            rows,
+            on_conflict="do_nothing",
+            conflict_target=["trip_id", "stop_id", "event"],
+        )
+        return result
+
+    async def get_stop_events(self, trip_id: UUID):
+        result = await self.db_client.execute_all(
+            get_stop_events_stmt, {"trip_id": trip_id}
+        )
+        return result or []
+
+    async def update_trip_status(
+        self, trip_id: UUID, bus_id: UUID, new_status: str, from_statuses: list[str]
+    ):
+        # the trip and its bus in one statement, and only while the trip is
+        # still in one of `from_statuses`
+        change = {"trip_id": trip_id, "bus_id": bus_id, "status": new_status}
+        result = await self.db_client.execute_one(
+            status_changes_stmt([change], from_statuses, self.db_client.now())
+        )
+        return result
+
+    async def get_active_schedules(self, statuses: list[str]):
+        result = await self.db_client.execute_all(
+            get_active_schedules_stmt, {"statuses": statuses}
+        )
+        return result or []
+
+    async def apply_status_changes(self, changes: list[dict], from_statuses: list[str]):
+        """
+        Set the status of many trips, and of their buses, in one statement:
+        `changes` holds trip_id, bus_id and status. Trips that left
+        `from_statuses` meanwhile (e.g. arrived) are not touched.
+        """
+        if not changes:
+            return []
+        updated = []
+        # one statement, unless the changes exceed the bind parameter limit
+        # (3 per change, plus headroom for the statuses and timestamp)
+        chunk_size = effective_chunk_size(len(changes), 4)
+        async with self.db_client.transaction() as tx:
+            for chunk in chunked(changes, chunk_size):
+                result = await tx.execute_all(
+                    status_changes_stmt(chunk, from_statuses, tx.now())
+                )
+                updated.extend(result or [])
+        return updated
+
+    async def update_latest_position(self, trip_id: UUID, fix: GPSFix):
+        # a late, out-of-order batch must not move the trip backwards
+        stmt = (
+            update(trips)
+            .where(
+                and_(
+                    trips.c.id == trip_id,
+                    or_(
+                        trips.c.current_time.is_(None),
+                        trips.c.current_time <= fix.recorded_at,
+                    ),
+                )
+            )
+            .values(
+                latitude=fix.latitude,
+                longitude=fix.longitude,
+                current_time=fix.recorded_at,
+            )
+            .returning(trips)
+        )
+        result = await self.db_client.execute_one(stmt)
+        return result
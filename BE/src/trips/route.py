@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query
+from src.trips.query import TripQueries
+from src.trips.models import GPSFixBatch
+from src.trips.service import TripService
+from uuid import UUID
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi.responses import JSONResponse
+from src.database.execution import AsyncDBClient
+from src.database.unit_of_work import get_unit_of_work
+
+
+router = APIRouter(prefix="/trips", tags=["Trips"])
+
+
+def get_trip_service(
+    uow: AsyncDBClient = Depends(get_unit_of_work, scope="function"),
+):
+    return TripService(TripQueries(uow))
+
+
+def get_trip_reader():
+    # read-only endpoints: no unit of work, so their reads may use a replica
+    return TripService(TripQueries())
+
+
+@router.post("/{trip_id}/positions", response_model=dict)
+async def ingest_positions(
+    trip_id: UUID,
+    payload: GPSFixBatch,
+    service: TripService = Depends(get_trip_service),
+):
+    # Driver apps send the fixes collected since their last call in one batch
+    status_code, result = await service.ingest_positions(trip_id, payload)
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{trip_id}/positions", response_model=dict)
+async def get_positions(
+    trip_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[Literal["compact", "full"]] = Query(default=None),
+    service: TripService = Depends(get_trip_reader),
+):
+    # Finished trips default to their compact track; resolution=full reads
+    # the raw fixes while their partitions are retained
+    status_code, result = await service.get_positions(
+        trip_id, start, end, resolution
+    )
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{trip_id}/stop-events", response_model=dict)
+async def get_stop_events(
+    trip_id: UUID,
+    service: TripService = Depends(get_trip_reader),
+):
+    # arrivals at and departures from stops, in time order
+    status_code, result = await service.get_stop_events(trip_id)
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@router.get("/{trip_id}/eta", response_model=dict)
+async def get_trip_eta(
+    trip_id: UUID,
+    service: TripService = Depends(get_trip_reader),
+):
+    status_code, result = await service.get_trip_eta(trip_id)
+    return JSONResponse(content=result, status_code=status_code)
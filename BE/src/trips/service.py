@@ -0,0 +1,329 @@
+from src.bus_locations.hub import position_hub
+from src.bus_locations.live import live_positions
+from src.bus_routes.geometry import route_geometries
+from src.bus_routes.query import RouteQueries
+from src.stops.geofence import TripFence, geofences
+from src.stops.query import StopQueries
+from src.trips.eta import eta_engine
+from src.trips.models import GPSFix, GPSFixBatch, to_naive_utc
+from src.trips.query import TripQueries
+from src.utils.config import settings
+from fastapi.encoders import jsonable_encoder
+from fastapi import status, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Trips that accept position updates
+TRACKABLE_STATUSES = {"in_progress", "delayed"}
+
+
+class TripService:
+    def __init__(self, queries: TripQueries, stop_queries: StopQueries | None = None):
+        self.queries = queries
+        self.stop_queries = stop_queries or StopQueries(queries.db_client)
+        self.route_queries = RouteQueries(queries.db_client)
+
+    async def route_model(self, route_id: UUID):
+        return await eta_engine.route_model(
+            route_id,
+            self.stop_queries.get_route_stops,
+            self.queries.get_route_history,
+            self.route_queries.get_route_shape,
+        )
+
+    async def match_positions(self, route_id: UUID, rows: list[dict]):
+        """
+        Map matching: snap the batch's fixes onto the route shape in one
+        vectorized pass, filling the snapped_* columns next to the raw fix.
+        """
+        geometry = await route_geometries.get(
+            route_id, self.route_queries.get_route_shape
+        )
+        if geometry is None:
+            return
+        latitudes, longitudes, along, offset, matched = geometry.match(
+            [row["latitude"] for row in rows], [row["longitude"] for row in rows]
+        )
+        for index in np.flatnonzero(matched):
+            rows[index].update(
+                snapped_latitude=float(latitudes[index]),
+                snapped_longitude=float(longitudes[index]),
+                route_distance=round(float(along[index]), 1),
+                snap_offset=round(float(offset[index]), 1),
+            )
+
+    async def update_eta(self, trip_id: UUID, route_id: UUID, fixes: list):
+        # ETAs are a by-product of ingestion and must never fail it; the
+        # route model is loaded now, the trip only advances once committed
+        try:
+            route = await self.route_model(route_id)
+            if route is not None:
+                self.queries.db_client.after_commit(
+                    lambda: eta_engine.observe(trip_id, route, fixes)
+                )
+        except Exception:
+            logger.exception("Error updating ETA for trip %s", trip_id)
+
+    def publish_position(self, trip: dict, fix: GPSFix):
+        # write-through, so live reads never need the database
+        position = live_positions.update(
+            trip["id"],
+            trip["bus_id"],
+            trip["route_id"],
+            fix.latitude,
+            fix.longitude,
+            fix.recorded_at,
+            speed=fix.speed,
+            heading=fix.heading,
+        )
+        if position is not None:
+            position_hub.publish(trip["route_id"], position)
+
+    def end_tracking(self, trip_id: UUID):
+        live_positions.remove(trip_id)
+        eta_engine.remove(trip_id)
+
+    async def detect_stop_events(self, trip: dict, rows: list[dict]):
+        """
+        Run the batch through the route's stop geofences and store the
+        arrival/departure events. Returns (events, completed), completed when
+        the bus reached the final stop and the trip was moved to `arrived`.
+        """
+        grid = await geofences.grid(trip["route_id"], self.stop_queries.get_route_stops)
+        if grid is None:
+            return [], False
+        fixes = [
+            {
+                "latitude": row["latitude"],
+                "longitude": row["longitude"],
+                "recorded_at": row["recorded_at"],
+            }
+            if row["snapped_latitude"] is None
+            else {
+                "latitude": row["snapped_latitude"],
+                "longitude": row["snapped_longitude"],
+                "recorded_at": row["recorded_at"],
+            }
+            for row in rows
+        ]
+        # the fence state comes from the stored events, not this worker
+        stored = await self.queries.get_stop_events(trip["id"])
+        fence = TripFence.from_events(grid, stored)
+        events, completed = geofences.check(grid, fence, fixes)
+        if events:
+            await self.queries.insert_stop_events(
+                [
+                    {
+                        "trip_id": trip["id"],
+                        "stop_id": event["stop_id"],
+                        "bus_id": trip["bus_id"],
+                        "event": event["event"],
+                        "recorded_at": event["recorded_at"],
+                    }
+                    for event in events
+                ]
+            )
+        if completed:
+            await self.queries.update_trip_status(
+                trip["id"], trip["bus_id"], "arrived", list(TRACKABLE_STATUSES)
+            )
+            self.queries.db_client.after_commit(
+                lambda: self.end_tracking(trip["id"])
+            )
+        return events, completed
+
+    async def ingest_positions(self, trip_id: UUID, batch: GPSFixBatch):
+        trip = await self.queries.get_trip_by_id(trip_id)
+        if not trip:
+            message = {"detail": "Trip not found"}
+            return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+        if trip["status"] not in TRACKABLE_STATUSES:
+            message = {"detail": f"Trip is {trip['status']}, not in progress"}
+            return status.HTTP_409_CONFLICT, jsonable_encoder(message)
+
+        rows = [
+            {
+                "trip_id": trip_id,
+                "bus_id": trip["bus_id"],
+                "latitude": fix.latitude,
+                "longitude": fix.longitude,
+                "recorded_at": fix.recorded_at,
+                "speed": fix.speed,
+                "heading": fix.heading,
+                "accuracy": fix.accuracy,
+                "snapped_latitude": None,
+                "snapped_longitude": None,
+                "route_distance": None,
+                "snap_offset": None,
+            }
+            for fix in batch.fixes
+        ]
+        try:
+            await self.match_positions(trip["route_id"], rows)
+            stored = await self.queries.insert_positions(rows)
+            latest = batch.fixes[-1]
+            if rows[-1]["snapped_latitude"] is not None:
+                # the map shows the bus on the road; the raw fix stays stored
+                latest = latest.model_copy(
+                    update={
+                        "latitude": rows[-1]["snapped_latitude"],
+                        "longitude": rows[-1]["snapped_longitude"],
+                    }
+                )
+            await self.queries.update_latest_position(trip_id, latest)
+            events, completed = await self.detect_stop_events(trip, rows)
+            if not completed:
+                # live readers and subscribers only see committed fixes
+                self.queries.db_client.after_commit(
+                    lambda: self.publish_position(trip, latest)
+                )
+                await self.update_eta(trip_id, trip["route_id"], batch.fixes)
+            result = {
+                "trip_id": trip_id,
+                "status": "arrived" if completed else trip["status"],
+                "received": len(rows),
+                "stored": stored,
+                "duplicates": len(rows) - stored,
+                "latest_recorded_at": latest.recorded_at,
+                "stop_events": events,
+            }
+            return status.HTTP_201_CREATED, jsonable_encoder(result)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error ingesting positions for trip %s", trip_id)
+            await self.queries.db_client.rollback()
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+    async def get_positions(
+        self,
+        trip_id: UUID,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: Optional[str] = None,
+    ):
+        start = to_naive_utc(start) if start else None
+        end = to_naive_utc(end) if end else None
+        if start and end and start >= end:
+            message = {"detail": "start must be before end"}
+            return status.HTTP_400_BAD_REQUEST, jsonable_encoder(message)
+        try:
+            # finished trips are served from their compact track by default
+            if resolution != "full":
+                track = await self.queries.get_track(trip_id)
+                if track is not None:
+                    return status.HTTP_200_OK, compact_result(track, start, end)
+                if resolution == "compact":
+                    message = {"detail": "Trip has no compact track yet"}
+                    return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+
+            # A bounded window keeps the scan to a few daily partitions
+            max_window = timedelta(hours=settings.tracking.MAX_HISTORY_WINDOW_HOURS)
+            end = end or to_naive_utc(datetime.now(timezone.utc))
+            start = start or end - max_window
+            if start >= end:
+                message = {"detail": "start must be before end"}
+                return status.HTTP_400_BAD_REQUEST, jsonable_encoder(message)
+            if end - start > max_window:
+                message = {"detail": f"Window is limited to {max_window}"}
+                return status.HTTP_400_BAD_REQUEST, jsonable_encoder(message)
+            positions = await self.queries.get_positions(trip_id, start, end)
+            if not positions and resolution == "full":
+                if await self.queries.get_track(trip_id) is not None:
+                    message = {
+                        "detail": "Full-resolution history is no longer retained; "
+                        "use resolution=compact"
+                    }
+                    return status.HTTP_410_GONE, jsonable_encoder(message)
+            result = {
+                "trip_id": trip_id,
+                "resolution": "full",
+                "start": start,
+                "end": end,
+                "positions": positions,
+            }
+            return status.HTTP_200_OK, jsonable_encoder(result)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error fetching positions for trip %s", trip_id)
+            await self.queries.db_client.rollback()
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+    async def get_stop_events(self, trip_id: UUID):
+        trip = await self.queries.get_trip_by_id(trip_id)
+        if not trip:
+            message = {"detail": "Trip not found"}
+            return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+        try:
+            events = await self.queries.get_stop_events(trip_id)
+            result = {"trip_id": trip_id, "status": trip["status"], "events": events}
+            return status.HTTP_200_OK, jsonable_encoder(result)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error fetching stop events for trip %s", trip_id)
+            await self.queries.db_client.rollback()
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+    async def get_trip_eta(self, trip_id: UUID):
+        try:
+            etas = eta_engine.trip_etas(trip_id)
+            if etas is None:
+                trip = await self.queries.get_trip_by_id(trip_id)
+                if not trip:
+                    message = {"detail": "Trip not found"}
+                    return status.HTTP_404_NOT_FOUND, jsonable_encoder(message)
+                if trip["status"] not in TRACKABLE_STATUSES:
+                    message = {"detail": f"Trip is {trip['status']}, not in progress"}
+                    return status.HTTP_409_CONFLICT, jsonable_encoder(message)
+                if trip["latitude"] is None or trip["longitude"] is None:
+                    message = {"detail": "Trip has not reported a position yet"}
+                    return status.HTTP_409_CONFLICT, jsonable_encoder(message)
+                route = await self.route_model(trip["route_id"])
+                if route is None:
+                    message = {"detail": "Route has too few placed stops for ETAs"}
+                    return status.HTTP_409_CONFLICT, jsonable_encoder(message)
+                # not seen by this process yet: start from the latest position
+                fix = GPSFix(
+                    latitude=trip["latitude"],
+                    longitude=trip["longitude"],
+                    recorded_at=trip["current_time"],
+                )
+                eta_engine.observe(trip_id, route, [fix])
+                etas = eta_engine.trip_etas(trip_id)
+            result = {"trip_id": trip_id, "stops": etas}
+            return status.HTTP_200_OK, jsonable_encoder(result)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error estimating arrivals for trip %s", trip_id)
+            await self.queries.db_client.rollback()
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+
+def compact_result(
+    track: dict, start: Optional[datetime], end: Optional[datetime]
+) -> dict:
+    points = zip(track["recorded_at"], track["latitudes"], track["longitudes"])
+    positions = [
+        {"recorded_at": recorded_at, "latitude": latitude, "longitude": longitude}
+        for recorded_at, latitude, longitude in points
+        if (start is None or recorded_at >= start)
+        and (end is None or recorded_at < end)
+    ]
+    result = {
+        "trip_id": track["trip_id"],
+        "resolution": "compact",
+        "tolerance_m": track["tolerance_m"],
+        "max_error_m": track["max_error_m"],
+        "raw_points": track["raw_points"],
+        "kept_points": track["kept_points"],
+        "positions": positions,
+    }
+    return jsonable_encoder(result)
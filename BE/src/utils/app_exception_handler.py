@@ -1,33 +1,48 @@
+import logging
 from uuid import UUID
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     def __init__(self, queries):
         self.queries = queries
 
-    def register(self, user_data):
+    async def register(self, user_data):
         row = self.queries.get_by_email(user_data.email)
         if row:
             return 409, "Email already registered"
 
-        user_data.password = self.queries.hash_helper.hash_password(user_data.password)
+        user_data.password = await self.queries.hash_helper.hash_password(
+            user_data.password
+        )
 
         user = self.queries.create(user_data)
         if not user:
             return 400, "Creation failed"
         return 200, user
 
-    def authenticate(self, email: str, password: str):
+    async def authenticate(self, email: str, password: str):
         user = self.queries.get_by_email(email)
 
         if not user or user.get("is_deleted"):
             return None
 
-        is_valid = self.queries.hash_helper.verify_password(password, user["password"])
+        is_valid, new_hash = await self.queries.hash_helper.verify_and_update(
+            password, user["password"]
+        )
 
         if not is_valid:
             return None
 
+        if new_hash:
+            # outdated parameters or legacy bcrypt: upgrade while we have the
+            # password; a failed upgrade must not fail the login
+            try:
+                self.queries.update(user["id"], {"password": new_hash})
+            except Exception as e:
+                logger.warning("Password rehash failed for user %s: %s", user["id"], e)
+
         return user
 
     def update_profile(self, user_id: UUID, update_data):
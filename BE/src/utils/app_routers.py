@@ -1,7 +1,16 @@
 from fastapi import FastAPI
+from src.bus_locations.route import router as bus_locations_router
+from src.bus_routes.route import router as bus_routes_router
+from src.stops.route import router as stops_router
+from src.trips.route import router as trips_router
 
 
 def setup_routers(app: FastAPI):
-    router = []
+    router = [
+        trips_router,
+        bus_locations_router,
+        stops_router,
+        bus_routes_router,
+    ]
     for route in router:
         app.include_router(route)
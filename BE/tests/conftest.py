@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+# Database tests run against a scratch Postgres database whose schema this
+# suite may create and write to, e.g.
+#   TEST_DATABASE_URL=postgresql://postgres@localhost/bus_tracking_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from src.database.bootstrap import create_schema
+    from src.database.connection import build_engine
+
+    engine = build_engine(TEST_DATABASE_URL)
+    create_schema(engine)
+    engine.dispose()
+    return TEST_DATABASE_URL
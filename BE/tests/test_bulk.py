@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, Text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.database.bulk import (
+    MAX_BIND_PARAMS,
+    build_insert,
+    chunked,
+    effective_chunk_size,
+)
+from src.database.connection import build_engine
+from src.database.execution import AsyncDBClient
+
+probe = Table(
+    "bulk_probe",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("name", Text),
+    Column("note", Text),
+)
+
+
+def bind_count(stmt) -> int:
+    return len(stmt.compile(dialect=postgresql.dialect()).params)
+
+
+def test_chunked_splits_without_losing_rows():
+    rows = [{"id": i} for i in range(7)]
+    assert [len(chunk) for chunk in chunked(rows, 3)] == [3, 3, 1]
+    assert [len(chunk) for chunk in chunked(iter(rows), 7)] == [7]
+    assert list(chunked([], 3)) == []
+
+
+@pytest.mark.parametrize(
+    "chunk_size, columns, expected",
+    [
+        (1000, 3, 1000),
+        (50_000, 3, MAX_BIND_PARAMS // 3),
+        (50_000, 40_000, 1),
+        (1000, 0, 1000),
+        (0, 3, 1),
+    ],
+)
+def test_effective_chunk_size(chunk_size, columns, expected):
+    assert effective_chunk_size(chunk_size, columns) == expected
+
+
+def test_a_full_chunk_stays_under_the_bind_parameter_limit():
+    size = effective_chunk_size(50_000, 3)
+    rows = [{"id": i, "name": "n", "note": "x"} for i in range(size)]
+    assert bind_count(build_insert(probe, rows)) == size * 3 <= MAX_BIND_PARAMS
+    assert bind_count(build_insert(probe, rows + rows[:1])) > MAX_BIND_PARAMS
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_build_insert_conflict_clauses():
+    rows = [{"id": 1, "name": "a", "note": "x"}]
+    assert "ON CONFLICT" not in compiled(build_insert(probe, rows))
+    assert "ON CONFLICT (id) DO NOTHING" in compiled(
+        build_insert(probe, rows, on_conflict="do_nothing", conflict_target=["id"])
+    )
+    upsert = compiled(
+        build_insert(
+            probe,
+            rows,
+            returning=probe.c.id,
+            on_conflict="do_update",
+            conflict_target=["id"],
+        )
+    )
+    assert "DO UPDATE SET name = excluded.name, note = excluded.note" in upsert
+    assert upsert.endswith("RETURNING bulk_probe.id")
+    only_name = compiled(
+        build_insert(
+            probe,
+            rows,
+            on_conflict="do_update",
+            conflict_target=["id"],
+            update_columns=["name"],
+        )
+    )
+    assert "DO UPDATE SET name = excluded.name" in only_name
+    assert "note = excluded.note" not in only_name
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"on_conflict": "do_update"}, {"on_conflict": "replace"}],
+)
+def test_build_insert_rejects_bad_conflict_options(options):
+    with pytest.raises(ValueError):
+        build_insert(probe, [{"id": 1}], **options)
+
+
+async def insert_twice(url: str):
+    client = AsyncDBClient(primary_url=url)
+    stmt = (
+        pg_insert(probe)
+        .on_conflict_do_nothing(index_elements=["id"])
+        .returning(probe.c.id)
+    )
+    params = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    try:
+        first = await client.execute_many(stmt, params)
+        second = await client.execute_many(stmt, params)
+        plain = await client.execute_many(
+            probe.update().where(probe.c.id == 99).values(name="z"), [{}]
+        )
+        return first, second, plain
+    finally:
+        await client.engine.dispose()
+
+
+def test_execute_many_returns_no_rows_when_returning_matches_nothing(database_url):
+    engine = build_engine(database_url)
+    probe.drop(engine, checkfirst=True)
+    probe.create(engine)
+    try:
+        first, second, plain = asyncio.run(insert_twice(database_url))
+    finally:
+        probe.drop(engine)
+        engine.dispose()
+    assert sorted(row["id"] for row in first) == [1, 2]
+    assert second == []
+    assert plain == 0
@@ -0,0 +1,96 @@
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Column, DateTime, Enum, Float, MetaData, Table, Text, Uuid
+
+from src.database.ingestion import CopyRowEncoder
+
+HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8
+TRAILER = b"\xff\xff"
+
+fixes = Table(
+    "copy_probe",
+    MetaData(),
+    Column("id", Uuid, default=uuid.uuid4),
+    Column("speed", Float),
+    Column("source", Enum("gps", "manual", name="copy_probe_source")),
+    Column("recorded_at", DateTime),
+    Column("note", Text),
+)
+COLUMNS = ["id", "speed", "source", "recorded_at", "note"]
+
+ROW = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "speed": 12.5,
+    "source": "gps",
+    # 02:00 at UTC+2 is midnight UTC, one day after the Postgres epoch
+    "recorded_at": datetime(2000, 1, 2, 2, tzinfo=timezone(timedelta(hours=2))),
+    "note": "a\tb\nc\\",
+}
+
+
+def binary_fields(data: bytes) -> list[bytes | None]:
+    (count,) = struct.unpack_from("!h", data)
+    fields, offset = [], 2
+    for _ in range(count):
+        (length,) = struct.unpack_from("!i", data, offset)
+        offset += 4
+        if length == -1:
+            fields.append(None)
+            continue
+        fields.append(data[offset : offset + length])
+        offset += length
+    assert offset == len(data)
+    return fields
+
+
+def test_binary_stream_is_framed_by_header_and_trailer():
+    encoder = CopyRowEncoder(fixes, COLUMNS, format="binary")
+    payload = encoder.encode([ROW, ROW]).getvalue()
+    assert payload.startswith(HEADER)
+    assert payload.endswith(TRAILER)
+    row = encoder.encode_row(ROW)
+    assert payload == HEADER + row + row + TRAILER
+
+
+def test_binary_fields_use_the_postgres_wire_formats():
+    encoder = CopyRowEncoder(fixes, COLUMNS, format="binary")
+    id_, speed, source, recorded_at, note = binary_fields(encoder.encode_row(ROW))
+    assert id_ == ROW["id"].bytes
+    assert struct.unpack("!d", speed) == (12.5,)
+    assert source == b"gps"
+    # microseconds since 2000-01-01, in UTC
+    assert struct.unpack("!q", recorded_at) == (86_400_000_000,)
+    assert note == "a\tb\nc\\".encode()
+
+
+def test_binary_nulls_and_defaults():
+    encoder = CopyRowEncoder(fixes, COLUMNS, format="binary")
+    fields = binary_fields(encoder.encode_row({"speed": None}))
+    # a missing id takes the column default; everything else is NULL
+    assert len(fields[0]) == 16
+    assert fields[1:] == [None, None, None, None]
+    # an explicit None is NULL, not the default
+    assert binary_fields(encoder.encode_row({"id": None}))[0] is None
+
+
+def test_text_rows_are_escaped_and_tab_separated():
+    encoder = CopyRowEncoder(fixes, COLUMNS, format="text")
+    payload = encoder.encode([ROW]).getvalue()
+    assert payload == (
+        b"12345678-1234-5678-1234-567812345678\t12.5\tgps\t"
+        b"2000-01-02T00:00:00\ta\\tb\\nc\\\\\n"
+    )
+
+
+def test_text_nulls():
+    encoder = CopyRowEncoder(fixes, COLUMNS, format="text")
+    line = encoder.encode_row({"id": None, "source": "manual"})
+    assert line == b"\\N\t\\N\tmanual\t\\N\t\\N\n"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        CopyRowEncoder(fixes, COLUMNS, format="csv")
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.trips.eta import EtaEngine
+
+
+def stop(north_m: float, name: str) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "name": name,
+        "latitude": 31.95 + north_m / 111_320,
+        "longitude": 35.91,
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.trips.eta.time.monotonic", lambda: now[0])
+    return now
+
+
+async def no_history(route_id, since):
+    return []
+
+
+def test_route_models_are_rebuilt_after_the_ttl(clock):
+    engine = EtaEngine(route_ttl=600)
+    route_id = uuid.uuid4()
+    stops = [stop(0, "A"), stop(500, "B")]
+    loads = []
+
+    async def load_stops(route_id):
+        loads.append(route_id)
+        return list(stops)
+
+    async def run():
+        first = await engine.route_model(route_id, load_stops, no_history)
+        assert await engine.route_model(route_id, load_stops, no_history) is first
+        # a stop added meanwhile shows up once the model expires
+        stops.append(stop(1000, "C"))
+        clock[0] += 601
+        return first, await engine.route_model(route_id, load_stops, no_history)
+
+    first, second = asyncio.run(run())
+    assert len(loads) == 2
+    assert len(first.stop_ids) == 2
+    assert len(second.stop_ids) == 3
+
+
+def test_routes_without_enough_stops_are_not_cached(clock):
+    engine = EtaEngine(route_ttl=600)
+    route_id = uuid.uuid4()
+    responses = [[stop(0, "A")], [stop(0, "A"), stop(500, "B")]]
+
+    async def load_stops(route_id):
+        return responses.pop(0)
+
+    async def run():
+        missing = await engine.route_model(route_id, load_stops, no_history)
+        found = await engine.route_model(route_id, load_stops, no_history)
+        return missing, found
+
+    missing, found = asyncio.run(run())
+    assert missing is None
+    assert found is not None
+
+
+def test_invalidate_route_drops_the_model_and_its_trips(clock):
+    engine = EtaEngine(route_ttl=600)
+    route_id = uuid.uuid4()
+    stops = [stop(0, "A"), stop(500, "B")]
+
+    async def load_stops(route_id):
+        return stops
+
+    async def run():
+        route = await engine.route_model(route_id, load_stops, no_history)
+        engine.observe(uuid.uuid4(), route, [])
+        engine.invalidate_route(route_id)
+        return await engine.route_model(route_id, load_stops, no_history), route
+
+    rebuilt, route = asyncio.run(run())
+    assert rebuilt is not route
+    assert engine.trips == {}
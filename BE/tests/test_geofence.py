@@ -0,0 +1,172 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.database.execution import AsyncDBClient
+from src.database.schema import buses, routes, trips
+from src.helpers.geo import METERS_PER_DEGREE
+from src.stops.geofence import GeofenceTracker, RouteStopGrid, TripFence
+from src.trips.query import TripQueries
+
+ORIGIN = (31.95, 35.91)
+STARTED_AT = datetime(2026, 1, 1, 7)
+
+
+def stop_at(north_m: float, name: str) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "name": name,
+        "latitude": ORIGIN[0] + north_m / METERS_PER_DEGREE,
+        "longitude": ORIGIN[1],
+    }
+
+
+def fixes_at(*north_m: float) -> list[dict]:
+    return [
+        {
+            "latitude": ORIGIN[0] + distance / METERS_PER_DEGREE,
+            "longitude": ORIGIN[1],
+            "recorded_at": STARTED_AT + timedelta(seconds=index),
+        }
+        for index, distance in enumerate(north_m)
+    ]
+
+
+@pytest.fixture
+def grid():
+    # three stops 500 m apart; enter within 30 m, leave beyond 50 m
+    stops = [stop_at(0, "A"), stop_at(500, "B"), stop_at(1000, "C")]
+    grid = RouteStopGrid(uuid.uuid4(), stops)
+    assert (grid.enter_radius, grid.exit_radius) == (30, 50)
+    return grid
+
+
+def kinds(events: list[dict]) -> list[tuple[str, str]]:
+    return [(event["stop_name"], event["event"]) for event in events]
+
+
+def test_jitter_between_the_radii_produces_one_arrival(grid):
+    fence = TripFence()
+    # approach B, then wander 25-45 m from it: inside the exit radius
+    fixes = fixes_at(400, 475, 490, 455, 520, 545, 460, 538)
+    events, completed = GeofenceTracker().check(grid, fence, fixes)
+    assert kinds(events) == [("B", "arrival")]
+    assert fence.inside == 1
+    assert not completed
+
+
+def test_departure_only_beyond_the_exit_radius(grid):
+    fence = TripFence()
+    tracker = GeofenceTracker()
+    events, _ = tracker.check(grid, fence, fixes_at(500, 540))
+    assert kinds(events) == [("B", "arrival")]
+    events, _ = tracker.check(grid, fence, fixes_at(560))
+    assert kinds(events) == [("B", "departure")]
+    assert fence.inside is None
+    # coming back to 40 m is not a new arrival; only within 30 m is
+    events, _ = tracker.check(grid, fence, fixes_at(540, 520))
+    assert kinds(events) == [("B", "arrival")]
+
+
+def test_final_stop_completes_the_trip(grid):
+    fence = TripFence()
+    events, completed = GeofenceTracker().check(
+        grid, fence, fixes_at(0, 100, 500, 700, 1000, 1010)
+    )
+    assert kinds(events) == [
+        ("A", "arrival"),
+        ("A", "departure"),
+        ("B", "arrival"),
+        ("B", "departure"),
+        ("C", "arrival"),
+    ]
+    assert completed
+
+
+def test_loop_route_completes_only_after_a_tour():
+    first = stop_at(0, "Depot")
+    stops = [first, stop_at(500, "Far"), {**stop_at(10, "Depot"), "id": uuid.uuid4()}]
+    grid = RouteStopGrid(uuid.uuid4(), stops)
+    assert grid.loop
+    fence = TripFence()
+    tracker = GeofenceTracker()
+    _, completed = tracker.check(grid, fence, fixes_at(0, 100))
+    assert not completed
+    _, completed = tracker.check(grid, fence, fixes_at(500, 300, 5))
+    assert completed
+
+
+def test_fence_state_is_rebuilt_from_stored_events(grid):
+    tracker = GeofenceTracker()
+    fence = TripFence()
+    first, _ = tracker.check(grid, fence, fixes_at(0, 100, 500))
+    # another worker picks up the next batch from the stored events
+    rebuilt = TripFence.from_events(grid, first)
+    assert (rebuilt.inside, rebuilt.visited) == (fence.inside, fence.visited)
+    events, _ = tracker.check(grid, rebuilt, fixes_at(520, 600))
+    assert kinds(events) == [("B", "departure")]
+
+
+def test_grids_expire_and_routes_without_stops_are_not_cached(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.stops.geofence.time.monotonic", lambda: clock[0])
+    tracker = GeofenceTracker(ttl=30)
+    route_id = uuid.uuid4()
+    responses = [[], [stop_at(0, "A"), stop_at(500, "B")]]
+    loads = []
+
+    async def load_stops(route_id):
+        loads.append(route_id)
+        return responses[min(len(loads) - 1, 1)]
+
+    async def run():
+        assert await tracker.grid(route_id, load_stops) is None
+        grid = await tracker.grid(route_id, load_stops)
+        assert await tracker.grid(route_id, load_stops) is grid
+        clock[0] += 31
+        assert await tracker.grid(route_id, load_stops) is not grid
+
+    asyncio.run(run())
+    assert len(loads) == 3
+
+
+async def arrive(url: str):
+    client = AsyncDBClient(primary_url=url)
+    try:
+        route = await client.execute_one(
+            insert(routes).values(name="Geofence test").returning(routes.c.id)
+        )
+        bus = await client.execute_one(
+            insert(buses)
+            .values(
+                bus_number=uuid.uuid4().int % 2**31,
+                start_time=STARTED_AT,
+                end_time=STARTED_AT + timedelta(hours=1),
+                status="in_progress",
+            )
+            .returning(buses.c.id)
+        )
+        trip = await client.execute_one(
+            insert(trips)
+            .values(route_id=route["id"], bus_id=bus["id"], status="in_progress")
+            .returning(trips.c.id)
+        )
+        await TripQueries(client).update_trip_status(
+            trip["id"], bus["id"], "arrived", ["in_progress", "delayed"]
+        )
+        return await client.execute_one(
+            select(trips.c.status, buses.c.status.label("bus_status"))
+            .join(buses, buses.c.id == trips.c.bus_id)
+            .where(trips.c.id == trip["id"]),
+            use_primary=True,
+        )
+    finally:
+        await client.engine.dispose()
+
+
+def test_arrival_moves_the_trip_and_its_bus(database_url):
+    stored = asyncio.run(arrive(database_url))
+    assert (stored["status"], stored["bus_status"]) == ("arrived", "arrived")
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from src.trips.models import GPSFixBatch, to_naive_utc
+from src.utils.config import settings
+
+AMMAN = timezone(timedelta(hours=3))
+
+
+def fix(recorded_at: datetime, latitude: float = 31.95, **fields) -> dict:
+    return {
+        "latitude": latitude,
+        "longitude": 35.91,
+        "recorded_at": recorded_at,
+        **fields,
+    }
+
+
+def test_to_naive_utc():
+    assert to_naive_utc(datetime(2024, 3, 5, 10, tzinfo=AMMAN)) == datetime(
+        2024, 3, 5, 7
+    )
+    assert to_naive_utc(datetime(2024, 3, 5, 10)) == datetime(2024, 3, 5, 10)
+
+
+def test_fixes_are_stored_as_naive_utc_in_time_order():
+    batch = GPSFixBatch(
+        fixes=[
+            fix(datetime(2024, 3, 5, 10, 0, 20, tzinfo=AMMAN), 3),
+            fix(datetime(2024, 3, 5, 7, 0, 0), 1),
+            fix(datetime(2024, 3, 5, 7, 0, 10, tzinfo=timezone.utc), 2),
+        ]
+    )
+    assert [f.recorded_at for f in batch.fixes] == [
+        datetime(2024, 3, 5, 7, 0, 0),
+        datetime(2024, 3, 5, 7, 0, 10),
+        datetime(2024, 3, 5, 7, 0, 20),
+    ]
+    assert [f.latitude for f in batch.fixes] == [1, 2, 3]
+
+
+def test_repeated_timestamps_keep_the_first_fix():
+    # the same instant in two time zones is one timestamp
+    batch = GPSFixBatch(
+        fixes=[
+            fix(datetime(2024, 3, 5, 7), 1),
+            fix(datetime(2024, 3, 5, 10, tzinfo=AMMAN), 2),
+            fix(datetime(2024, 3, 5, 7, 0, 5), 3),
+        ]
+    )
+    assert [f.latitude for f in batch.fixes] == [1, 3]
+
+
+def test_future_fixes_are_rejected_beyond_the_clock_skew():
+    now = datetime.now(timezone.utc)
+    skew = settings.tracking.MAX_CLOCK_SKEW_SECONDS
+    GPSFixBatch(fixes=[fix(now + timedelta(seconds=skew - 5))])
+    with pytest.raises(ValidationError, match="future"):
+        GPSFixBatch(fixes=[fix(now + timedelta(seconds=skew + 60))])
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [{"latitude": 91}, {"speed": -1}, {"heading": 360}, {"accuracy": -0.5}],
+)
+def test_out_of_range_fields_are_rejected(fields):
+    with pytest.raises(ValidationError):
+        GPSFixBatch(fixes=[fix(datetime(2024, 3, 5, 7), **fields)])
+
+
+def test_empty_batches_are_rejected():
+    with pytest.raises(ValidationError):
+        GPSFixBatch(fixes=[])
@@ -0,0 +1,86 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.bus_locations.live import LivePositionStore
+
+T0 = datetime(2024, 3, 5, 7, 30)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.bus_locations.live.time.monotonic", lambda: now[0])
+    return now
+
+
+def report(store, trip_id, bus_id, route_id, recorded_at=T0):
+    return store.update(trip_id, bus_id, route_id, 31.95, 35.91, recorded_at)
+
+
+def test_positions_expire_after_the_ttl(clock):
+    store = LivePositionStore(ttl=30)
+    route_id, bus_id, trip_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    report(store, trip_id, bus_id, route_id)
+    clock[0] += 30
+    assert store.get_trip(trip_id)["bus_id"] == str(bus_id)
+    clock[0] += 0.1
+    assert store.get_trip(trip_id) is None
+    assert store.get_bus(bus_id) is None
+    assert store.for_route(route_id) == []
+    assert len(store) == 0
+
+
+def test_stale_trips_are_swept_from_every_index(clock):
+    store = LivePositionStore(ttl=30)
+    route_id = uuid.uuid4()
+    silent_bus, silent_trip = uuid.uuid4(), uuid.uuid4()
+    live_bus, live_trip = uuid.uuid4(), uuid.uuid4()
+    report(store, silent_trip, silent_bus, route_id)
+    clock[0] += 20
+    report(store, live_trip, live_bus, route_id)
+    # a report past the ttl since the last sweep evicts the silent bus
+    clock[0] += 15
+    report(store, live_trip, live_bus, route_id, T0 + timedelta(seconds=35))
+    assert len(store) == 1
+    assert store._by_bus == {live_bus: live_trip}
+    assert store._by_route == {route_id: {live_trip}}
+    assert [p["trip_id"] for p in store.for_route(route_id)] == [str(live_trip)]
+
+
+def test_reporting_again_keeps_a_position_alive(clock):
+    store = LivePositionStore(ttl=30)
+    trip_id = uuid.uuid4()
+    report(store, trip_id, None, None)
+    clock[0] += 25
+    report(store, trip_id, None, None, T0 + timedelta(seconds=25))
+    clock[0] += 25
+    assert store.get_trip(trip_id) is not None
+    # an older fix is not stored and does not refresh the entry
+    assert report(store, trip_id, None, None, T0) is None
+
+
+def test_rehydrated_positions_are_aged_by_their_last_fix(clock):
+    store = LivePositionStore(ttl=30)
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    fresh, old = uuid.uuid4(), uuid.uuid4()
+
+    async def load(since):
+        return [
+            {
+                "id": trip_id,
+                "bus_id": uuid.uuid4(),
+                "route_id": None,
+                "latitude": 31.95,
+                "longitude": 35.91,
+                "current_time": utc_now - timedelta(seconds=age),
+            }
+            for trip_id, age in ((fresh, 5), (old, 25))
+        ]
+
+    asyncio.run(store.ensure_hydrated(load))
+    clock[0] += 10
+    assert store.get_trip(fresh) is not None
+    assert store.get_trip(old) is None
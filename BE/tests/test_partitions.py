@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, text
+
+from src.database.connection import build_engine
+from src.database.partitions import (
+    create_partitions,
+    default_partition_name,
+    list_partitions,
+    partition_name,
+)
+
+probe = Table(
+    "partition_probe",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("recorded_at", DateTime, primary_key=True),
+    postgresql_partition_by="RANGE (recorded_at)",
+)
+
+
+@pytest.fixture
+def engine(database_url):
+    engine = build_engine(database_url)
+    probe.drop(engine, checkfirst=True)
+    probe.create(engine)
+    yield engine
+    probe.drop(engine, checkfirst=True)
+    engine.dispose()
+
+
+def test_rows_in_the_default_partition_move_into_the_new_partition(engine):
+    day = date(2024, 3, 5)
+    with engine.begin() as conn:
+        create_partitions(conn, probe, date(2024, 3, 1), date(2024, 3, 1))
+        # maintenance lapsed: these fixes landed in the default partition
+        conn.execute(
+            probe.insert(),
+            [
+                {"id": 1, "recorded_at": datetime(2024, 3, 5, 7, 30)},
+                {"id": 2, "recorded_at": datetime(2024, 3, 6, 7, 30)},
+            ],
+        )
+
+    with engine.begin() as conn:
+        created = create_partitions(conn, probe, day, day)
+        assert created == [partition_name(probe, day)]
+        assert partition_name(probe, day) in list_partitions(conn, probe)
+        moved = conn.execute(
+            text(f'SELECT id FROM "{partition_name(probe, day)}"')
+        ).scalars()
+        assert list(moved) == [1]
+        left = conn.execute(
+            text(f'SELECT id FROM "{default_partition_name(probe)}"')
+        ).scalars()
+        assert list(left) == [2]
+        # new rows of that day are routed to the attached partition
+        conn.execute(
+            probe.insert().values(id=3, recorded_at=datetime(2024, 3, 5, 9))
+        )
+        count = conn.execute(
+            text(f'SELECT count(*) FROM "{partition_name(probe, day)}"')
+        ).scalar()
+        assert count == 2
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import uuid
+
+from src.bus_locations.hub import PositionHub
+
+
+def position(trip_id: str, seconds: int) -> dict:
+    return {"trip_id": trip_id, "recorded_at": f"2024-03-05T07:30:{seconds:02d}"}
+
+
+def recorded(batch: list[str]) -> list[tuple[str, str]]:
+    return [
+        (update["position"]["trip_id"], update["position"]["recorded_at"][-2:])
+        for update in map(json.loads, batch)
+    ]
+
+
+def test_a_slow_subscriber_keeps_only_the_newest_update_per_bus():
+    hub = PositionHub(max_pending=10)
+    route_id = uuid.uuid4()
+    slow = hub.subscribe(route_id)
+    for second in range(5):
+        hub.publish(route_id, position("a", second))
+        hub.publish(route_id, position("b", second))
+
+    batch = asyncio.run(slow.next_batch())
+    assert recorded(batch) == [("a", "04"), ("b", "04")]
+    assert (slow.dropped, slow.delivered) == (8, 2)
+
+
+def test_a_full_queue_evicts_the_oldest_bus_without_blocking_others():
+    hub = PositionHub(max_pending=2)
+    route_id = uuid.uuid4()
+    slow = hub.subscribe(route_id)
+    fast = hub.subscribe(route_id)
+
+    async def run():
+        fast_batches = []
+        for second, trip_id in enumerate(["a", "b", "c"]):
+            assert hub.publish(route_id, position(trip_id, second)) == 2
+            fast_batches.append(recorded(await fast.next_batch()))
+        return fast_batches, recorded(await slow.next_batch())
+
+    fast_batches, slow_batch = asyncio.run(run())
+    assert fast_batches == [[("a", "00")], [("b", "01")], [("c", "02")]]
+    assert slow_batch == [("b", "01"), ("c", "02")]
+    assert (slow.dropped, fast.dropped) == (1, 0)
+    stats = hub.stats()
+    assert (stats["published"], stats["delivered"], stats["dropped"]) == (3, 5, 1)
+
+
+def test_an_idle_subscription_times_out_empty_and_can_leave():
+    hub = PositionHub(max_pending=2)
+    route_id = uuid.uuid4()
+    subscription = hub.subscribe(route_id)
+    assert asyncio.run(subscription.next_batch(timeout=0.01)) == []
+    hub.unsubscribe(subscription)
+    assert hub.publish(route_id, position("a", 0)) == 0
+    assert hub.stats()["subscribers"] == 0
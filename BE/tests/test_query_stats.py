@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy import select
+
+from src.database.execution import AsyncDBClient
+from src.database.instrumentation import (
+    QueryStats,
+    current_query_origin,
+    query_stats,
+)
+from src.database.schema import routes
+
+
+def test_rows_are_aggregated_per_origin_and_endpoint():
+    stats = QueryStats()
+    with stats.request_scope() as statements:
+        token = current_query_origin.set("TripQueries.get_positions")
+        try:
+            stats.record_statement("TripQueries.get_positions", 4.0)
+            stats.record_rows(120)
+            stats.record_statement("TripQueries.get_positions", 2.0)
+            stats.record_rows(0)
+        finally:
+            current_query_origin.reset(token)
+    stats.record_request("GET /trips/{trip_id}/positions", statements)
+    stats.record_request("GET /trips/{trip_id}/positions", [])
+
+    snapshot = stats.snapshot()
+    origin = snapshot["by_origin"]["TripQueries.get_positions"]
+    assert origin["count"] == 2
+    assert origin["rows"] == {"fetches": 2, "total": 120, "avg": 60.0, "max": 120}
+    endpoint = snapshot["by_endpoint"]["GET /trips/{trip_id}/positions"]
+    assert endpoint["rows"] == 120
+    assert endpoint["rows_per_request"] == 60.0
+    assert endpoint["max_rows_per_request"] == 120
+
+
+async def fetch_routes(url: str) -> tuple[int, dict]:
+    client = AsyncDBClient(primary_url=url)
+    try:
+        rows = await client.execute_all(select(routes.c.id).limit(3))
+        return len(rows or []), query_stats.snapshot()
+    finally:
+        await client.engine.dispose()
+
+
+def test_asyncpg_selects_record_the_rows_fetched(database_url):
+    query_stats.reset()
+    fetched, snapshot = asyncio.run(fetch_routes(database_url))
+    rows = snapshot["by_origin"]["fetch_routes"]["rows"]
+    assert rows["fetches"] == 1
+    assert rows["total"] == fetched
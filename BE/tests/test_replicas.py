@@ -0,0 +1,33 @@
+import asyncio
+
+from src.database.replicas import pin_primary, primary_pinned, primary_scope
+
+
+def test_primary_scope_ends_pins_made_inside_it():
+    with primary_scope():
+        pin_primary()
+        assert primary_pinned.get()
+    assert not primary_pinned.get()
+
+
+def test_primary_scope_keeps_an_outer_pin():
+    token = pin_primary()
+    try:
+        with primary_scope():
+            assert primary_pinned.get()
+        assert primary_pinned.get()
+    finally:
+        primary_pinned.reset(token)
+    assert not primary_pinned.get()
+
+
+def test_a_long_lived_task_reads_from_replicas_again_after_each_run():
+    async def run():
+        pinned = []
+        for _ in range(2):
+            with primary_scope():
+                pinned.append(primary_pinned.get())
+                pin_primary()
+        return pinned, primary_pinned.get()
+
+    assert asyncio.run(run()) == ([False, False], False)
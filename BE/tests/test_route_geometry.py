@@ -0,0 +1,151 @@
+import asyncio
+import math
+import uuid
+
+import numpy as np
+import pytest
+
+from src.bus_routes.geometry import RouteGeometry, RouteGeometryCache
+
+
+def zigzag_route(points: int = 60) -> RouteGeometry:
+    # roughly 100 m legs alternating north-east and south-east
+    latitudes = [31.95 + (index % 2) * 0.0006 for index in range(points)]
+    longitudes = [35.9 + index * 0.0008 for index in range(points)]
+    return RouteGeometry(latitudes, longitudes)
+
+
+@pytest.fixture
+def geometry():
+    return zigzag_route()
+
+
+def test_locate_matches_full_projection(geometry):
+    distances = np.linspace(0, geometry.length, 97)
+    latitudes, longitudes = geometry.point_at(distances)
+    for distance, latitude, longitude in zip(distances, latitudes, longitudes):
+        # the rough progress lags a few segments behind the position
+        along, offset = geometry.locate(
+            float(latitude), float(longitude), max(distance - 250, 0)
+        )
+        full_along, full_offset = geometry.project(float(latitude), float(longitude))
+        assert along == pytest.approx(float(full_along[0]), abs=0.5)
+        assert offset == pytest.approx(float(full_offset[0]), abs=0.5)
+        assert along == pytest.approx(distance, abs=0.5)
+
+
+def test_locate_walks_back_to_an_earlier_segment(geometry):
+    latitude, longitude = geometry.point_at(300.0)
+    along, offset = geometry.locate(float(latitude), float(longitude), 900.0)
+    assert along == pytest.approx(300.0, abs=0.5)
+    assert offset < 0.5
+
+
+def test_locate_reports_the_offset_of_a_position_off_the_route(geometry):
+    latitude, longitude = geometry.point_at(geometry.cumulative[10])
+    # 20 m north of a vertex
+    along, offset = geometry.locate(
+        float(latitude) + 20 / 111_320, float(longitude), geometry.cumulative[10]
+    )
+    full_along, full_offset = geometry.project(
+        float(latitude) + 20 / 111_320, float(longitude)
+    )
+    assert along == pytest.approx(float(full_along[0]), abs=0.5)
+    assert offset == pytest.approx(float(full_offset[0]), abs=0.5)
+
+
+def test_locate_clamps_to_the_ends(geometry):
+    start_lat, start_lng = geometry.point_at(0.0)
+    along, _ = geometry.locate(float(start_lat), float(start_lng) - 0.001, 0.0)
+    assert along == 0.0
+    end_lat, end_lng = geometry.point_at(geometry.length)
+    along, _ = geometry.locate(
+        float(end_lat), float(end_lng) + 0.001, geometry.length + 50
+    )
+    assert along == pytest.approx(geometry.length)
+
+
+def shape_row(geometry: RouteGeometry) -> dict:
+    return {
+        "shape_latitudes": geometry.latitudes.tolist(),
+        "shape_longitudes": geometry.longitudes.tolist(),
+        "shape_distances": geometry.cumulative.tolist(),
+    }
+
+
+def test_cache_loads_once_within_the_ttl(geometry):
+    cache = RouteGeometryCache(ttl=60)
+    route_id = uuid.uuid4()
+    loads = []
+
+    async def load(route_id):
+        loads.append(route_id)
+        return shape_row(geometry)
+
+    async def run():
+        first = await cache.get(route_id, load)
+        second = await cache.get(route_id, load)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert math.isclose(first.length, geometry.length)
+    assert loads == [route_id]
+
+
+def test_cache_does_not_keep_routes_without_a_shape(geometry):
+    cache = RouteGeometryCache(ttl=60)
+    route_id = uuid.uuid4()
+    rows = [None, shape_row(geometry)]
+
+    async def load(route_id):
+        return rows.pop(0)
+
+    async def run():
+        return await cache.get(route_id, load), await cache.get(route_id, load)
+
+    missing, found = asyncio.run(run())
+    assert missing is None
+    assert found is not None
+
+
+def test_cache_reloads_after_expiry_and_invalidation(geometry, monkeypatch):
+    cache = RouteGeometryCache(ttl=60)
+    route_id = uuid.uuid4()
+    loads = []
+    clock = [1000.0]
+    monkeypatch.setattr("src.bus_routes.geometry.time.monotonic", lambda: clock[0])
+
+    async def load(route_id):
+        loads.append(route_id)
+        return shape_row(geometry)
+
+    async def run():
+        await cache.get(route_id, load)
+        clock[0] += 61
+        await cache.get(route_id, load)
+        cache.invalidate(route_id)
+        await cache.get(route_id, load)
+
+    asyncio.run(run())
+    assert len(loads) == 3
+
+
+def test_cache_drops_a_load_that_raced_an_invalidation(geometry):
+    cache = RouteGeometryCache(ttl=60)
+    route_id = uuid.uuid4()
+    loads = []
+
+    async def load(route_id):
+        loads.append(route_id)
+        if len(loads) == 1:
+            # the shape changes while the old row is being read
+            cache.invalidate(route_id)
+        return shape_row(geometry)
+
+    async def run():
+        await cache.get(route_id, load)
+        await cache.get(route_id, load)
+
+    asyncio.run(run())
+    assert len(loads) == 2
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.bus_routes.matching import SegmentIndex
+from src.helpers.geo import project_onto_polyline
+
+MAX_DISTANCE_M = 50.0
+
+
+def random_route(points: int = 200, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.5, points))
+    step = rng.uniform(5, 80, points)
+    x = np.cumsum(step * np.cos(heading))
+    y = np.cumsum(step * np.sin(heading))
+    cumulative = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+    return x, y, cumulative
+
+
+@pytest.fixture
+def route():
+    return random_route()
+
+
+def fixes_near(route, count: int = 2000, spread_m: float = 120.0, seed: int = 9):
+    x, y, _ = route
+    rng = np.random.default_rng(seed)
+    vertex = rng.integers(0, len(x), count)
+    return (
+        x[vertex] + rng.uniform(-spread_m, spread_m, count),
+        y[vertex] + rng.uniform(-spread_m, spread_m, count),
+    )
+
+
+def test_match_agrees_with_projecting_onto_every_segment(route):
+    x, y, cumulative = route
+    index = SegmentIndex(x, y, cumulative, MAX_DISTANCE_M)
+    fix_x, fix_y = fixes_near(route)
+    snapped_x, snapped_y, along, offset, matched = index.match(fix_x, fix_y)
+    full_along, full_offset, _ = project_onto_polyline(fix_x, fix_y, x, y, cumulative)
+
+    assert matched.any() and not matched.all()
+    np.testing.assert_array_equal(matched, full_offset <= MAX_DISTANCE_M)
+    np.testing.assert_allclose(offset[matched], full_offset[matched], atol=1e-6)
+    # the snapped point lies on the route, `offset` away from the fix
+    np.testing.assert_allclose(
+        np.hypot(snapped_x - fix_x, snapped_y - fix_y)[matched],
+        offset[matched],
+        atol=1e-6,
+    )
+    np.testing.assert_allclose(along[matched], full_along[matched], atol=1e-6)
+
+
+def test_unmatched_fixes_keep_their_coordinates(route):
+    x, y, cumulative = route
+    index = SegmentIndex(x, y, cumulative, MAX_DISTANCE_M)
+    far_x = np.array([x.max() + 10_000, x.min() - 500])
+    far_y = np.array([y.max() + 10_000, y.min() - 500])
+    snapped_x, snapped_y, along, offset, matched = index.match(far_x, far_y)
+    assert not matched.any()
+    np.testing.assert_array_equal(snapped_x, far_x)
+    np.testing.assert_array_equal(snapped_y, far_y)
+    assert np.isnan(along).all() and np.isnan(offset).all()
+
+
+def test_a_fix_on_the_route_snaps_to_itself():
+    x = np.array([0.0, 100.0, 100.0])
+    y = np.array([0.0, 0.0, 100.0])
+    cumulative = np.array([0.0, 100.0, 200.0])
+    index = SegmentIndex(x, y, cumulative, MAX_DISTANCE_M)
+    snapped_x, snapped_y, along, offset, matched = index.match(
+        [40.0, 100.0, 130.0], [0.0, 60.0, 60.0]
+    )
+    assert matched.tolist() == [True, True, True]
+    np.testing.assert_allclose(along, [40.0, 160.0, 160.0])
+    np.testing.assert_allclose(offset, [0.0, 0.0, 30.0])
+    np.testing.assert_allclose(snapped_x, [40.0, 100.0, 100.0])
+    np.testing.assert_allclose(snapped_y, [0.0, 60.0, 60.0])
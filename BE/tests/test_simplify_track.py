@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.helpers.geo import simplify_track
+
+
+def synchronized_errors(x, y, seconds, keep):
+    """Distance of each point from where the kept track puts it at its time."""
+    expected_x = np.interp(seconds, seconds[keep], x[keep])
+    expected_y = np.interp(seconds, seconds[keep], y[keep])
+    return np.hypot(x - expected_x, y - expected_y)
+
+
+def random_track(points: int, seed: int):
+    rng = np.random.default_rng(seed)
+    seconds = np.cumsum(rng.uniform(1, 5, points))
+    heading = np.cumsum(rng.normal(0, 0.3, points))
+    step = rng.uniform(0, 15, points)
+    return np.cumsum(step * np.cos(heading)), np.cumsum(step * np.sin(heading)), seconds
+
+
+@pytest.mark.parametrize("tolerance", [2.0, 10.0, 25.0])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_dropped_points_stay_within_the_tolerance(tolerance, seed):
+    x, y, seconds = random_track(800, seed)
+    keep, max_error = simplify_track(x, y, seconds, tolerance)
+    assert keep[0] and keep[-1]
+    assert keep.sum() < len(x)
+    errors = synchronized_errors(x, y, seconds, keep)
+    assert errors.max() <= tolerance + 1e-9
+    # the reported bound is the actual largest error of a dropped point
+    assert max_error == pytest.approx(errors[~keep].max())
+
+
+def test_constant_speed_line_keeps_only_the_ends():
+    seconds = np.arange(50, dtype=float)
+    keep, max_error = simplify_track(seconds * 10, seconds * 5, seconds, 1.0)
+    assert keep.tolist() == [True] + [False] * 48 + [True]
+    assert max_error == pytest.approx(0.0, abs=1e-9)
+
+
+def test_a_dwell_on_a_straight_road_is_kept():
+    # drive 300 m, wait 60 s, drive 300 m: straight, but not at one speed
+    seconds = np.arange(0, 121, dtype=float)
+    distance = np.concatenate(
+        [np.arange(0, 30) * 10, np.full(61, 300.0), 300 + np.arange(1, 31) * 10]
+    )
+    keep, max_error = simplify_track(distance, np.zeros_like(distance), seconds, 5)
+    # arriving at and leaving the stop
+    assert keep[30] and keep[90]
+    assert max_error <= 5
+
+
+def test_short_tracks_are_kept_whole():
+    keep, max_error = simplify_track([0, 1], [0, 1], [0, 1], 5)
+    assert keep.tolist() == [True, True]
+    assert max_error == 0.0
@@ -0,0 +1,99 @@
+import random
+import uuid
+
+import pytest
+
+from src.helpers.geo import haversine_m
+from src.stops.index import StopIndex
+
+
+def make_stops(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Stop {index}",
+            "latitude": 31.9 + rng.random() * 0.2,
+            "longitude": 35.8 + rng.random() * 0.2,
+        }
+        for index in range(count)
+    ]
+
+
+def brute_force(stops, latitude, longitude):
+    return sorted(
+        (haversine_m(latitude, longitude, s["latitude"], s["longitude"]), s["id"])
+        for s in stops
+    )
+
+
+@pytest.fixture
+def index_and_stops():
+    stops = make_stops(500)
+    index = StopIndex(cell_degrees=0.01)
+    for stop in stops:
+        index.upsert(stop)
+    return index, stops
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude",
+    [(31.95, 35.85), (32.0, 35.9), (31.9, 35.8), (31.5, 35.5), (33.0, 36.5)],
+)
+def test_nearest_matches_brute_force(index_and_stops, latitude, longitude):
+    index, stops = index_and_stops
+    expected = brute_force(stops, latitude, longitude)[:10]
+    found = index.nearest(latitude, longitude, k=10)
+    assert [stop["id"] for stop in found] == [str(stop_id) for _, stop_id in expected]
+    distances = [stop["distance_m"] for stop in found]
+    assert distances == sorted(distances)
+
+
+def test_nearest_respects_max_distance(index_and_stops):
+    index, stops = index_and_stops
+    expected = [
+        str(stop_id)
+        for distance, stop_id in brute_force(stops, 32.0, 35.9)
+        if distance <= 1000
+    ]
+    found = index.nearest(32.0, 35.9, k=1000, max_distance_m=1000)
+    assert [stop["id"] for stop in found] == expected
+
+
+def test_within_matches_brute_force(index_and_stops):
+    index, stops = index_and_stops
+    expected = [
+        str(stop_id)
+        for distance, stop_id in brute_force(stops, 31.97, 35.88)
+        if distance <= 2500
+    ]
+    found = index.within(31.97, 35.88, 2500)
+    assert [stop["id"] for stop in found] == expected
+    assert len(index.within(31.97, 35.88, 2500, limit=3)) == min(3, len(expected))
+
+
+def test_far_query_scans_only_the_grid(index_and_stops, monkeypatch):
+    index, stops = index_and_stops
+    rings = []
+    ring = index._ring
+    monkeypatch.setattr(
+        index, "_ring", lambda *args: rings.append(args[1]) or ring(*args)
+    )
+    # ~5000 km away: no ring walk across the empty space in between
+    found = index.nearest(-10.0, 0.0, k=1)
+    assert [stop["id"] for stop in found] == [
+        str(brute_force(stops, -10.0, 0.0)[0][1])
+    ]
+    assert len(rings) <= 25
+
+
+def test_empty_index_and_removal():
+    index = StopIndex(cell_degrees=0.01)
+    assert index.nearest(32.0, 35.9) == []
+    assert index.within(32.0, 35.9, 1000) == []
+    stop = make_stops(1)[0]
+    index.upsert(stop)
+    assert [found["id"] for found in index.nearest(0.0, 0.0)] == [str(stop["id"])]
+    index.upsert({**stop, "deleted_at": "2026-01-01"})
+    assert len(index) == 0
+    assert index.nearest(32.0, 35.9) == []
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from src.database.execution import AsyncDBClient
+from src.database.schema import buses, routes, trips
+from src.trips import adherence
+from src.trips.adherence import next_delayed, trip_progress
+from src.trips.query import TripQueries
+from src.utils.config import settings
+
+
+async def flush(url: str):
+    client = AsyncDBClient(primary_url=url)
+    try:
+        route = await client.execute_one(
+            insert(routes).values(name="Adherence test").returning(routes.c.id)
+        )
+        start = datetime(2026, 1, 1, 7)
+        rows = []
+        for status in ["in_progress", "delayed", "arrived"]:
+            bus = await client.execute_one(
+                insert(buses)
+                .values(
+                    bus_number=uuid.uuid4().int % 2**31,
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                    status=status,
+                )
+                .returning(buses.c.id)
+            )
+            trip = await client.execute_one(
+                insert(trips)
+                .values(route_id=route["id"], bus_id=bus["id"], status=status)
+                .returning(trips.c.id, trips.c.bus_id, trips.c.updated_at)
+            )
+            rows.append(trip)
+        # the arrived trip left the active statuses meanwhile: not touched
+        changes = [
+            {"trip_id": row["id"], "bus_id": row["bus_id"], "status": status}
+            for row, status in zip(rows, ["delayed", "in_progress", "delayed"])
+        ]
+        updated = await TripQueries(client).apply_status_changes(
+            changes, ["in_progress", "delayed"]
+        )
+        ids = [row["id"] for row in rows]
+        stored = await client.execute_all(
+            select(
+                trips.c.id,
+                trips.c.status,
+                trips.c.updated_at,
+                buses.c.status.label("bus_status"),
+            )
+            .join(buses, buses.c.id == trips.c.bus_id)
+            .where(trips.c.id.in_(ids)),
+            use_primary=True,
+        )
+        return rows, updated, {row["id"]: row for row in stored}
+    finally:
+        await client.engine.dispose()
+
+
+def test_apply_status_changes_flushes_trips_and_buses(database_url):
+    rows, updated, stored = asyncio.run(flush(database_url))
+    assert sorted(str(row["id"]) for row in updated) == sorted(
+        str(row["id"]) for row in rows[:2]
+    )
+    assert stored[rows[0]["id"]]["status"] == "delayed"
+    assert stored[rows[1]["id"]]["status"] == "in_progress"
+    assert stored[rows[2]["id"]]["status"] == "arrived"
+    for row in rows:
+        trip = stored[row["id"]]
+        # the bus follows its trip; naive UTC timestamps are accepted
+        assert trip["bus_status"] == trip["status"]
+        assert trip["updated_at"].tzinfo is None
+    assert stored[rows[0]["id"]]["updated_at"] >= rows[0]["updated_at"]
+
+
+def test_unknown_lateness_keeps_the_current_status():
+    threshold = settings.tracking.DELAY_THRESHOLD_SECONDS
+    lateness = np.array([np.nan, np.nan, threshold + 1, 0.0])
+    delayed = np.array([False, True, False, True])
+    assert next_delayed(lateness, delayed).tolist() == [False, True, True, False]
+
+
+def test_trips_on_routes_without_a_model_have_unknown_progress(monkeypatch):
+    async def no_model(route_id, *loaders):
+        return None
+
+    monkeypatch.setattr(adherence.eta_engine, "route_model", no_model)
+    trips = [
+        {"id": uuid.uuid4(), "route_id": uuid.uuid4(), "latitude": 31.95},
+        {"id": uuid.uuid4(), "route_id": uuid.uuid4(), "latitude": None},
+    ]
+    progress = asyncio.run(trip_progress(trips, TripQueries(AsyncDBClient())))
+    assert np.isnan(progress).all()
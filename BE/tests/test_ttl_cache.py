@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from src.helpers.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.helpers.ttl_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = TTLCache(ttl=15, max_size=10)
+    cache.put("session", {"user": 1})
+    clock[0] += 14.9
+    assert cache.get("session") == {"user": 1}
+    clock[0] += 0.1
+    assert cache.get("session") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 1, 1)
+    assert stats["size"] == 0
+
+
+def test_put_restarts_the_ttl(clock):
+    cache = TTLCache(ttl=15, max_size=10)
+    cache.put("session", 1)
+    clock[0] += 10
+    cache.put("session", 2)
+    clock[0] += 10
+    assert cache.get("session") == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(ttl=15, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_uuids_and_their_strings_are_one_key(clock):
+    cache = TTLCache(ttl=15, max_size=10)
+    key = uuid.uuid4()
+    cache.put(key, "value")
+    assert cache.get(str(key)) == "value"
+    cache.invalidate(str(key))
+    assert cache.get(key) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_clear_counts_the_dropped_entries(clock):
+    cache = TTLCache(ttl=15, max_size=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+@pytest.mark.parametrize("ttl, max_size", [(0, 10), (15, 0)])
+def test_zero_ttl_or_size_disables_the_cache(clock, ttl, max_size):
+    cache = TTLCache(ttl=ttl, max_size=max_size)
+    assert not cache.enabled
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
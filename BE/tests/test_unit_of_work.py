@@ -0,0 +1,154 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select, text
+
+import src.database.unit_of_work as unit_of_work
+from src.database.connection import build_engine
+from src.database.execution import AsyncDBClient
+from src.database.schema import routes
+
+# a foreign key checked at commit, so the commit itself can fail
+PROBE_TABLE = """
+CREATE TABLE IF NOT EXISTS uow_probe (
+    id uuid PRIMARY KEY,
+    route_id uuid REFERENCES routes (id) DEFERRABLE INITIALLY DEFERRED
+)
+"""
+
+
+@pytest.fixture
+def client(database_url, monkeypatch):
+    engine = build_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(text(PROBE_TABLE))
+    engine.dispose()
+    db_client = AsyncDBClient(primary_url=database_url)
+    monkeypatch.setattr(unit_of_work, "async_db_client", db_client)
+    app = FastAPI()
+
+    @app.post("/probe/{route_id}")
+    async def probe(
+        route_id: uuid.UUID,
+        fail: bool = False,
+        uow: AsyncDBClient = Depends(
+            unit_of_work.get_unit_of_work, scope="function"
+        ),
+    ):
+        await uow.execute_one(
+            text("INSERT INTO uow_probe VALUES (:id, :route_id) RETURNING id"),
+            {"id": uuid.uuid4(), "route_id": route_id},
+        )
+        await uow.execute_one(
+            insert(routes).values(name="probe").returning(routes.c.id)
+        )
+        if fail:
+            # a service's error path: answer 500 without raising
+            await uow.rollback()
+            return JSONResponse(content=None, status_code=500)
+        return JSONResponse(content={"ok": True}, status_code=201)
+
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        yield test_client
+        test_client.portal.call(db_client.engine.dispose)
+
+
+@pytest.fixture
+def route_id(database_url):
+    # an existing route, so the deferred foreign key holds at commit
+    engine = build_engine(database_url)
+    with engine.begin() as conn:
+        row_id = conn.execute(
+            insert(routes).values(name="probe target").returning(routes.c.id)
+        ).scalar_one()
+    engine.dispose()
+    return row_id
+
+
+@pytest.fixture
+def count_probe_routes(database_url):
+    engine = build_engine(database_url)
+
+    def count() -> int:
+        with engine.connect() as conn:
+            query = select(routes.c.id).where(routes.c.name == "probe")
+            return len(conn.execute(query).all())
+
+    yield count
+    engine.dispose()
+
+
+def test_commit_failure_is_reported_to_the_client(client, count_probe_routes):
+    before = count_probe_routes()
+    response = client.post(f"/probe/{uuid.uuid4()}")
+    assert response.status_code == 500
+    assert count_probe_routes() == before
+
+
+def test_error_path_rollback_discards_the_writes(
+    client, count_probe_routes, route_id
+):
+    before = count_probe_routes()
+    response = client.post(f"/probe/{route_id}", params={"fail": True})
+    assert response.status_code == 500
+    assert count_probe_routes() == before
+
+
+def test_success_commits(client, count_probe_routes, route_id):
+    before = count_probe_routes()
+    response = client.post(f"/probe/{route_id}")
+    assert response.status_code == 201
+    assert count_probe_routes() == before + 1
+
+
+def test_after_commit_runs_only_once_committed(database_url):
+    async def run():
+        db_client = AsyncDBClient(primary_url=database_url)
+        seen = []
+        try:
+            async with db_client.transaction() as uow:
+                uow.after_commit(lambda: seen.append("committed"))
+                assert seen == []
+            async with db_client.transaction() as uow:
+                uow.after_commit(lambda: seen.append("rolled back"))
+                await uow.rollback()
+            try:
+                async with db_client.transaction() as uow:
+                    uow.after_commit(lambda: seen.append("raised"))
+                    raise RuntimeError("request failed")
+            except RuntimeError:
+                pass
+            db_client.after_commit(lambda: seen.append("unbound"))
+        finally:
+            await db_client.engine.dispose()
+        return seen
+
+    assert asyncio.run(run()) == ["committed", "unbound"]
+
+
+def test_connection_is_checked_out_by_the_first_statement(database_url):
+    async def run():
+        db_client = AsyncDBClient(primary_url=database_url)
+        pool = db_client.engine.pool
+        checked_out = []
+        try:
+            async with db_client.transaction() as uow:
+                checked_out.append(pool.checkedout())
+                await uow.execute_one(select(routes.c.id).limit(1))
+                checked_out.append(pool.checkedout())
+                # statements share the transaction's one connection
+                await uow.execute_one(select(routes.c.id).limit(1))
+                checked_out.append(pool.checkedout())
+            checked_out.append(pool.checkedout())
+            async with db_client.transaction():
+                pass
+            checked_out.append(pool.checkedout())
+        finally:
+            await db_client.engine.dispose()
+        return checked_out
+
+    assert asyncio.run(run()) == [0, 1, 1, 0, 0]